@@ -10,22 +10,38 @@ from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncEngine
 
 from fastai.admin_v1 import init_admin_v1_app
+from fastai.agents import AgentSettings
 from fastai.api_v1 import init_api_v1
-from fastai.database import PostgresSettings, create_db_engine, destroy_engine
+from fastai.chats.cache import HistoryCache
+from fastai.database import (
+    PostgresSettings,
+    ReadReplicas,
+    create_db_engine,
+    create_read_replicas,
+    destroy_engine,
+)
 from fastai.events import EventPublisher, NatsSettings
 from fastai.logger.core import setup_api_logging
 from fastai.logger.middleware import LoggingMiddleware
-from fastai.storage import StorageSettings
+from fastai.storage import StorageService, StorageSettings
 
 logger = structlog.stdlib.get_logger(__name__)
 
 
 @asynccontextmanager
-async def lifespan(db_engine: AsyncEngine, publisher: EventPublisher, app: FastAPI):
+async def lifespan(
+    db_engine: AsyncEngine,
+    read_replicas: ReadReplicas | None,
+    publisher: EventPublisher,
+    storage: StorageService,
+    app: FastAPI,
+):
     logger.info("Initializing api")
-    async with publisher:
+    async with publisher, storage:
         yield
     await destroy_engine(engine=db_engine)
+    if read_replicas is not None:
+        await read_replicas.dispose()
     logger.info("Shutting down api")
 
 
@@ -41,11 +57,28 @@ def init_api(db_settings: PostgresSettings | None = None) -> FastAPI:
     storage_settings = StorageSettings()  # pyright: ignore[reportCallIssue]
     nats_settings = NatsSettings()  # pyright: ignore[reportCallIssue]
     publisher = EventPublisher(nats_settings)
+    storage = StorageService(storage_settings)
+    agent_settings = AgentSettings()
+    history_cache = HistoryCache(
+        agent_settings.history_cache_size, agent_settings.history_max_messages
+    )
+    # Deletes in other api processes drop this process's cached history
+    publisher.on_history_invalidated(history_cache.invalidate)
 
-    engine = create_db_engine(db_settings)
+    checkout_wait = logfire.metric_histogram(
+        "db.pool.checkout_wait",
+        unit="s",
+        description="Time spent waiting for a pooled database connection.",
+    )
+    engine = create_db_engine(db_settings, on_checkout_wait=checkout_wait.record)
     logfire.instrument_sqlalchemy(engine=engine)
+    read_replicas = create_read_replicas(
+        db_settings, on_checkout_wait=checkout_wait.record
+    )
+    if read_replicas is not None:
+        logfire.instrument_sqlalchemy(engines=read_replicas.engines)
     app = FastAPI(
-        lifespan=partial(lifespan, engine, publisher),
+        lifespan=partial(lifespan, engine, read_replicas, publisher, storage),
         middleware=[
             Middleware(CorrelationIdMiddleware),
             Middleware(LoggingMiddleware, logger=logger),
@@ -67,10 +100,20 @@ def init_api(db_settings: PostgresSettings | None = None) -> FastAPI:
         "/admin/v1",
         init_admin_v1_app(
             engine,
-            storage_settings=storage_settings,
+            storage=storage,
+            event_publisher=publisher,
+            read_replicas=read_replicas,
+        ),
+    )
+    app.mount(
+        "/api/v1",
+        init_api_v1(
+            engine,
+            agent_settings=agent_settings,
+            history_cache=history_cache,
             event_publisher=publisher,
+            read_replicas=read_replicas,
         ),
     )
-    app.mount("/api/v1", init_api_v1(engine))
 
     return app
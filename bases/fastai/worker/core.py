@@ -9,9 +9,9 @@ from fastai.embeddings.core import KnowledgeBase
 from fastai.embeddings.providers import create_embedder
 from fastai.embeddings.settings import EmbeddingSettings
 from fastai.events import NatsSettings
-from fastai.extraction.core import ExtractionService
+from fastai.extraction.core import ChunkSizing, ExtractionService
 from fastai.logger.core import setup_worker_logging
-from fastai.storage.core import StorageSettings
+from fastai.storage.core import StorageService, StorageSettings
 from fastai.subscribers_v1 import init_subscribers_v1
 
 logger = structlog.stdlib.get_logger(__name__)
@@ -22,18 +22,26 @@ async def lifespan(context: ContextRepo):
     """Initialise long-lived singletons and expose them via ContextRepo."""
     engine = create_db_engine()
     storage_settings = StorageSettings()  # pyright: ignore[reportCallIssue]
-    extraction_service = ExtractionService()
     embedding_settings = EmbeddingSettings()  # pyright: ignore[reportCallIssue]
+    extraction_service = ExtractionService(
+        chunk_sizing=ChunkSizing(
+            max_tokens=embedding_settings.chunk_tokens,
+            overlap_tokens=embedding_settings.chunk_overlap_tokens,
+            token_counter=embedding_settings.token_counter,
+        )
+    )
     embedder = create_embedder(embedding_settings)
     knowledge_base = KnowledgeBase(embedder, embedding_settings)
 
-    context.set_global("db_engine", engine)
-    context.set_global("storage_settings", storage_settings)
-    context.set_global("extraction_service", extraction_service)
-    context.set_global("knowledge_base", knowledge_base)
+    async with StorageService(storage_settings) as storage:
+        context.set_global("db_engine", engine)
+        context.set_global("storage", storage)
+        context.set_global("extraction_service", extraction_service)
+        context.set_global("knowledge_base", knowledge_base)
 
-    yield
+        yield
 
+    extraction_service.shutdown()
     await destroy_engine(engine)
 
 
@@ -2,21 +2,25 @@ from fastapi import FastAPI
 from sqlalchemy.ext.asyncio import AsyncEngine
 
 from fastai.admin_v1 import documents, health, users
+from fastai.database.routing import ReadReplicas
 from fastai.events.core import EventPublisher
-from fastai.storage.core import StorageSettings
+from fastai.storage.core import StorageService
 
 
 def init_admin_v1_app(
     engine: AsyncEngine,
-    storage_settings: StorageSettings,
+    storage: StorageService,
     event_publisher: EventPublisher,
+    read_replicas: ReadReplicas | None = None,
 ) -> FastAPI:
     """Create the admin v1 FastAPI sub-application.
 
     This is a standalone FastAPI app that can be mounted on the main
     application or deployed independently. It receives its own database
     engine so that ``request.app.state.db_engine`` resolves correctly
-    within the sub-app's dependency chain.
+    within the sub-app's dependency chain. ``storage`` is shared with the
+    parent app, which opens and closes it in its lifespan, as are the
+    optional ``read_replicas`` used for listing queries.
     """
     app = FastAPI(
         title="Admin API v1",
@@ -25,7 +29,8 @@ def init_admin_v1_app(
     )
 
     app.state.db_engine = engine
-    app.state.storage_settings = storage_settings
+    app.state.read_replicas = read_replicas
+    app.state.storage = storage
     app.state.event_publisher = event_publisher
 
     app.include_router(documents.router)
@@ -67,21 +67,23 @@ async def create_document(
     file: UploadFile,
     filename: str | None = Form(None),
 ) -> Document:
-    """Upload a file to storage and create a document record."""
+    """Upload a file to storage and create a document record.
+
+    The upload is streamed to S3 in multipart chunks, so memory use stays
+    bounded regardless of file size. ``content_hash`` is the file's SHA-256.
+    """
     resolved_filename = filename or file.filename or "unnamed"
     content_type = file.content_type or "application/octet-stream"
-    data = await file.read()
-    file_size = len(data)
     storage_path = f"documents/{uuid.uuid4()}/{resolved_filename}"
 
-    etag = await storage.upload_bytes(data, storage_path, content_type=content_type)
+    upload = await storage.upload_stream(file, storage_path, content_type=content_type)
 
     doc_in = DocumentCreate(
         filename=resolved_filename,
         content_type=content_type,
-        file_size=file_size,
+        file_size=upload.size,
         storage_path=storage_path,
-        content_hash=etag,
+        content_hash=upload.sha256,
         embedding_status="pending",
     )
     try:
@@ -184,11 +186,16 @@ async def reprocess_document(
     session: SessionDep,
     publisher: EventPublisherDep,
     document_id: uuid.UUID,
+    clear_embeddings: bool = Query(default=False),
 ) -> Document:
-    """Re-process a document: delete existing embeddings and re-extract.
+    """Re-process a document and re-extract its text.
 
     Resets the embedding status to "pending" and publishes a new
-    DocumentUploaded event so the worker re-extracts the document.
+    DocumentUploaded event so the worker re-extracts the document, even
+    if a completed document has the same content.
+    Existing embeddings are kept until the worker replaces them, so
+    unchanged chunks reuse their stored vectors instead of being embedded
+    again. Pass ``clear_embeddings=true`` to delete them up front.
     """
     doc = await Document.get(session, document_id)
     if doc is None:
@@ -197,14 +204,14 @@ async def reprocess_document(
             detail="Document not found",
         )
 
-    # Clear existing embeddings
-    deleted_count = await Embedding.delete_by_source(session, "document", doc.id)
-    if deleted_count > 0:
-        logger.info(
-            "Deleted existing embeddings for reprocessing",
-            document_id=str(doc.id),
-            count=deleted_count,
-        )
+    if clear_embeddings:
+        deleted_count = await Embedding.delete_by_source(session, "document", doc.id)
+        if deleted_count > 0:
+            logger.info(
+                "Deleted existing embeddings for reprocessing",
+                document_id=str(doc.id),
+                count=deleted_count,
+            )
 
     await doc.update_embedding_status(session, "pending")
 
@@ -215,6 +222,7 @@ async def reprocess_document(
                 storage_path=doc.storage_path,
                 content_type=doc.content_type,
                 filename=doc.filename,
+                reprocess=True,
             )
         )
     except Exception:
@@ -18,5 +18,5 @@ async def livez_health_check():
 
 @router.get("/readyz", response_class=JSONResponse)
 async def database_health_check(session: SessionDep):
-    """Health check that verifies database connectivity."""
+    """Health check that verifies database connectivity and reports pool usage."""
     return await health_check(session=session)
@@ -1,6 +1,15 @@
 from fastai.agents.core import create_agent, get_usage_limits
 from fastai.agents.dependencies import AgentDeps
-from fastai.agents.schemas import ChatRequest, ChatResponse, ChatUsage
+from fastai.agents.schemas import (
+    ChatRequest,
+    ChatResponse,
+    ChatStreamError,
+    ChatStreamStart,
+    ChatStreamToken,
+    ChatStreamToolCall,
+    ChatStreamToolResult,
+    ChatUsage,
+)
 from fastai.agents.settings import AgentSettings
 
 __all__ = [
@@ -8,6 +17,11 @@ __all__ = [
     "AgentSettings",
     "ChatRequest",
     "ChatResponse",
+    "ChatStreamError",
+    "ChatStreamStart",
+    "ChatStreamToken",
+    "ChatStreamToolCall",
+    "ChatStreamToolResult",
     "ChatUsage",
     "create_agent",
     "get_usage_limits",
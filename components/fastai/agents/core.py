@@ -1,3 +1,4 @@
+from collections.abc import Sequence
 from datetime import datetime, timezone
 
 import structlog.stdlib
@@ -6,15 +7,17 @@ from pydantic_ai.messages import (
     ModelMessage,
     ModelRequest,
     ModelResponse,
+    SystemPromptPart,
     TextPart,
     UserPromptPart,
 )
-from sqlmodel.ext.asyncio.session import AsyncSession
 
 from fastai.agents.dependencies import AgentDeps
 from fastai.agents.settings import AgentSettings
 from fastai.chats.models import Message
-from fastai.chats.schemas import MessageRole
+from fastai.chats.schemas import MessageBase, MessageRead, MessageRole
+from fastai.database.routing import create_session
+from fastai.utils.tokens import approximate_token_count
 
 logger = structlog.stdlib.get_logger(__name__)
 
@@ -33,6 +36,14 @@ let the user know.
 Be concise, accurate, and helpful.\
 """
 
+SUMMARY_INSTRUCTIONS = """\
+You maintain a running summary of a conversation between a user and an AI \
+assistant. Given the current summary and the messages that follow it, \
+write an updated summary that keeps facts, decisions, open questions and \
+user preferences needed to continue the conversation. Be concise and write \
+only the summary.\
+"""
+
 
 def create_agent(settings: AgentSettings) -> Agent[AgentDeps, str]:
     """Create and configure the chat agent.
@@ -61,6 +72,27 @@ def create_agent(settings: AgentSettings) -> Agent[AgentDeps, str]:
     return agent
 
 
+def create_summary_agent(settings: AgentSettings) -> Agent[None, str]:
+    """Create the agent that maintains rolling conversation summaries.
+
+    Args:
+        settings: Agent configuration settings.
+
+    Returns:
+        A tool-less PydanticAI agent using the chat model.
+    """
+    return Agent[None, str](
+        model=settings.model,
+        output_type=str,
+        instructions=SUMMARY_INSTRUCTIONS,
+        model_settings=ModelSettings(
+            temperature=0.0,
+            max_tokens=settings.summary_max_tokens,
+            timeout=settings.timeout,
+        ),
+    )
+
+
 def _register_tools(agent: Agent[AgentDeps, str]) -> None:
     """Register all tools with the agent."""
 
@@ -83,9 +115,10 @@ def _register_tools(agent: Agent[AgentDeps, str]) -> None:
 
         Args:
             query: A natural language description of what to search for.
+                Include any exact names, identifiers or error codes verbatim.
         """
-        async with AsyncSession(ctx.deps.engine) as session:
-            results = await ctx.deps.knowledge_base.search(
+        async with create_session(ctx.deps.engine, ctx.deps.replicas) as session:
+            results = await ctx.deps.knowledge_base.search_hybrid(
                 session,
                 query=query,
                 source_type="document",
@@ -99,7 +132,7 @@ def _register_tools(agent: Agent[AgentDeps, str]) -> None:
         for r in results:
             source = r.metadata.get("filename", "unknown") if r.metadata else "unknown"
             lines.append(
-                f"- [Source: {source}] {r.chunk_text} (relevance: {r.score:.2f})"
+                f"- [Source: {source}] {r.chunk_text} (relevance: {r.score:.3f})"
             )
         return "\n".join(lines)
 
@@ -116,7 +149,9 @@ def get_usage_limits(settings: AgentSettings) -> UsageLimits:
     return UsageLimits(request_limit=settings.request_limit)
 
 
-def messages_to_history(messages: list[Message]) -> list[ModelMessage]:
+def messages_to_history(
+    messages: Sequence[Message | MessageRead],
+) -> list[ModelMessage]:
     """Convert persisted Message records to PydanticAI message history.
 
     Each ``Message`` becomes either a ``ModelRequest`` (user) or a
@@ -138,3 +173,142 @@ def messages_to_history(messages: list[Message]) -> list[ModelMessage]:
         else:
             history.append(ModelResponse(parts=[TextPart(content=text)]))
     return history
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of ``text`` for budgeting history.
+
+    Uses :func:`fastai.utils.tokens.approximate_token_count`, the same
+    provider-agnostic estimate the chunker uses by default.
+    """
+    return approximate_token_count(text)
+
+
+def _unsummarized(
+    messages: Sequence[Message | MessageRead], summarized_until: datetime | None
+) -> list[Message | MessageRead]:
+    if summarized_until is None:
+        return list(messages)
+    return [m for m in messages if m.created_at > summarized_until]
+
+
+def select_history_window(
+    messages: Sequence[Message | MessageRead], token_budget: int
+) -> list[Message | MessageRead]:
+    """Select the most recent messages that fit in ``token_budget``.
+
+    The window never starts with an assistant message, so the history sent
+    to the model always opens with a user turn.
+
+    Args:
+        messages: Database message records ordered by creation time.
+        token_budget: Max estimated tokens of the selected messages.
+
+    Returns:
+        A chronological suffix of ``messages``.
+    """
+    start = len(messages)
+    used = 0
+    for index in range(len(messages) - 1, -1, -1):
+        used += estimate_tokens(messages[index].content_text or "")
+        if used > token_budget:
+            break
+        start = index
+    while start < len(messages) and messages[start].role == MessageRole.ASSISTANT:
+        start += 1
+    return list(messages[start:])
+
+
+def build_history(
+    messages: Sequence[Message | MessageRead],
+    *,
+    token_budget: int,
+    summary: str | None = None,
+    summarized_until: datetime | None = None,
+) -> list[ModelMessage]:
+    """Build token-budgeted message history for the next agent run.
+
+    Messages already covered by the conversation's rolling summary are
+    skipped; of the rest, the most recent that fit ``token_budget`` are sent
+    verbatim, preceded by the summary.
+
+    Args:
+        messages: Recent database message records ordered by creation time.
+        token_budget: Max estimated tokens of verbatim messages.
+        summary: The conversation's rolling summary, if any.
+        summarized_until: Creation time of the last summarized message.
+
+    Returns:
+        A list of ``ModelMessage`` objects suitable for
+        ``agent.run(message_history=...)``.
+    """
+    window = select_history_window(
+        _unsummarized(messages, summarized_until), token_budget
+    )
+    history = messages_to_history(window)
+    if summary:
+        summary_part = SystemPromptPart(
+            content=f"Summary of the earlier conversation:\n{summary}"
+        )
+        if history and isinstance(history[0], ModelRequest):
+            history[0].parts = [summary_part, *history[0].parts]
+        else:
+            history.insert(0, ModelRequest(parts=[summary_part]))
+    return history
+
+
+def summary_overflow(
+    messages: Sequence[Message | MessageRead],
+    *,
+    token_budget: int,
+    summarized_until: datetime | None = None,
+) -> list[Message | MessageRead]:
+    """Return the messages that should be folded into the rolling summary.
+
+    Nothing is returned while the unsummarized messages fit ``token_budget``.
+    Once they do not, everything but the most recent half of the budget is
+    returned, so the summary is refreshed every few turns rather than on
+    every turn. The cut falls on a turn boundary: a user message is never
+    summarized apart from its reply, even when the reply is not saved yet.
+
+    Args:
+        messages: Recent database message records ordered by creation time.
+        token_budget: The history token budget.
+        summarized_until: Creation time of the last summarized message.
+
+    Returns:
+        The oldest unsummarized messages, in chronological order.
+    """
+    unsummarized = _unsummarized(messages, summarized_until)
+    if len(select_history_window(unsummarized, token_budget)) == len(unsummarized):
+        return []
+    keep = select_history_window(unsummarized, token_budget // 2)
+    cut = len(unsummarized) - len(keep)
+    while cut > 0 and unsummarized[cut - 1].role == MessageRole.USER:
+        cut -= 1
+    return unsummarized[:cut]
+
+
+async def summarize_messages(
+    agent: Agent[None, str],
+    messages: Sequence[MessageBase],
+    previous_summary: str | None = None,
+) -> str:
+    """Fold ``messages`` into ``previous_summary`` with the summary agent.
+
+    Args:
+        agent: An agent created by :func:`create_summary_agent`.
+        messages: Messages to add to the summary, oldest first.
+        previous_summary: The current rolling summary, if any.
+
+    Returns:
+        The updated summary.
+    """
+    transcript = "\n".join(
+        f"{msg.role.value}: {msg.content_text or ''}" for msg in messages
+    )
+    result = await agent.run(
+        f"Current summary:\n{previous_summary or '(none)'}\n\n"
+        f"Messages to add:\n{transcript}"
+    )
+    return result.output
@@ -3,6 +3,7 @@ from dataclasses import dataclass
 from sqlalchemy.ext.asyncio import AsyncEngine
 
 from fastai.agents.settings import AgentSettings
+from fastai.database.routing import ReadReplicas
 from fastai.embeddings.core import KnowledgeBase
 
 
@@ -10,9 +11,9 @@ from fastai.embeddings.core import KnowledgeBase
 class AgentDeps:
     """Dependencies injected into the agent at runtime.
 
-    Provides access to the database engine, agent settings, and knowledge
-    base for use in tools and dynamic instructions via
-    ``RunContext[AgentDeps]``.
+    Provides access to the database engine (and its read replicas, if
+    any), agent settings, and knowledge base for use in tools and dynamic
+    instructions via ``RunContext[AgentDeps]``.
 
     Tools receive the engine rather than a shared session because
     PydanticAI may call multiple tools concurrently, and SQLAlchemy
@@ -22,3 +23,4 @@ class AgentDeps:
     engine: AsyncEngine
     settings: AgentSettings
     knowledge_base: KnowledgeBase
+    replicas: ReadReplicas | None = None
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import uuid
+from typing import Any
 
 from pydantic import BaseModel, Field
 
@@ -39,3 +40,40 @@ class ChatResponse(BaseModel):
         description="The conversation this message belongs to.",
     )
     usage: ChatUsage | None = Field(default=None, description="Token usage statistics.")
+
+
+# ── Streaming events (``POST /chat/stream``) ──
+
+
+class ChatStreamStart(BaseModel):
+    """First event of a chat stream."""
+
+    conversation_id: uuid.UUID
+
+
+class ChatStreamToken(BaseModel):
+    """A piece of assistant text, in generation order."""
+
+    content: str
+
+
+class ChatStreamToolCall(BaseModel):
+    """The agent is calling a tool."""
+
+    tool_name: str
+    tool_call_id: str
+    args: dict[str, Any]
+
+
+class ChatStreamToolResult(BaseModel):
+    """A tool call finished."""
+
+    tool_name: str
+    tool_call_id: str
+    content: str
+
+
+class ChatStreamError(BaseModel):
+    """The agent run failed; the stream ends after this event."""
+
+    detail: str
@@ -44,3 +44,29 @@ class AgentSettings(FastAISettings):
         gt=0,
         description="Request timeout in seconds.",
     )
+    history_max_messages: int = Field(
+        default=100,
+        gt=0,
+        description="Most recent messages loaded per turn to build history from.",
+    )
+    history_cache_size: int = Field(
+        default=1000,
+        ge=0,
+        description=(
+            "Conversations whose recent history is cached in-process. "
+            "0 disables the cache."
+        ),
+    )
+    history_token_budget: int = Field(
+        default=8000,
+        gt=0,
+        description=(
+            "Estimated tokens of verbatim history sent per turn. Older messages "
+            "are folded into the conversation's rolling summary."
+        ),
+    )
+    summary_max_tokens: int = Field(
+        default=512,
+        gt=0,
+        description="Maximum tokens of a conversation's rolling summary.",
+    )
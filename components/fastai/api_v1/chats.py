@@ -1,25 +1,62 @@
 import uuid
+from collections.abc import AsyncIterator
 
+import anyio
 import structlog.stdlib
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, HTTPException, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from pydantic_ai import Agent, AgentRunResult, AgentRunResultEvent
+from pydantic_ai.messages import (
+    FunctionToolCallEvent,
+    FunctionToolResultEvent,
+    ModelMessage,
+    PartDeltaEvent,
+    PartStartEvent,
+    TextPart,
+    TextPartDelta,
+    ToolReturnPart,
+)
+from pydantic_ai.usage import RunUsage
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from fastai.agents.core import get_usage_limits, messages_to_history
+from fastai.agents.core import (
+    build_history,
+    get_usage_limits,
+    summarize_messages,
+    summary_overflow,
+)
 from fastai.agents.dependencies import AgentDeps
-from fastai.agents.schemas import ChatRequest, ChatResponse, ChatUsage
+from fastai.agents.schemas import (
+    ChatRequest,
+    ChatResponse,
+    ChatStreamError,
+    ChatStreamStart,
+    ChatStreamToken,
+    ChatStreamToolCall,
+    ChatStreamToolResult,
+    ChatUsage,
+)
+from fastai.agents.settings import AgentSettings
 from fastai.api_v1.dependencies import (
     AgentDep,
     AgentSettingsDep,
     CurrentUserDep,
+    HistoryCacheDep,
     KnowledgeBaseDep,
+    SummaryAgentDep,
 )
+from fastai.chats.cache import HistoryCache
 from fastai.chats.models import Conversation, Message
 from fastai.chats.schemas import (
     ConversationCreate,
-    ConversationUpdate,
     MessageCreate,
+    MessageRead,
     MessageRole,
 )
-from fastai.utils.dependencies import EngineDep, SessionDep
+from fastai.database.core import release_connection
+from fastai.utils.dependencies import EngineDep, ReadReplicasDep, SessionDep
 
 logger = structlog.stdlib.get_logger(__name__)
 
@@ -36,6 +73,141 @@ def _auto_title(text: str) -> str:
     return title
 
 
+def _sse(event: str, data: BaseModel) -> str:
+    """Encode one server-sent event."""
+    return f"event: {event}\ndata: {data.model_dump_json()}\n\n"
+
+
+def _chat_usage(run_usage: RunUsage) -> ChatUsage:
+    return ChatUsage(
+        input_tokens=run_usage.input_tokens,
+        output_tokens=run_usage.output_tokens,
+        requests=run_usage.requests,
+    )
+
+
+async def _load_conversation(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    conversation_id: uuid.UUID | None,
+    history_limit: int,
+    history_cache: HistoryCache,
+) -> tuple[Conversation, list[MessageRead]]:
+    """Load the user's conversation and its recent history.
+
+    Without a ``conversation_id`` a new, not yet persisted conversation is
+    returned; it is inserted together with its first messages. For a cached
+    conversation only the conversation row and its newest message time are
+    read; otherwise conversation and history are loaded in one query.
+    """
+    if conversation_id is None:
+        conversation = Conversation.model_validate(ConversationCreate(user_id=user_id))
+        history_cache.put(conversation.id, [])
+        return conversation, []
+
+    if conversation_id in history_cache:
+        found = await Conversation.get_with_last_message_at(
+            session, conversation_id, user_id=user_id
+        )
+        if found is None:
+            history_cache.invalidate(conversation_id)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conversation not found",
+            )
+        conversation, last_message_at = found
+        cached = history_cache.get(conversation_id, last_message_at)
+        if cached is not None:
+            return conversation, cached
+
+    loaded = await Conversation.get_with_recent_messages(
+        session, conversation_id, user_id=user_id, limit=history_limit
+    )
+    if loaded is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found",
+        )
+    conversation, messages = loaded
+    history = [MessageRead.model_validate(msg) for msg in messages]
+    history_cache.put(conversation_id, history)
+    return conversation, history
+
+
+def _prepare_history(
+    conversation: Conversation,
+    existing_messages: list[MessageRead],
+    user_message: Message,
+    settings: AgentSettings,
+    engine: AsyncEngine,
+    summary_agent: Agent[None, str],
+    background_tasks: BackgroundTasks,
+) -> list[ModelMessage]:
+    """Build the token-budgeted history for this turn.
+
+    When older messages no longer fit the budget, a summary refresh is
+    scheduled to run after the response has been sent.
+    """
+    history = build_history(
+        existing_messages,
+        token_budget=settings.history_token_budget,
+        summary=conversation.summary,
+        summarized_until=conversation.summarized_until,
+    )
+    overflow = summary_overflow(
+        [*existing_messages, user_message],
+        token_budget=settings.history_token_budget,
+        summarized_until=conversation.summarized_until,
+    )
+    if overflow:
+        background_tasks.add_task(
+            _refresh_summary,
+            engine,
+            summary_agent,
+            conversation.id,
+            conversation.summary,
+            # Copied now: committing the turn expires the ORM instances
+            [MessageRead.model_validate(msg) for msg in overflow],
+        )
+    return history
+
+
+def _new_message(
+    conversation_id: uuid.UUID, role: MessageRole, content_text: str
+) -> Message:
+    return Message.model_validate(
+        MessageCreate(
+            conversation_id=conversation_id, role=role, content_text=content_text
+        )
+    )
+
+
+async def _refresh_summary(
+    engine: AsyncEngine,
+    summary_agent: Agent[None, str],
+    conversation_id: uuid.UUID,
+    previous_summary: str | None,
+    messages: list[MessageRead],
+) -> None:
+    try:
+        summary = await summarize_messages(summary_agent, messages, previous_summary)
+        async with AsyncSession(engine) as session:
+            await Conversation.update_summary(
+                session, conversation_id, summary, messages[-1].created_at
+            )
+    except Exception:
+        logger.exception(
+            "Failed to refresh conversation summary",
+            conversation_id=str(conversation_id),
+        )
+        return
+    logger.info(
+        "Conversation summary refreshed",
+        conversation_id=str(conversation_id),
+        messages_summarized=len(messages),
+    )
+
+
 @router.post("", response_model=ChatResponse)
 async def chat(
     user: CurrentUserDep,
@@ -44,13 +216,18 @@ async def chat(
     settings: AgentSettingsDep,
     kb: KnowledgeBaseDep,
     engine: EngineDep,
+    replicas: ReadReplicasDep,
     session: SessionDep,
+    summary_agent: SummaryAgentDep,
+    history_cache: HistoryCacheDep,
+    background_tasks: BackgroundTasks,
 ) -> ChatResponse:
     """Send a message to the AI chat agent and receive a response.
 
     If ``conversation_id`` is provided the message is appended to that
-    conversation and the full history is sent to the model.  Otherwise, a
-    new conversation is created automatically.
+    conversation and its most recent history is sent to the model.
+    Otherwise, a new conversation is created automatically. The user
+    message, assistant message and title are saved together after the run.
     """
     logger.info(
         "Chat request received",
@@ -58,56 +235,37 @@ async def chat(
         conversation_id=str(chat_request.conversation_id),
     )
 
-    # ── Load or create conversation ──
-    conversation: Conversation
-    needs_title: bool
-    if chat_request.conversation_id is not None:
-        conv = await Conversation.get(
-            session,
-            chat_request.conversation_id,
-            user_id=user.id,  # pyright: ignore[reportCallIssue]
-        )
-        if conv is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Conversation not found",
-            )
-        conversation = conv
-        needs_title = conv.title is None
-    else:
-        conversation = await Conversation.create(
-            session,
-            ConversationCreate(user_id=user.id),
-        )
-        # Newly created conversations always need a title
-        needs_title = True
-
-    assert conversation.id is not None
-    conversation_id: uuid.UUID = conversation.id
-
-    # ── Build message history from persisted messages ──
-    existing_messages = await Message.get_by_conversation(
+    # ── Load conversation and history (one query) ──
+    conversation, existing_messages = await _load_conversation(
         session,
-        conversation_id=conversation_id,
-        user_id=user.id,  # pyright: ignore[reportCallIssue]
+        user.id,
+        chat_request.conversation_id,
+        settings.history_max_messages,
+        history_cache,
     )
-    message_history = messages_to_history(existing_messages)
-
-    # ── Persist the user message ──
-    await Message.create(
-        session,
-        MessageCreate(
-            conversation_id=conversation_id,
-            role=MessageRole.USER,
-            content_text=chat_request.message,
-        ),
+    conversation_id: uuid.UUID = conversation.id
+    needs_title = conversation.title is None
+    user_message = _new_message(conversation_id, MessageRole.USER, chat_request.message)
+    message_history = _prepare_history(
+        conversation,
+        existing_messages,
+        user_message,
+        settings,
+        engine,
+        summary_agent,
+        background_tasks,
     )
 
+    # Don't hold a pooled connection while the model runs; save_turn
+    # checks one out again.
+    await release_connection(session)
+
     # ── Run the agent ──
     deps = AgentDeps(
         engine=engine,
         settings=settings,
         knowledge_base=kb,
+        replicas=replicas,
     )
     usage_limits = get_usage_limits(settings)
 
@@ -120,32 +278,21 @@ async def chat(
 
     assistant_text: str = result.output
 
-    # ── Persist the assistant response ──
-    await Message.create(
+    # ── Persist the turn (and the title on first message) in one transaction ──
+    turn = [
+        user_message,
+        _new_message(conversation_id, MessageRole.ASSISTANT, assistant_text),
+    ]
+    turn_records = [MessageRead.model_validate(msg) for msg in turn]
+    await conversation.save_turn(
         session,
-        MessageCreate(
-            conversation_id=conversation_id,
-            role=MessageRole.ASSISTANT,
-            content_text=assistant_text,
-        ),
+        turn,
+        title=_auto_title(chat_request.message) if needs_title else None,
     )
-
-    # ── Auto-title on first message ──
-    if needs_title:
-        # Re-fetch the conversation since prior commits expired the object
-        conversation = await Conversation.get(session, conversation_id, user_id=user.id)  # pyright: ignore[reportCallIssue, reportAssignmentType]
-        await conversation.update(
-            session,
-            ConversationUpdate(title=_auto_title(chat_request.message)),
-        )
+    history_cache.append(conversation_id, turn_records)
 
     # ── Build response ──
-    run_usage = result.usage()
-    usage = ChatUsage(
-        input_tokens=run_usage.input_tokens,
-        output_tokens=run_usage.output_tokens,
-        requests=run_usage.requests,
-    )
+    usage = _chat_usage(result.usage())
 
     logger.info(
         "Chat response generated",
@@ -161,3 +308,200 @@ async def chat(
         conversation_id=conversation_id,
         usage=usage,
     )
+
+
+@router.post("/stream", response_class=StreamingResponse)
+async def chat_stream(
+    user: CurrentUserDep,
+    chat_request: ChatRequest,
+    agent: AgentDep,
+    settings: AgentSettingsDep,
+    kb: KnowledgeBaseDep,
+    engine: EngineDep,
+    replicas: ReadReplicasDep,
+    session: SessionDep,
+    summary_agent: SummaryAgentDep,
+    history_cache: HistoryCacheDep,
+    background_tasks: BackgroundTasks,
+) -> StreamingResponse:
+    """Send a message to the AI chat agent and stream the response as SSE.
+
+    Events, each with a JSON ``data`` payload:
+
+    - ``start``: :class:`ChatStreamStart`, sent first
+    - ``token``: :class:`ChatStreamToken`, assistant text as it is generated
+    - ``tool_call`` / ``tool_result``: :class:`ChatStreamToolCall` and
+      :class:`ChatStreamToolResult`
+    - ``done``: the final :class:`ChatResponse`, sent once the assistant
+      message is saved
+    - ``error``: :class:`ChatStreamError` if the run fails
+
+    Conversation handling matches ``POST /chat``. If the client disconnects
+    mid-answer, the text generated so far is saved as the assistant message.
+    """
+    logger.info(
+        "Chat stream request received",
+        message_length=len(chat_request.message),
+        conversation_id=str(chat_request.conversation_id),
+    )
+
+    conversation, existing_messages = await _load_conversation(
+        session,
+        user.id,
+        chat_request.conversation_id,
+        settings.history_max_messages,
+        history_cache,
+    )
+    conversation_id: uuid.UUID = conversation.id
+    user_message = _new_message(conversation_id, MessageRole.USER, chat_request.message)
+    message_history = _prepare_history(
+        conversation,
+        existing_messages,
+        user_message,
+        settings,
+        engine,
+        summary_agent,
+        background_tasks,
+    )
+
+    # Save the user message up front so the conversation exists while the
+    # answer streams
+    user_record = MessageRead.model_validate(user_message)
+    await conversation.save_turn(
+        session,
+        [user_message],
+        title=_auto_title(chat_request.message) if conversation.title is None else None,
+    )
+    history_cache.append(conversation_id, [user_record])
+
+    return StreamingResponse(
+        _stream_chat_events(
+            agent,
+            chat_request.message,
+            message_history,
+            AgentDeps(
+                engine=engine, settings=settings, knowledge_base=kb, replicas=replicas
+            ),
+            conversation_id,
+            history_cache,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _save_assistant_message(
+    engine: AsyncEngine,
+    history_cache: HistoryCache,
+    conversation_id: uuid.UUID,
+    text: str,
+) -> None:
+    message = _new_message(conversation_id, MessageRole.ASSISTANT, text)
+    record = MessageRead.model_validate(message)
+    # The request session is not usable once the response is streaming
+    async with AsyncSession(engine) as session:
+        session.add(message)
+        await session.commit()
+    history_cache.append(conversation_id, [record])
+
+
+async def _stream_chat_events(
+    agent: Agent[AgentDeps, str],
+    prompt: str,
+    message_history: list[ModelMessage],
+    deps: AgentDeps,
+    conversation_id: uuid.UUID,
+    history_cache: HistoryCache,
+) -> AsyncIterator[str]:
+    """Run the agent and translate its stream into SSE events."""
+    settings: AgentSettings = deps.settings
+    generated: list[str] = []
+    result: AgentRunResult[str] | None = None
+    yield _sse("start", ChatStreamStart(conversation_id=conversation_id))
+
+    try:
+        async for event in agent.run_stream_events(
+            prompt,
+            deps=deps,
+            usage_limits=get_usage_limits(settings),
+            message_history=message_history,
+        ):
+            token: str | None = None
+            if isinstance(event, PartStartEvent) and isinstance(event.part, TextPart):
+                token = event.part.content
+            elif isinstance(event, PartDeltaEvent) and isinstance(
+                event.delta, TextPartDelta
+            ):
+                token = event.delta.content_delta
+            elif isinstance(event, FunctionToolCallEvent):
+                yield _sse(
+                    "tool_call",
+                    ChatStreamToolCall(
+                        tool_name=event.part.tool_name,
+                        tool_call_id=event.part.tool_call_id,
+                        args=event.part.args_as_dict(),
+                    ),
+                )
+            elif isinstance(event, FunctionToolResultEvent):
+                part = event.result
+                yield _sse(
+                    "tool_result",
+                    ChatStreamToolResult(
+                        tool_name=part.tool_name or "",
+                        tool_call_id=part.tool_call_id,
+                        content=part.model_response_str()
+                        if isinstance(part, ToolReturnPart)
+                        else part.model_response(),
+                    ),
+                )
+            elif isinstance(event, AgentRunResultEvent):
+                result = event.result
+
+            if token:
+                generated.append(token)
+                yield _sse("token", ChatStreamToken(content=token))
+    except Exception:
+        logger.exception("Chat stream failed", conversation_id=str(conversation_id))
+        if generated:
+            await _save_assistant_message(
+                deps.engine, history_cache, conversation_id, "".join(generated)
+            )
+        yield _sse("error", ChatStreamError(detail="The agent run failed."))
+        return
+    except BaseException:
+        # Client disconnected: keep the partial answer
+        if generated:
+            with anyio.CancelScope(shield=True):
+                await _save_assistant_message(
+                    deps.engine, history_cache, conversation_id, "".join(generated)
+                )
+        logger.info(
+            "Chat stream cancelled",
+            conversation_id=str(conversation_id),
+            partial_length=sum(map(len, generated)),
+        )
+        raise
+
+    assert result is not None
+    assistant_text: str = result.output
+    await _save_assistant_message(
+        deps.engine, history_cache, conversation_id, assistant_text
+    )
+
+    usage = _chat_usage(result.usage())
+    logger.info(
+        "Chat stream completed",
+        conversation_id=str(conversation_id),
+        input_tokens=usage.input_tokens,
+        output_tokens=usage.output_tokens,
+        requests=usage.requests,
+    )
+    yield _sse(
+        "done",
+        ChatResponse(
+            message=assistant_text,
+            model=settings.model,
+            conversation_id=conversation_id,
+            usage=usage,
+        ),
+    )
@@ -1,9 +1,15 @@
 import uuid
 
+import structlog.stdlib
 from fastapi import APIRouter, HTTPException, Query, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from fastai.api_v1.dependencies import CurrentUserDep
+from fastai.api_v1.dependencies import (
+    CurrentUserDep,
+    EventPublisherDep,
+    HistoryCacheDep,
+)
+from fastai.chats.cache import HistoryCache
 from fastai.chats.models import Conversation, Message
 from fastai.chats.schemas import (
     ConversationBase,
@@ -13,8 +19,12 @@ from fastai.chats.schemas import (
     MessageCreate,
     MessageRead,
 )
+from fastai.events.core import EventPublisher
+from fastai.events.schemas import ConversationHistoryInvalidated
 from fastai.utils.dependencies import SessionDep
 
+logger = structlog.stdlib.get_logger(__name__)
+
 router = APIRouter(prefix="/conversations", tags=["Conversations"])
 
 
@@ -31,6 +41,26 @@ async def _get_user_conversation(
     return conv
 
 
+async def _invalidate_history(
+    history_cache: HistoryCache,
+    publisher: EventPublisher | None,
+    conv_id: uuid.UUID,
+) -> None:
+    """Drop cached history here and, when possible, in other api processes."""
+    history_cache.invalidate(conv_id)
+    if publisher is None:
+        return
+    try:
+        await publisher.publish_history_invalidated(
+            ConversationHistoryInvalidated(conversation_id=conv_id)
+        )
+    except Exception:
+        logger.exception(
+            "Failed to publish conversation.history.invalidated event",
+            conversation_id=str(conv_id),
+        )
+
+
 # ── Conversations ──
 
 
@@ -85,11 +115,14 @@ async def update_conversation(
 async def delete_conversation(
     session: SessionDep,
     current_user: CurrentUserDep,
+    history_cache: HistoryCacheDep,
+    publisher: EventPublisherDep,
     conversation_id: uuid.UUID,
 ) -> None:
     """Delete a conversation and all its messages (cascaded)."""
     conv = await _get_user_conversation(session, conversation_id, current_user.id)
     await conv.delete(session)
+    await _invalidate_history(history_cache, publisher, conversation_id)
 
 
 # ── Messages ──
@@ -148,6 +181,7 @@ async def get_message(
 async def create_message(
     session: SessionDep,
     current_user: CurrentUserDep,
+    history_cache: HistoryCacheDep,
     conversation_id: uuid.UUID,
     msg_in: MessageCreate,
 ) -> Message:
@@ -158,7 +192,9 @@ async def create_message(
             status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
             detail="conversation_id in body does not match URL",
         )
-    return await Message.create(session, msg_in)
+    msg = await Message.create(session, msg_in)
+    history_cache.append(conversation_id, [MessageRead.model_validate(msg)])
+    return msg
 
 
 @router.delete(
@@ -169,6 +205,8 @@ async def create_message(
 async def delete_message(
     session: SessionDep,
     current_user: CurrentUserDep,
+    history_cache: HistoryCacheDep,
+    publisher: EventPublisherDep,
     conversation_id: uuid.UUID,
     message_id: uuid.UUID,
 ) -> None:
@@ -180,3 +218,4 @@ async def delete_message(
             detail="Message not found",
         )
     await msg.delete(session)
+    await _invalidate_history(history_cache, publisher, conversation_id)
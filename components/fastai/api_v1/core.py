@@ -3,24 +3,32 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic_ai import Agent
 from sqlalchemy.ext.asyncio import AsyncEngine
 
-from fastai.agents.core import create_agent
+from fastai.agents.core import create_agent, create_summary_agent
 from fastai.agents.dependencies import AgentDeps
 from fastai.agents.settings import AgentSettings
 from fastai.api_v1 import authentication, chats, conversations, health
 from fastai.auth.settings import AuthSettings
 from fastai.auth.token_service import TokenService
+from fastai.chats.cache import HistoryCache
+from fastai.database.routing import ReadReplicas
 from fastai.embeddings.core import KnowledgeBase
 from fastai.embeddings.providers import create_embedder
 from fastai.embeddings.settings import EmbeddingSettings
+from fastai.events.core import EventPublisher
+from fastai.users.cache import principal_cache
 
 
 def init_api_v1(
     engine: AsyncEngine,
     agent: Agent[AgentDeps, str] | None = None,
+    summary_agent: Agent[None, str] | None = None,
     agent_settings: AgentSettings | None = None,
     auth_settings: AuthSettings | None = None,
     embedding_settings: EmbeddingSettings | None = None,
     knowledge_base: KnowledgeBase | None = None,
+    history_cache: HistoryCache | None = None,
+    event_publisher: EventPublisher | None = None,
+    read_replicas: ReadReplicas | None = None,
 ) -> FastAPI:
     """Create the API v1 FastAPI sub-application.
 
@@ -33,6 +41,8 @@ def init_api_v1(
         engine: The async database engine.
         agent: An optional pre-configured agent instance. If not provided,
             one will be created from ``agent_settings``.
+        summary_agent: An optional agent for rolling conversation summaries.
+            If not provided, one will be created from ``agent_settings``.
         agent_settings: Settings for the AI agent. Defaults will be loaded
             from environment variables if not provided.
         auth_settings: JWT authentication settings. Defaults will be loaded
@@ -40,6 +50,11 @@ def init_api_v1(
         embedding_settings: Settings for the embedding service. Defaults
             will be loaded from environment variables if not provided.
          knowledge_base: class to interact with previous knowledge/documents
+        history_cache: An optional conversation history cache. If not
+            provided, one will be created from ``agent_settings``.
+        event_publisher: An optional, already registered publisher used to
+            invalidate cached history in other api processes.
+        read_replicas: Optional read replicas for listing and search queries.
     """
     settings = agent_settings or AgentSettings()
     auth = auth_settings or AuthSettings()  # pyright: ignore[reportCallIssue]  # reads secret_key from env
@@ -61,11 +76,18 @@ def init_api_v1(
     )
 
     app.state.db_engine = engine
+    app.state.read_replicas = read_replicas
     app.state.agent_settings = settings
     app.state.agent = agent or create_agent(settings)
+    app.state.summary_agent = summary_agent or create_summary_agent(settings)
     app.state.auth_settings = auth
     app.state.token_service = TokenService(auth)
+    app.state.principal_cache = principal_cache
     app.state.knowledge_base = kb
+    app.state.history_cache = history_cache or HistoryCache(
+        settings.history_cache_size, settings.history_max_messages
+    )
+    app.state.event_publisher = event_publisher
 
     app.include_router(authentication.router)
     app.include_router(health.router)
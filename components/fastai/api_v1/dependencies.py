@@ -1,3 +1,4 @@
+import time
 import uuid
 from typing import Annotated
 
@@ -5,14 +6,19 @@ import structlog.contextvars
 from fastapi import Depends, HTTPException, Request, Security, status
 from fastapi.security import OAuth2PasswordBearer, SecurityScopes
 from pydantic_ai import Agent
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from fastai.agents.dependencies import AgentDeps
 from fastai.agents.settings import AgentSettings
 from fastai.auth.settings import AuthSettings
 from fastai.auth.token_service import TokenError, TokenService
+from fastai.chats.cache import HistoryCache
+from fastai.database.routing import set_read_your_writes_key
 from fastai.embeddings.core import KnowledgeBase
+from fastai.events.core import EventPublisher
+from fastai.users.cache import PrincipalCache
 from fastai.users.models import User
-from fastai.users.schemas import AuthenticatedUser
+from fastai.users.schemas import AuthenticatedUser, UserPrincipal
 from fastai.utils.dependencies import SessionDep
 
 security_scheme = OAuth2PasswordBearer(
@@ -30,6 +36,12 @@ def get_agent(request: Request) -> Agent[AgentDeps, str]:
     return agent
 
 
+def get_summary_agent(request: Request) -> Agent[None, str]:
+    """Retrieve the conversation summary agent from application state."""
+    agent: Agent[None, str] = request.app.state.summary_agent
+    return agent
+
+
 def get_agent_settings(request: Request) -> AgentSettings:
     """Retrieve agent settings from application state."""
     settings: AgentSettings = request.app.state.agent_settings
@@ -42,6 +54,24 @@ def get_knowledge_base(request: Request) -> KnowledgeBase:
     return kb
 
 
+def get_history_cache(request: Request) -> HistoryCache:
+    """Retrieve the conversation history cache from application state."""
+    cache: HistoryCache = request.app.state.history_cache
+    return cache
+
+
+def get_event_publisher(request: Request) -> EventPublisher | None:
+    """Retrieve the event publisher from application state, if configured."""
+    publisher: EventPublisher | None = request.app.state.event_publisher
+    return publisher
+
+
+def get_principal_cache(request: Request) -> PrincipalCache:
+    """Retrieve the authenticated-user cache from application state."""
+    cache: PrincipalCache = request.app.state.principal_cache
+    return cache
+
+
 def get_auth_settings(request: Request) -> AuthSettings:
     """Retrieve auth settings from application state."""
     settings: AuthSettings = request.app.state.auth_settings
@@ -54,38 +84,44 @@ def get_token_service(request: Request) -> TokenService:
     return token_service
 
 
+async def _load_principal(
+    session: AsyncSession,
+    cache: PrincipalCache,
+    user_id: uuid.UUID,
+    ttl: float,
+) -> UserPrincipal | None:
+    """Resolve a user's principal from the cache, falling back to the database.
+
+    The session only checks out a connection on a cache miss.
+    """
+    principal = cache.get(user_id)
+    if principal is None:
+        principal = await User.get_principal(session, user_id)
+        if principal is not None:
+            cache.put(principal, ttl=ttl)
+    return principal
+
+
 async def get_current_user(
     session: SessionDep,
     token_service: TokenService = Depends(get_token_service),
     token: str | None = Depends(security_scheme),
+    principal_cache: PrincipalCache = Depends(get_principal_cache),
+    auth_settings: AuthSettings = Depends(get_auth_settings),
 ) -> AuthenticatedUser:
     """Extract and validate the access token from the Authorization header,
-    then return the corresponding user."""
-    if not token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing access token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    then return the corresponding user.
 
-    try:
-        payload = token_service.decode_access_token(token=token)
-    except TokenError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=exc.detail,
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    user = await User.get(session, uuid.UUID(payload.sub))
-    if user is None or not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found or inactive.",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    return AuthenticatedUser.model_validate(user)
+    Equivalent to :func:`get_scoped_user` without required scopes.
+    """
+    return await get_scoped_user(
+        SecurityScopes(),
+        session,
+        token_service,
+        token,
+        principal_cache,
+        auth_settings,
+    )
 
 
 async def get_scoped_user(
@@ -93,12 +129,38 @@ async def get_scoped_user(
     session: SessionDep,
     token_service: TokenService = Depends(get_token_service),
     token: str | None = Depends(security_scheme),
+    principal_cache: PrincipalCache = Depends(get_principal_cache),
+    auth_settings: AuthSettings = Depends(get_auth_settings),
 ) -> AuthenticatedUser:
     """Extract and validate the access token, checking OAuth2 scopes.
 
     When used via ``Security(..., scopes=[...])``, the required scopes are
-    checked against the scopes embedded in the JWT.
+    checked against the scopes embedded in the JWT. The user's status comes
+    from the principal cache when possible, so most requests authenticate
+    without touching the database.
     """
+    start = time.perf_counter()
+    try:
+        return await _authorize(
+            security_scopes,
+            session,
+            token_service,
+            token,
+            principal_cache,
+            auth_settings,
+        )
+    finally:
+        principal_cache.stats.record_auth(time.perf_counter() - start)
+
+
+async def _authorize(
+    security_scopes: SecurityScopes,
+    session: AsyncSession,
+    token_service: TokenService,
+    token: str | None,
+    principal_cache: PrincipalCache,
+    auth_settings: AuthSettings,
+) -> AuthenticatedUser:
     authenticate_value = "Bearer"
     if security_scopes.scopes:
         authenticate_value += f' scope="{security_scopes.scope_str}"'
@@ -119,8 +181,13 @@ async def get_scoped_user(
             headers={"WWW-Authenticate": authenticate_value},
         )
 
-    user = await User.get(session, uuid.UUID(payload.sub))
-    if user is None or not user.is_active:
+    principal = await _load_principal(
+        session,
+        principal_cache,
+        uuid.UUID(payload.sub),
+        auth_settings.principal_cache_ttl_seconds,
+    )
+    if principal is None or not principal.can_authenticate:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found or inactive.",
@@ -135,13 +202,18 @@ async def get_scoped_user(
                 headers={"WWW-Authenticate": authenticate_value},
             )
 
-    structlog.contextvars.bind_contextvars(actor=user.id)
-    return AuthenticatedUser.model_validate(user)
+    structlog.contextvars.bind_contextvars(actor=principal.id)
+    # Keep this user's replica reads on the primary right after their writes
+    set_read_your_writes_key(session, principal.id)
+    return AuthenticatedUser(id=principal.id, is_admin=principal.is_admin)
 
 
 AgentDep = Annotated[Agent[AgentDeps, str], Depends(get_agent)]
+SummaryAgentDep = Annotated[Agent[None, str], Depends(get_summary_agent)]
 AgentSettingsDep = Annotated[AgentSettings, Depends(get_agent_settings)]
 KnowledgeBaseDep = Annotated[KnowledgeBase, Depends(get_knowledge_base)]
+HistoryCacheDep = Annotated[HistoryCache, Depends(get_history_cache)]
+EventPublisherDep = Annotated[EventPublisher | None, Depends(get_event_publisher)]
 AuthSettingsDep = Annotated[AuthSettings, Depends(get_auth_settings)]
 TokenServiceDep = Annotated[TokenService, Depends(get_token_service)]
 CurrentUserDep = Annotated[AuthenticatedUser, Security(get_scoped_user)]
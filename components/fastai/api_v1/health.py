@@ -1,9 +1,16 @@
+from dataclasses import asdict
+from typing import Any
+
 import structlog.stdlib
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
+from starlette.datastructures import State
 from starlette.responses import PlainTextResponse
 
+from fastai.chats.cache import HistoryCache
 from fastai.database.core import health_check
+from fastai.embeddings.core import KnowledgeBase
+from fastai.users.cache import PrincipalCache
 from fastai.utils.dependencies import SessionDep
 
 router = APIRouter(tags=["health"])
@@ -17,7 +24,29 @@ async def livez_health_check():
     return "livez"
 
 
+def cache_stats(state: State) -> dict[str, dict[str, Any]]:
+    """Size and running hit/miss counters of the app's in-process caches."""
+    kb: KnowledgeBase = state.knowledge_base
+    principals: PrincipalCache = state.principal_cache
+    history: HistoryCache = state.history_cache
+    caches = {
+        "embeddings": (len(kb.cache), kb.cache.stats),
+        "query_embeddings": (len(kb.query_cache), kb.query_cache.stats),
+        "principals": (len(principals), principals.stats),
+        "history": (len(history), history.stats),
+    }
+    report = {
+        name: {"size": size, **asdict(stats), "hit_ratio": stats.hit_ratio}
+        for name, (size, stats) in caches.items()
+    }
+    report["principals"]["auth_mean_seconds"] = principals.stats.auth_mean_seconds
+    return report
+
+
 @router.get("/readyz", response_class=JSONResponse)
-async def database_health_check(session: SessionDep):
-    """Health check that verifies database connectivity."""
-    return await health_check(session=session)
+async def database_health_check(request: Request, session: SessionDep):
+    """Health check that verifies database connectivity and reports pool
+    and cache usage."""
+    status = await health_check(session=session)
+    status["caches"] = cache_stats(request.app.state)
+    return status
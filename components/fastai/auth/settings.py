@@ -47,6 +47,15 @@ class AuthSettings(FastAISettings):
         description="Duration of account lockout in minutes after max failed attempts.",
     )
 
+    principal_cache_ttl_seconds: float = Field(
+        default=30.0,
+        ge=0,
+        description=(
+            "How long a user's active/admin status is cached per process when "
+            "verifying access tokens. 0 disables the cache."
+        ),
+    )
+
     # Cookie settings for refresh tokens
     cookie_secure: bool = Field(
         default=True,
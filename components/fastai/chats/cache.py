@@ -0,0 +1,108 @@
+import uuid
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime
+
+from fastai.chats.schemas import MessageRead
+
+
+@dataclass
+class HistoryCacheStats:
+    """Running hit/miss counters for a :class:`HistoryCache`."""
+
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class HistoryCache:
+    """In-process LRU of recent message history, keyed by conversation ID.
+
+    Messages are append-only, so an entry only goes stale when a message is
+    deleted or another process appends to the conversation. Deletes
+    invalidate the entry explicitly; appends elsewhere are caught by
+    :meth:`get`, which requires the creation time of the conversation's
+    newest message to match the cached one.
+
+    Entries are detached :class:`MessageRead` snapshots, safe to share
+    between requests and sessions.
+    """
+
+    def __init__(self, max_size: int, max_messages: int) -> None:
+        self.max_size = max_size
+        self.max_messages = max_messages
+        self.stats = HistoryCacheStats()
+        self._entries: OrderedDict[uuid.UUID, list[MessageRead]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, conversation_id: object) -> bool:
+        return conversation_id in self._entries
+
+    def get(
+        self, conversation_id: uuid.UUID, last_message_at: datetime | None
+    ) -> list[MessageRead] | None:
+        """Return cached history if it is still current, or None.
+
+        Args:
+            conversation_id: The conversation to look up.
+            last_message_at: Creation time of the conversation's newest
+                message in the database, or None if it has none.
+
+        Returns:
+            The cached messages, oldest first, or None on a miss. A stale
+            entry is dropped.
+        """
+        messages = self._entries.get(conversation_id)
+        if messages is None:
+            self.stats.misses += 1
+            return None
+        cached_last = messages[-1].created_at if messages else None
+        if cached_last != last_message_at:
+            del self._entries[conversation_id]
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(conversation_id)
+        self.stats.hits += 1
+        return list(messages)
+
+    def put(self, conversation_id: uuid.UUID, messages: Sequence[MessageRead]) -> None:
+        """Store the most recent history of a conversation, oldest first."""
+        if self.max_size <= 0:
+            return
+        self._entries[conversation_id] = list(messages[-self.max_messages :])
+        self._entries.move_to_end(conversation_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def append(
+        self, conversation_id: uuid.UUID, messages: Sequence[MessageRead]
+    ) -> None:
+        """Append newly saved messages to a cached conversation.
+
+        Does nothing if the conversation is not cached. If the messages are
+        older than the cached tail (e.g. concurrent turns finishing out of
+        order) the entry is dropped instead.
+        """
+        cached = self._entries.get(conversation_id)
+        if cached is None or not messages:
+            return
+        if cached and messages[0].created_at < cached[-1].created_at:
+            del self._entries[conversation_id]
+            return
+        cached.extend(messages)
+        del cached[: -self.max_messages]
+        self._entries.move_to_end(conversation_id)
+
+    def invalidate(self, conversation_id: uuid.UUID) -> None:
+        """Drop a conversation's cached history, if any."""
+        self._entries.pop(conversation_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -1,11 +1,24 @@
 import uuid as _uuid
+from collections.abc import Sequence
 from typing import TYPE_CHECKING, Optional, Self
 
 from pydantic import AwareDatetime
 from sqlalchemy import Enum as SAEnum
-from sqlalchemy import Index
+from sqlalchemy import Index, or_
 from sqlalchemy import text as sa_text
-from sqlmodel import Column, DateTime, Field, Relationship, String, Text, func, select
+from sqlalchemy import update as sa_update
+from sqlalchemy.orm import aliased
+from sqlmodel import (
+    Column,
+    DateTime,
+    Field,
+    Relationship,
+    String,
+    Text,
+    col,
+    func,
+    select,
+)
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel.sql._expression_select_cls import SelectOfScalar
 
@@ -51,6 +64,14 @@ class Conversation(ConversationBase, TimestampMixin, table=True):
     title: str | None = Field(
         default=None, sa_column=Column(String(500), nullable=True)
     )
+    # Rolling summary of messages up to and including summarized_until;
+    # those messages are no longer sent to the model verbatim.
+    summary: str | None = Field(default=None, sa_column=Column(Text, nullable=True))
+    summarized_until: AwareDatetime | None = Field(
+        default=None,
+        sa_type=DateTime(timezone=True),  # pyright: ignore[reportArgumentType]
+        nullable=True,
+    )
 
     # ── Relationships ──
     user: "User" = Relationship(  # noqa: F821
@@ -104,16 +125,136 @@ class Conversation(ConversationBase, TimestampMixin, table=True):
         """Get paginated conversations for a user, newest first.
 
         Does NOT load messages — use Message.get_by_conversation() separately.
+        Served by a read replica when the session routes to one.
         """
         statement = (
             cls._user_query(user_id)
             .order_by(cls.created_at.desc())  # pyright: ignore[reportAttributeAccessIssue]
             .offset(offset)
             .limit(limit)
+            .execution_options(use_replica=True)
         )
         results = await session.exec(statement)
         return list(results.all())
 
+    @classmethod
+    async def get_with_last_message_at(
+        cls, session: AsyncSession, conv_id: _uuid.UUID, *, user_id: _uuid.UUID
+    ) -> tuple["Conversation", AwareDatetime | None] | None:
+        """Load a conversation and the creation time of its newest message.
+
+        The newest message time comes from a single backward probe of the
+        (conversation_id, created_at) index, so this is much cheaper than
+        loading the history when only its freshness needs checking.
+
+        Returns:
+            The conversation and its newest message time (None if it has no
+            messages), or None if the conversation does not exist.
+        """
+        last_message_at = (
+            select(func.max(Message.created_at))
+            .where(Message.conversation_id == cls.id)
+            .scalar_subquery()
+        )
+        statement = select(cls, last_message_at).where(
+            cls.id == conv_id, cls.user_id == user_id
+        )
+        row = (await session.exec(statement)).first()
+        if row is None:
+            return None
+        return row[0], row[1]
+
+    @classmethod
+    async def get_with_recent_messages(
+        cls,
+        session: AsyncSession,
+        conv_id: _uuid.UUID,
+        *,
+        user_id: _uuid.UUID,
+        limit: int = 100,
+    ) -> tuple["Conversation", list["Message"]] | None:
+        """Load a conversation and its latest messages in a single query.
+
+        Args:
+            session: The async database session.
+            conv_id: The conversation ID.
+            user_id: The owning user; other users' conversations are not found.
+            limit: Max number of most recent messages to return.
+
+        Returns:
+            The conversation and up to ``limit`` of its most recent messages in
+            chronological order, or None if the conversation does not exist.
+        """
+        recent = (
+            select(Message)
+            .where(Message.conversation_id == conv_id)
+            .order_by(Message.created_at.desc())  # pyright: ignore[reportAttributeAccessIssue]
+            .limit(limit)
+            .subquery()
+        )
+        recent_message = aliased(Message, recent)
+        statement = (
+            select(cls, recent_message)
+            .outerjoin(recent_message, recent_message.conversation_id == cls.id)  # pyright: ignore[reportArgumentType]
+            .where(cls.id == conv_id, cls.user_id == user_id)
+            .order_by(recent_message.created_at)  # pyright: ignore[reportArgumentType]
+        )
+        rows = (await session.exec(statement)).all()
+        if not rows:
+            return None
+        return rows[0][0], [msg for _, msg in rows if msg is not None]
+
+    async def save_turn(
+        self,
+        session: AsyncSession,
+        messages: Sequence["Message"],
+        *,
+        title: str | None = None,
+    ) -> None:
+        """Persist new messages, and optionally a title, in one transaction.
+
+        Works for a conversation that is not in the database yet, which is
+        inserted alongside its first messages. Nothing is refreshed
+        afterwards, so read any attributes needed later before calling this.
+
+        Args:
+            session: The async database session.
+            messages: Unsaved messages of this conversation, oldest first.
+            title: New title for the conversation, if any.
+        """
+        if title is not None:
+            self.title = title
+        session.add(self)
+        session.add_all(messages)
+        await session.commit()
+
+    @classmethod
+    async def update_summary(
+        cls,
+        session: AsyncSession,
+        conv_id: _uuid.UUID,
+        summary: str,
+        summarized_until: AwareDatetime,
+    ) -> None:
+        """Store a new rolling summary without loading the conversation.
+
+        A summary older than the stored one is ignored, so concurrent
+        refreshes cannot move the summary backwards.
+        """
+        statement = (
+            sa_update(cls)
+            .where(
+                cls.id == conv_id,  # pyright: ignore[reportArgumentType]
+                or_(
+                    col(cls.summarized_until).is_(None),
+                    col(cls.summarized_until) < summarized_until,
+                ),
+            )
+            .values(summary=summary, summarized_until=summarized_until)
+        )
+        await session.exec(statement)  # type: ignore[call-overload]
+        await session.commit()
+
     async def update(
         self, session: AsyncSession, conv_in: ConversationUpdate
     ) -> "Conversation":
@@ -211,13 +352,17 @@ class Message(MessageBase, table=True):
         offset: int = 0,
         limit: int = 100,
     ) -> list["Message"]:
-        """Get messages for a conversation, scoped to the given user."""
+        """Get messages for a conversation, scoped to the given user.
+
+        Served by a read replica when the session routes to one.
+        """
         statement = (
             cls._user_query(user_id)
             .where(cls.conversation_id == conversation_id)
             .order_by(cls.created_at)  # pyright: ignore[reportArgumentType]
             .offset(offset)
             .limit(limit)
+            .execution_options(use_replica=True)
         )
         results = await session.exec(statement)
         return list(results.all())
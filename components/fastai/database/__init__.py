@@ -1,3 +1,26 @@
-from fastai.database.core import PostgresSettings, create_db_engine, destroy_engine
+from fastai.database.core import (
+    PostgresSettings,
+    create_db_engine,
+    create_read_replicas,
+    destroy_engine,
+    release_connection,
+)
+from fastai.database.pool import PoolStats, get_pool_stats
+from fastai.database.routing import (
+    ReadReplicas,
+    create_session,
+    set_read_your_writes_key,
+)
 
-__all__ = ["create_db_engine", "destroy_engine", "PostgresSettings"]
+__all__ = [
+    "create_db_engine",
+    "create_read_replicas",
+    "create_session",
+    "destroy_engine",
+    "get_pool_stats",
+    "release_connection",
+    "set_read_your_writes_key",
+    "PoolStats",
+    "PostgresSettings",
+    "ReadReplicas",
+]
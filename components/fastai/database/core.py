@@ -1,13 +1,28 @@
+import uuid
 from typing import Any, AsyncIterator, Literal
 from urllib.parse import parse_qs, urlparse
 
 import structlog.stdlib
-from pydantic import PostgresDsn, SecretStr, computed_field, model_validator
+from pydantic import (
+    Field,
+    PostgresDsn,
+    SecretStr,
+    computed_field,
+    field_validator,
+    model_validator,
+)
 from pydantic_settings import SettingsConfigDict
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import text
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from fastai.database.pool import (
+    CheckoutWaitHook,
+    InstrumentedAsyncPool,
+    PoolMetrics,
+    get_pool_stats,
+)
+from fastai.database.routing import ReadReplicas, create_session
 from fastai.utils.settings import FastAISettings
 
 SslMode = Literal["disable", "allow", "prefer", "require", "verify-ca", "verify-full"]
@@ -34,6 +49,88 @@ class PostgresSettings(FastAISettings):
     sslmode: SslMode = "prefer"
     options: str | None = None
 
+    # Connection pool
+    pool_size: int = Field(
+        default=5, ge=1, description="Connections kept open in the pool."
+    )
+    max_overflow: int = Field(
+        default=10,
+        ge=0,
+        description="Extra connections opened beyond pool_size under load.",
+    )
+    pool_timeout: float = Field(
+        default=30.0,
+        gt=0,
+        description="Seconds to wait for a connection before failing.",
+    )
+    pool_recycle: int | None = Field(
+        default=None,
+        gt=0,
+        description=(
+            "Replace connections older than this many seconds. Set below any "
+            "idle timeout of the server, load balancer or PgBouncer."
+        ),
+    )
+    pool_pre_ping: bool = Field(
+        default=True,
+        description="Test connections for liveness on checkout.",
+    )
+
+    # Statements
+    statement_timeout_ms: int | None = Field(
+        default=None,
+        gt=0,
+        description=(
+            "Server-side statement_timeout for every connection. Not sent in "
+            "PgBouncer mode; set it on the database role instead."
+        ),
+    )
+    statement_cache_size: int = Field(
+        default=100,
+        ge=0,
+        description="asyncpg prepared-statement cache size per connection.",
+    )
+    prepared_statement_cache_size: int = Field(
+        default=100,
+        ge=0,
+        description="SQLAlchemy prepared-statement cache size per connection.",
+    )
+    pgbouncer: bool = Field(
+        default=False,
+        description=(
+            "Connect through PgBouncer in transaction pooling mode: disables "
+            "both prepared-statement caches and uses unique statement names."
+        ),
+    )
+
+    # Read replicas
+    replica_urls: list[str] = Field(
+        default_factory=list,
+        description=(
+            "Connection URLs of read replicas, as a JSON list. Listing and "
+            "search queries are spread across them; all else uses the primary."
+        ),
+    )
+    replica_lag_window: float = Field(
+        default=5.0,
+        ge=0,
+        description=(
+            "Seconds after a user's write during which that user's replica "
+            "reads go to the primary instead."
+        ),
+    )
+
+    @field_validator("replica_urls")
+    @classmethod
+    def use_asyncpg_for_replicas(cls, urls: list[str]) -> list[str]:
+        normalized: list[str] = []
+        for url in urls:
+            for scheme in ("postgres://", "postgresql://"):
+                if url.startswith(scheme):
+                    url = "postgresql+asyncpg://" + url[len(scheme) :]
+            normalized.append(url)
+        return normalized
+
     @model_validator(mode="before")
     @classmethod
     def extract_parts_from_url(cls, values: dict[str, Any]) -> dict[str, Any]:
@@ -82,13 +179,93 @@ class PostgresSettings(FastAISettings):
 logger = structlog.stdlib.get_logger(__name__)
 
 
-def create_db_engine(settings: PostgresSettings | None = None) -> AsyncEngine:
+def _connect_args(settings: PostgresSettings) -> dict[str, Any]:
+    """asyncpg connection arguments for the statement settings."""
+    if settings.pgbouncer:
+        # Transaction pooling hands each transaction a different server
+        # connection, so named prepared statements cannot be reused.
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    connect_args: dict[str, Any] = {
+        "statement_cache_size": settings.statement_cache_size,
+        "prepared_statement_cache_size": settings.prepared_statement_cache_size,
+    }
+    if settings.statement_timeout_ms is not None:
+        connect_args["server_settings"] = {
+            "statement_timeout": str(settings.statement_timeout_ms)
+        }
+    return connect_args
+
+
+def _create_engine(
+    url: str,
+    settings: PostgresSettings,
+    on_checkout_wait: CheckoutWaitHook | None,
+) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedAsyncPool,
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_timeout=settings.pool_timeout,
+        pool_recycle=settings.pool_recycle or -1,
+        pool_pre_ping=settings.pool_pre_ping,
+        metrics=PoolMetrics(on_checkout_wait=on_checkout_wait),
+        connect_args=_connect_args(settings),
+    )
 
+
+def create_db_engine(
+    settings: PostgresSettings | None = None,
+    *,
+    on_checkout_wait: CheckoutWaitHook | None = None,
+) -> AsyncEngine:
+    """Create the async engine with an instrumented connection pool.
+
+    Args:
+        settings: Connection settings. Loaded from the environment if omitted.
+        on_checkout_wait: Optional metrics hook, called with the seconds each
+            connection checkout waited. Pool totals are available from
+            :func:`fastai.database.pool.get_pool_stats` either way.
+    """
     if settings is None:
         settings = PostgresSettings()  # pyright: ignore[reportCallIssue]
 
-    logger.info("Creating database engine")
-    return create_async_engine(str(settings.dsn), pool_pre_ping=True)
+    logger.info(
+        "Creating database engine",
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pgbouncer=settings.pgbouncer,
+    )
+    return _create_engine(str(settings.dsn), settings, on_checkout_wait)
+
+
+def create_read_replicas(
+    settings: PostgresSettings | None = None,
+    *,
+    on_checkout_wait: CheckoutWaitHook | None = None,
+) -> ReadReplicas | None:
+    """Create one engine per configured replica, with the primary's pool settings.
+
+    Returns:
+        The replicas, or None if ``replica_urls`` is empty.
+    """
+    if settings is None:
+        settings = PostgresSettings()  # pyright: ignore[reportCallIssue]
+    if not settings.replica_urls:
+        return None
+
+    logger.info("Creating read replica engines", replicas=len(settings.replica_urls))
+    return ReadReplicas(
+        [
+            _create_engine(url, settings, on_checkout_wait)
+            for url in settings.replica_urls
+        ],
+        lag_window=settings.replica_lag_window,
+    )
 
 
 async def destroy_engine(engine: AsyncEngine):
@@ -96,8 +273,10 @@ async def destroy_engine(engine: AsyncEngine):
     await engine.dispose()
 
 
-async def get_db_session(engine: AsyncEngine) -> AsyncIterator[AsyncSession]:
-    async with AsyncSession(engine) as session:
+async def get_db_session(
+    engine: AsyncEngine, replicas: ReadReplicas | None = None
+) -> AsyncIterator[AsyncSession]:
+    async with create_session(engine, replicas) as session:
         try:
             yield session
             # await session.commit()
@@ -109,16 +288,45 @@ async def get_db_session(engine: AsyncEngine) -> AsyncIterator[AsyncSession]:
             await session.close()
 
 
-async def health_check(session: AsyncSession):
+async def release_connection(session: AsyncSession) -> None:
+    """Return a session's pooled connection before a long non-database await.
+
+    A session checks out a connection on its first query and holds it until
+    the transaction ends, so a request that reads and then awaits an LLM
+    keeps an idle connection for the whole run. Call this between the reads
+    and the long await. Loaded objects are detached with their state intact
+    (nothing is expired), so they stay readable and can be re-added with
+    ``session.add``. The session stays usable; its next query checks out a
+    connection again.
+
+    Args:
+        session: A session with no pending changes.
+
+    Raises:
+        RuntimeError: If the session has unflushed changes.
+    """
+    if session.new or session.dirty or session.deleted:
+        raise RuntimeError(
+            "Commit or roll back pending changes before releasing the connection"
+        )
+    await session.close()
+
+
+async def health_check(session: AsyncSession) -> dict[str, Any]:
+    status: dict[str, Any] = {"status": "not ready"}
     try:
         # Simple query to test database connectivity
         result = await session.exec(text("SELECT 1 as test"))  # pyright: ignore[reportCallIssue, reportArgumentType]
         row = result.fetchone()
 
         if row and row[0] == 1:
-            return {"status": "ready"}
-        else:
-            return {"status": "not ready"}
+            status["status"] = "ready"
     except Exception:
         logger.exception("Error in database health check")
-        return {"status": "not ready"}
+
+    # Report queueing for connections alongside connectivity
+    if isinstance(session.bind, AsyncEngine):
+        pool_stats = get_pool_stats(session.bind)
+        if pool_stats is not None:
+            status["pool"] = pool_stats.model_dump()
+    return status
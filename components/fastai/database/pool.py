@@ -0,0 +1,101 @@
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+# Called with the seconds each checkout waited for a connection
+CheckoutWaitHook = Callable[[float], None]
+
+
+@dataclass
+class PoolMetrics:
+    """Running checkout counters for an :class:`InstrumentedAsyncPool`."""
+
+    on_checkout_wait: CheckoutWaitHook | None = None
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_seconds: float = 0.0
+    wait_max_seconds: float = 0.0
+
+    def record_checkout(self, seconds: float, *, timed_out: bool = False) -> None:
+        """Record one checkout attempt and forward its wait to the hook."""
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+            self.wait_seconds += seconds
+            self.wait_max_seconds = max(self.wait_max_seconds, seconds)
+        if self.on_checkout_wait is not None:
+            self.on_checkout_wait(seconds)
+
+
+class PoolStats(BaseModel):
+    """Point-in-time connection pool status, as reported by ``/readyz``."""
+
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    wait_mean_ms: float
+    wait_max_ms: float
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times how long each checkout waits.
+
+    The wait covers queueing for a free connection, opening a new one and
+    the pre-ping, i.e. everything between asking the pool for a connection
+    and getting a usable one.
+    """
+
+    def __init__(
+        self,
+        creator: Any,
+        metrics: PoolMetrics | None = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(creator, **kwargs)
+        self.metrics = metrics or PoolMetrics()
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_checkout(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+    def recreate(self) -> "InstrumentedAsyncPool":
+        # engine.dispose() swaps in a new pool; keep counting into the same metrics
+        pool = super().recreate()
+        assert isinstance(pool, InstrumentedAsyncPool)
+        pool.metrics = self.metrics
+        return pool
+
+
+def get_pool_stats(engine: AsyncEngine) -> PoolStats | None:
+    """Report the engine's pool status, or None if it is not instrumented."""
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedAsyncPool):
+        return None
+    metrics = pool.metrics
+    mean = metrics.wait_seconds / metrics.checkouts if metrics.checkouts else 0.0
+    return PoolStats(
+        size=pool.size(),
+        checked_in=pool.checkedin(),
+        checked_out=pool.checkedout(),
+        overflow=max(pool.overflow(), 0),
+        checkouts=metrics.checkouts,
+        timeouts=metrics.timeouts,
+        wait_mean_ms=mean * 1000,
+        wait_max_ms=metrics.wait_max_seconds * 1000,
+    )
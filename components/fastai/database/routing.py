@@ -0,0 +1,139 @@
+import itertools
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Sequence
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.sql import ClauseElement, Executable
+from sqlalchemy.sql.dml import UpdateBase
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Execution option marking a read that a replica may serve, e.g.
+# ``select(...).execution_options(use_replica=True)``
+USE_REPLICA = "use_replica"
+
+# Session.info keys
+_REPLICAS_KEY = "read_replicas"
+_CONSISTENCY_KEY = "read_your_writes_key"
+_WROTE_KEY = "wrote"
+
+
+class ReadReplicas:
+    """Read-replica engines plus the read-your-writes guard.
+
+    Replicas are picked round-robin. Every commit that wrote through a
+    session with a consistency key (the authenticated user) is remembered
+    for ``lag_window`` seconds, during which that key's replica reads go to
+    the primary, so users see their own writes despite replication lag.
+    The guard is per process: a request served by another api process only
+    gets the session-level guard of :class:`RoutingSession`.
+    """
+
+    def __init__(
+        self,
+        engines: Sequence[AsyncEngine],
+        lag_window: float,
+        max_keys: int = 10_000,
+    ) -> None:
+        if not engines:
+            raise ValueError("At least one replica engine is required")
+        self.engines = list(engines)
+        self.lag_window = lag_window
+        self.max_keys = max_keys
+        self._next = itertools.cycle(self.engines)
+        self._writes: OrderedDict[Hashable, float] = OrderedDict()
+
+    def pick(self) -> AsyncEngine:
+        """Return the next replica engine."""
+        return next(self._next)
+
+    def record_write(self, key: Hashable) -> None:
+        """Remember that ``key`` just committed a write."""
+        now = time.monotonic()
+        self._writes[key] = now
+        self._writes.move_to_end(key)
+        # Oldest first: drop entries past the window, then any over max_keys
+        cutoff = now - self.lag_window
+        while self._writes and (
+            len(self._writes) > self.max_keys
+            or next(iter(self._writes.values())) < cutoff
+        ):
+            self._writes.popitem(last=False)
+
+    def wrote_recently(self, key: Hashable | None) -> bool:
+        """Whether ``key`` committed a write within the lag window."""
+        if key is None:
+            return False
+        written_at = self._writes.get(key)
+        return (
+            written_at is not None and time.monotonic() - written_at < self.lag_window
+        )
+
+    async def dispose(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
+
+
+class RoutingSession(Session):
+    """Session that sends reads marked with ``use_replica`` to a replica.
+
+    Everything else, including all writes, goes to the session's primary
+    bind. Marked reads stay on the primary once the session has written
+    (read-your-writes within a request) and while its consistency key has
+    written recently (across requests, see :class:`ReadReplicas`).
+    """
+
+    def get_bind(
+        self,
+        mapper: Any = None,
+        *,
+        clause: ClauseElement | None = None,
+        **kw: Any,
+    ) -> Engine | Connection:
+        replicas: ReadReplicas | None = self.info.get(_REPLICAS_KEY)
+        if replicas is not None and clause is not None:
+            if isinstance(clause, UpdateBase):
+                self.info[_WROTE_KEY] = True
+            elif (
+                isinstance(clause, Executable)
+                and clause.get_execution_options().get(USE_REPLICA)
+                and not self.info.get(_WROTE_KEY)
+                and not replicas.wrote_recently(self.info.get(_CONSISTENCY_KEY))
+            ):
+                return replicas.pick().sync_engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_written(session: Session, flush_context: Any) -> None:
+    session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _record_write(session: Session) -> None:
+    replicas: ReadReplicas | None = session.info.get(_REPLICAS_KEY)
+    key = session.info.get(_CONSISTENCY_KEY)
+    if replicas is not None and key is not None and session.info.get(_WROTE_KEY):
+        replicas.record_write(key)
+
+
+def create_session(
+    engine: AsyncEngine, replicas: ReadReplicas | None = None
+) -> AsyncSession:
+    """Open a session on the primary, routing marked reads to ``replicas``."""
+    if replicas is None:
+        return AsyncSession(engine)
+    return AsyncSession(
+        engine,
+        sync_session_class=RoutingSession,
+        info={_REPLICAS_KEY: replicas},
+    )
+
+
+def set_read_your_writes_key(session: AsyncSession, key: Hashable) -> None:
+    """Tie a session's writes and replica reads to ``key``, usually a user ID."""
+    session.info[_CONSISTENCY_KEY] = key
@@ -63,12 +63,13 @@ class Document(DocumentBase, TimestampMixin, table=True):
     async def get_all(
         cls, session: AsyncSession, offset: int = 0, limit: int = 100
     ) -> "list[Document]":
-        """Get a paginated list of documents."""
+        """Get a paginated list of documents, from a replica if routed."""
         statement = (
             select(cls)
             .order_by(cls.created_at.desc())  # pyright: ignore[reportAttributeAccessIssue]
             .offset(offset)
             .limit(limit)
+            .execution_options(use_replica=True)
         )
         results = await session.exec(statement)
         return list(results.all())
@@ -140,6 +141,24 @@ class Document(DocumentBase, TimestampMixin, table=True):
         results = await session.exec(statement)
         return list(results.all())
 
+    @classmethod
+    async def get_completed_duplicate(
+        cls, session: AsyncSession, content_hash: str, *, exclude_id: _uuid.UUID
+    ) -> "Optional[Document]":
+        """Find another fully embedded document with the same content hash."""
+        statement = (
+            select(cls)
+            .where(
+                cls.content_hash == content_hash,  # pyright: ignore[reportArgumentType]
+                cls.embedding_status == "completed",  # pyright: ignore[reportArgumentType]
+                cls.id != exclude_id,  # pyright: ignore[reportArgumentType]
+            )
+            .order_by(cls.created_at)  # pyright: ignore[reportArgumentType]
+            .limit(1)
+        )
+        results = await session.exec(statement)
+        return results.first()
+
     @classmethod
     async def count(cls, session: AsyncSession) -> int:
         """Get the total number of documents in the database."""
@@ -1,3 +1,9 @@
+from fastai.embeddings.cache import (
+    EmbeddingCache,
+    EmbeddingCacheStats,
+    QueryEmbeddingCache,
+    QueryEmbeddingCacheStats,
+)
 from fastai.embeddings.core import KnowledgeBase
 from fastai.embeddings.exceptions import (
     EmbeddingError,
@@ -6,18 +12,35 @@ from fastai.embeddings.exceptions import (
 )
 from fastai.embeddings.models import Embedding
 from fastai.embeddings.providers import OllamaEmbeddingModel, create_embedder
-from fastai.embeddings.schemas import EmbeddingCreate, SearchResult
+from fastai.embeddings.schemas import (
+    SEARCH_PROFILES,
+    BulkUpsertResult,
+    EmbeddingCreate,
+    IterativeScan,
+    SearchProfile,
+    SearchProfileName,
+    SearchResult,
+)
 from fastai.embeddings.settings import EmbeddingSettings
 
 __all__ = [
+    "BulkUpsertResult",
     "Embedding",
+    "EmbeddingCache",
+    "EmbeddingCacheStats",
     "EmbeddingCreate",
     "EmbeddingError",
     "EmbeddingNotFoundError",
     "EmbeddingProviderError",
     "EmbeddingSettings",
+    "IterativeScan",
     "KnowledgeBase",
     "OllamaEmbeddingModel",
+    "QueryEmbeddingCache",
+    "QueryEmbeddingCacheStats",
+    "SEARCH_PROFILES",
+    "SearchProfile",
+    "SearchProfileName",
     "SearchResult",
     "create_embedder",
 ]
@@ -0,0 +1,215 @@
+import asyncio
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from fastai.embeddings.models import Embedding
+
+# (content_hash, model_name, dimensions)
+CacheKey = tuple[str, str, int]
+
+
+@dataclass
+class EmbeddingCacheStats:
+    """Running hit/miss counters for an :class:`EmbeddingCache`."""
+
+    memory_hits: int = 0
+    database_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.database_hits
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class EmbeddingCache:
+    """Content-addressed cache of document vectors.
+
+    Keys are ``(Embedding.hash_content(text), model_name, dimensions)``, so
+    identical chunks share one vector across documents. Lookups check an
+    in-process LRU first, then (when given a session) vectors already stored
+    in the ``embeddings`` table. Vectors are kept as float32 arrays to bound
+    memory at roughly ``4 * dimensions`` bytes per entry.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.stats = EmbeddingCacheStats()
+        self._entries: OrderedDict[CacheKey, array] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> list[float] | None:
+        """Return a cached vector and mark it recently used, or None."""
+        vector = self._entries.get(key)
+        if vector is None:
+            return None
+        self._entries.move_to_end(key)
+        return vector.tolist()
+
+    def put(self, key: CacheKey, vector: Sequence[float]) -> None:
+        """Store a vector, evicting the least recently used entry if full."""
+        if self.max_size <= 0:
+            return
+        self._entries[key] = array("f", vector)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def lookup(
+        self,
+        content_hashes: Sequence[str],
+        model_name: str,
+        dimensions: int,
+        session: AsyncSession | None = None,
+    ) -> dict[str, list[float]]:
+        """Resolve as many hashes as possible without calling the provider.
+
+        Args:
+            content_hashes: Unique content hashes to look up.
+            model_name: The embedding model identifier.
+            dimensions: The vector dimensions.
+            session: Optional session for the PostgreSQL tier.
+
+        Returns:
+            A mapping of content_hash to vector for every hit.
+        """
+        found: dict[str, list[float]] = {}
+        missing: list[str] = []
+        for content_hash in content_hashes:
+            vector = self.get((content_hash, model_name, dimensions))
+            if vector is None:
+                missing.append(content_hash)
+            else:
+                found[content_hash] = vector
+        self.stats.memory_hits += len(found)
+
+        if missing and session is not None:
+            stored = await Embedding.get_vectors_by_content_hash(
+                session, missing, model_name
+            )
+            for content_hash, vector in stored.items():
+                if len(vector) != dimensions:
+                    continue
+                self.put((content_hash, model_name, dimensions), vector)
+                found[content_hash] = vector
+                self.stats.database_hits += 1
+
+        self.stats.misses += len(content_hashes) - len(found)
+        return found
+
+
+# (normalized query text, model_name)
+QueryCacheKey = tuple[str, str]
+
+
+@dataclass
+class QueryEmbeddingCacheStats:
+    """Running counters for a :class:`QueryEmbeddingCache`."""
+
+    hits: int = 0
+    misses: int = 0
+    # Misses that joined an identical in-flight provider call
+    coalesced: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class QueryEmbeddingCache:
+    """TTL + LRU cache of search query vectors with single-flight embedding.
+
+    Keys are the normalized query text (NFKC, case-folded, whitespace
+    collapsed) and the model name, so trivially different spellings of a
+    query share one vector. Concurrent misses for the same key share a
+    single provider call; a caller that is cancelled does not cancel it for
+    the others. Failed calls are not cached.
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = QueryEmbeddingCacheStats()
+        self._entries: OrderedDict[QueryCacheKey, tuple[float, array]] = OrderedDict()
+        self._in_flight: dict[QueryCacheKey, asyncio.Task[list[float]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+    def get(self, key: QueryCacheKey) -> list[float] | None:
+        """Return an unexpired vector and mark it recently used, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, vector = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return vector.tolist()
+
+    def put(self, key: QueryCacheKey, vector: Sequence[float]) -> None:
+        """Store a vector, evicting the least recently used entry if full."""
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, array("f", vector))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def get_or_embed(
+        self,
+        query: str,
+        model_name: str,
+        embed: Callable[[], Awaitable[list[float]]],
+    ) -> list[float]:
+        """Return the cached vector for a query, embedding it on a miss.
+
+        Args:
+            query: The search query as typed.
+            model_name: The embedding model identifier.
+            embed: Called on a miss to embed the query with the provider.
+        """
+        key = (self.normalize(query), model_name)
+        vector = self.get(key)
+        if vector is not None:
+            self.stats.hits += 1
+            return vector
+        self.stats.misses += 1
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(embed())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.stats.coalesced += 1
+        return list(await asyncio.shield(task))
+
+    def _finish(self, key: QueryCacheKey, task: asyncio.Task[list[float]]) -> None:
+        self._in_flight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self.put(key, task.result())
@@ -1,17 +1,53 @@
+import asyncio
 import uuid
+from collections.abc import AsyncIterable, Sequence
 
 import structlog.stdlib
 from pydantic_ai.embeddings import Embedder, EmbeddingModel
+from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from fastai.embeddings.cache import EmbeddingCache, QueryEmbeddingCache
 from fastai.embeddings.exceptions import EmbeddingNotFoundError
-from fastai.embeddings.models import Embedding
-from fastai.embeddings.schemas import EmbeddingCreate, SearchResult
+from fastai.embeddings.models import SEARCH_INDEXES, Embedding
+from fastai.embeddings.schemas import (
+    SEARCH_PROFILES,
+    BulkUpsertResult,
+    EmbeddingCreate,
+    SearchProfile,
+    SearchProfileName,
+    SearchResult,
+)
 from fastai.embeddings.settings import EmbeddingSettings
+from fastai.utils.tokens import TokenCounter, get_token_counter
 
 logger = structlog.stdlib.get_logger(__name__)
 
 
+def _pack_batches(
+    token_counts: Sequence[int], max_items: int, max_tokens: int
+) -> list[tuple[int, int]]:
+    """Group consecutive texts into ``(start, end)`` batches.
+
+    Each batch has at most *max_items* texts and *max_tokens* tokens; a
+    single text over the token budget gets a batch of its own.
+    """
+    batches: list[tuple[int, int]] = []
+    start = 0
+    tokens = 0
+    for index, count in enumerate(token_counts):
+        if index > start and (
+            index - start == max_items or tokens + count > max_tokens
+        ):
+            batches.append((start, index))
+            start = index
+            tokens = 0
+        tokens += count
+    if start < len(token_counts):
+        batches.append((start, len(token_counts)))
+    return batches
+
+
 class KnowledgeBase:
     """Encapsulates embedding storage and semantic search over documents."""
 
@@ -19,9 +55,22 @@ class KnowledgeBase:
         self,
         embedder: Embedder,
         settings: EmbeddingSettings | None = None,
+        cache: EmbeddingCache | None = None,
+        query_cache: QueryEmbeddingCache | None = None,
     ) -> None:
         self.embedder = embedder
         self.settings = settings or EmbeddingSettings()
+        self.count_tokens: TokenCounter = get_token_counter(self.settings.token_counter)
+        self.cache = (
+            cache if cache is not None else EmbeddingCache(self.settings.cache_size)
+        )
+        self.query_cache = (
+            query_cache
+            if query_cache is not None
+            else QueryEmbeddingCache(
+                self.settings.query_cache_size, self.settings.query_cache_ttl_seconds
+            )
+        )
 
     @property
     def model_name(self) -> str:
@@ -75,14 +124,14 @@ class KnowledgeBase:
                 )
             return existing
 
-        result = await self.embedder.embed_documents(content)
-        vector = list(result.embeddings[0])
+        [vector] = await self.embed_many([content], session=session)
 
         embedding_in = EmbeddingCreate(
             source_type=source_type,
             source_id=source_id,
             chunk_text=content,
             extra_metadata=metadata or {},
+            token_count=self.count_tokens(content),
         )
         record = await Embedding.upsert(session, embedding_in, vector, self.model_name)
 
@@ -94,12 +143,267 @@ class KnowledgeBase:
         )
         return record
 
+    async def embed_many(
+        self,
+        texts: Sequence[str],
+        *,
+        session: AsyncSession | None = None,
+    ) -> list[list[float]]:
+        """Embed many texts in provider requests of bounded size.
+
+        Each request holds at most ``batch_size`` texts and
+        ``batch_max_tokens`` tokens, so batches of long chunks stay under
+        the provider's per-request token limit.
+
+        Identical texts are embedded once. Vectors found in the embedding
+        cache (in-process, then stored embeddings when *session* is given)
+        are reused, and only the remaining texts are sent to the provider.
+
+        Args:
+            texts: The document texts to embed.
+            session: Optional session used to reuse already stored vectors.
+
+        Returns:
+            One vector per input text, in input order.
+        """
+        vectors, _ = await self._embed_many(texts, session)
+        return vectors
+
+    async def _embed_many(
+        self, texts: Sequence[str], session: AsyncSession | None
+    ) -> tuple[list[list[float]], int]:
+        """:meth:`embed_many`, also returning the number of provider requests."""
+        hashes = [Embedding.hash_content(text) for text in texts]
+        unique = dict(zip(hashes, texts))
+        dimensions = self.settings.dimensions
+
+        vectors = await self.cache.lookup(
+            list(unique), self.model_name, dimensions, session
+        )
+        pending = [(h, text) for h, text in unique.items() if h not in vectors]
+
+        batches = _pack_batches(
+            [self.count_tokens(text) for _, text in pending],
+            self.settings.batch_size,
+            self.settings.batch_max_tokens,
+        )
+        for start, end in batches:
+            batch = pending[start:end]
+            result = await self.embedder.embed_documents([text for _, text in batch])
+            for (content_hash, _), embedding in zip(batch, result.embeddings):
+                vector = list(embedding)
+                vectors[content_hash] = vector
+                self.cache.put((content_hash, self.model_name, dimensions), vector)
+
+        if texts:
+            logger.debug(
+                "Embedded documents",
+                texts=len(texts),
+                unique=len(unique),
+                cached=len(unique) - len(pending),
+                embedded=len(pending),
+                requests=len(batches),
+            )
+        return [vectors[content_hash] for content_hash in hashes], len(batches)
+
+    async def embed_and_store_many(
+        self,
+        session: AsyncSession,
+        items: Sequence[EmbeddingCreate],
+        *,
+        replace: bool = False,
+    ) -> BulkUpsertResult:
+        """Embed many chunks in batches and store them in one transaction.
+
+        All provider calls complete before anything is written, so a failed
+        batch leaves previously stored embeddings untouched.
+
+        Args:
+            session: The async database session.
+            items: The chunks to embed, with their source and metadata.
+            replace: Delete existing embeddings for every source in *items*
+                within the same transaction before inserting.
+
+        Returns:
+            Counts of inserted, updated, and unchanged embeddings.
+        """
+        if not items:
+            return BulkUpsertResult()
+
+        items = [self._with_token_count(item) for item in items]
+        vectors, requests = await self._embed_many(
+            [item.chunk_text for item in items], session
+        )
+
+        if replace:
+            sources = {(item.source_type, item.source_id) for item in items}
+            for source_type, source_id in sources:
+                await Embedding.delete_by_source(
+                    session, source_type, source_id, commit=False
+                )
+
+        result = await Embedding.bulk_upsert(session, items, vectors, self.model_name)
+
+        logger.info(
+            "Embeddings stored",
+            inserted=result.inserted,
+            updated=result.updated,
+            skipped=result.skipped,
+            duplicates=result.duplicates,
+            requests=requests,
+            cache_hit_ratio=round(self.cache.stats.hit_ratio, 3),
+            model=self.model_name,
+        )
+        return result
+
+    async def embed_and_store_stream(
+        self,
+        session: AsyncSession,
+        items: AsyncIterable[EmbeddingCreate],
+        *,
+        replace: bool = False,
+        commit: bool = True,
+    ) -> BulkUpsertResult:
+        """Embed and store chunks while they are still being produced.
+
+        Runs three stages connected by queues of at most
+        ``stream_queue_size`` batches: grouping *items* into
+        batches as in :meth:`embed_many`, embedding each batch, and writing it. So
+        chunk extraction, provider calls and database writes overlap, and
+        only a few batches are held in memory. All writes share one
+        transaction, committed at the end, so a failure leaves previously
+        stored embeddings untouched.
+
+        Stored vectors are reused as in :meth:`embed_many`, looked up with
+        short-lived sessions of their own when *session* is bound to an
+        engine.
+
+        Args:
+            session: The async database session.
+            items: The chunks to embed, with their source and metadata.
+            replace: Delete existing embeddings for each source in *items*
+                within the same transaction, before its first batch is
+                written.
+            commit: Commit at the end. Pass False to add more statements to
+                the transaction first.
+
+        Returns:
+            Counts of inserted, updated, and unchanged embeddings.
+        """
+        batch_size = self.settings.batch_size
+        batch_max_tokens = self.settings.batch_max_tokens
+        batches: asyncio.Queue[list[EmbeddingCreate] | None] = asyncio.Queue(
+            self.settings.stream_queue_size
+        )
+        embedded: asyncio.Queue[
+            tuple[list[EmbeddingCreate], list[list[float]]] | None
+        ] = asyncio.Queue(self.settings.stream_queue_size)
+        bind = getattr(session, "bind", None)
+        lookup_engine = bind if isinstance(bind, AsyncEngine) else None
+        requests = 0
+
+        async def batch_items() -> None:
+            batch: list[EmbeddingCreate] = []
+            tokens = 0
+            async for item in items:
+                item = self._with_token_count(item)
+                count = item.token_count or 0
+                if batch and (
+                    len(batch) == batch_size or tokens + count > batch_max_tokens
+                ):
+                    await batches.put(batch)
+                    batch = []
+                    tokens = 0
+                batch.append(item)
+                tokens += count
+            if batch:
+                await batches.put(batch)
+            await batches.put(None)
+
+        async def embed_batches() -> None:
+            nonlocal requests
+            while (batch := await batches.get()) is not None:
+                texts = [item.chunk_text for item in batch]
+                if lookup_engine is None:
+                    vectors, count = await self._embed_many(texts, None)
+                else:
+                    async with AsyncSession(lookup_engine) as lookup:
+                        vectors, count = await self._embed_many(texts, lookup)
+                requests += count
+                await embedded.put((batch, vectors))
+            await embedded.put(None)
+
+        result = BulkUpsertResult()
+        replaced: set[tuple[str, uuid.UUID]] = set()
+        try:
+            async with asyncio.TaskGroup() as tasks:
+                tasks.create_task(batch_items())
+                tasks.create_task(embed_batches())
+                while (embedded_batch := await embedded.get()) is not None:
+                    batch, vectors = embedded_batch
+                    if replace:
+                        for item in batch:
+                            source = (item.source_type, item.source_id)
+                            if source not in replaced:
+                                replaced.add(source)
+                                await Embedding.delete_by_source(
+                                    session, *source, commit=False
+                                )
+                    written = await Embedding.bulk_upsert(
+                        session, batch, vectors, self.model_name, commit=False
+                    )
+                    result.inserted += written.inserted
+                    result.updated += written.updated
+                    result.skipped += written.skipped
+                    result.duplicates += written.duplicates
+        except ExceptionGroup as group:
+            # Surface a failed stage's own exception, not the task group
+            if len(group.exceptions) == 1:
+                raise group.exceptions[0] from None
+            raise
+
+        if commit:
+            await session.commit()
+        logger.info(
+            "Embeddings stored",
+            inserted=result.inserted,
+            updated=result.updated,
+            skipped=result.skipped,
+            duplicates=result.duplicates,
+            requests=requests,
+            cache_hit_ratio=round(self.cache.stats.hit_ratio, 3),
+            model=self.model_name,
+        )
+        return result
+
+    def _with_token_count(self, item: EmbeddingCreate) -> EmbeddingCreate:
+        """Return *item* with its ``token_count`` filled in if missing."""
+        if item.token_count is not None:
+            return item
+        return item.model_copy(
+            update={"token_count": self.count_tokens(item.chunk_text)}
+        )
+
+    async def embed_query(self, query: str) -> list[float]:
+        """Embed a search query, reusing recent vectors for the same query.
+
+        Queries that differ only in case or whitespace share a cache entry,
+        and concurrent identical queries share one provider call.
+        """
+
+        async def embed() -> list[float]:
+            result = await self.embedder.embed_query(query)
+            return list(result.embeddings[0])
+
+        return await self.query_cache.get_or_embed(query, self.model_name, embed)
+
     async def search(
         self,
         session: AsyncSession,
         query: str,
         source_type: str | None = None,
         limit: int = 5,
+        profile: SearchProfileName | SearchProfile | None = None,
     ) -> list[SearchResult]:
         """Embed a query and search for semantically similar content.
 
@@ -108,18 +412,23 @@ class KnowledgeBase:
             query: Natural language search query.
             source_type: Optional filter by source type (e.g. "item").
             limit: Maximum number of results.
+            profile: Recall/latency profile, by name or as custom settings.
+                Defaults to ``settings.search_profile``.
 
         Returns:
             A list of SearchResult ordered by similarity.
         """
-        result = await self.embedder.embed_query(query)
-        query_vector = list(result.embeddings[0])
+        query_vector = await self.embed_query(query)
+        profile = self._resolve_profile(profile)
 
         results = await Embedding.search_similar(
             session,
             query_vector=query_vector,
+            embedding_model=self.model_name,
             source_type=source_type,
             limit=limit,
+            profile=profile,
+            inline_filters=self._has_search_index(source_type),
         )
 
         logger.info(
@@ -127,5 +436,71 @@ class KnowledgeBase:
             query_length=len(query),
             source_type=source_type,
             results_count=len(results),
+            ef_search=profile.ef_search,
+            iterative_scan=profile.iterative_scan,
+        )
+        return results
+
+    async def search_hybrid(
+        self,
+        session: AsyncSession,
+        query: str,
+        source_type: str | None = None,
+        limit: int = 5,
+        profile: SearchProfileName | SearchProfile | None = None,
+    ) -> list[SearchResult]:
+        """Search by meaning and by keywords, fused with reciprocal rank fusion.
+
+        Finds exact identifiers, error codes and product names that a
+        purely semantic search can rank too low. Scores are RRF scores, so
+        they only order the results and are not comparable to
+        :meth:`search` scores.
+
+        Args:
+            session: The async database session.
+            query: Natural language or keyword query.
+            source_type: Optional filter by source type (e.g. "item").
+            limit: Maximum number of results.
+            profile: Recall/latency profile for the vector half, by name or
+                as custom settings. Defaults to ``settings.search_profile``.
+
+        Returns:
+            A list of SearchResult ordered by fused score.
+        """
+        query_vector = await self.embed_query(query)
+        profile = self._resolve_profile(profile)
+
+        results = await Embedding.search_hybrid(
+            session,
+            query_text=query,
+            query_vector=query_vector,
+            embedding_model=self.model_name,
+            source_type=source_type,
+            limit=limit,
+            candidates=self.settings.hybrid_candidates,
+            rrf_k=self.settings.hybrid_rrf_k,
+            profile=profile,
+            inline_filters=self._has_search_index(source_type),
+        )
+
+        logger.info(
+            "Hybrid search completed",
+            query_length=len(query),
+            source_type=source_type,
+            results_count=len(results),
+            ef_search=profile.ef_search,
         )
         return results
+
+    def _has_search_index(self, source_type: str | None) -> bool:
+        """Whether a partial HNSW index covers searches of *source_type*."""
+        return (source_type, self.model_name) in SEARCH_INDEXES
+
+    def _resolve_profile(
+        self, profile: SearchProfileName | SearchProfile | None
+    ) -> SearchProfile:
+        if profile is None:
+            profile = self.settings.search_profile
+        if isinstance(profile, SearchProfile):
+            return profile
+        return SEARCH_PROFILES[SearchProfileName(profile)]
@@ -1,22 +1,45 @@
 import hashlib
 import uuid as _uuid
+from collections.abc import Sequence
 from typing import Any, Optional
 
 from pgvector.sqlalchemy import HALFVEC
 from pydantic import AwareDatetime
 from sqlalchemy import (
+    Computed,
+    Float,
     Index,
+    Row,
+    Select,
     SmallInteger,
     String,
     Text,
+    TextClause,
     UniqueConstraint,
+    Uuid,
+    cast,
 )
 from sqlalchemy import delete as sa_delete
+from sqlalchemy import (
+    literal,
+    literal_column,
+    type_coerce,
+)
+from sqlalchemy import update as sa_update
 from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.sql import ColumnElement
 from sqlmodel import Column, DateTime, Field, SQLModel, func, select, text
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from fastai.embeddings.schemas import EmbeddingCreate, SearchResult
+from fastai.embeddings.schemas import (
+    BulkUpsertResult,
+    EmbeddingCreate,
+    IterativeScan,
+    SearchProfile,
+    SearchResult,
+)
 from fastai.embeddings.settings import EmbeddingSettings
 from fastai.utils.fields import date_now
 
@@ -25,6 +48,80 @@ def get_embedding_dimensions() -> int:
     return EmbeddingSettings().dimensions
 
 
+# Text search configuration of the full-text column and hybrid queries
+TEXT_SEARCH_CONFIG = "english"
+
+# Largest token count the SmallInteger token_count column holds
+MAX_STORED_TOKEN_COUNT = 32767
+
+
+def stored_token_count(token_count: int | None) -> int | None:
+    """``token_count`` as stored: NULL when it does not fit the column.
+
+    Unchunked content stored with ``embed_and_store`` can be arbitrarily
+    long; its count is still used for batching, just not persisted.
+    """
+    if token_count is None or token_count > MAX_STORED_TOKEN_COUNT:
+        return None
+    return token_count
+
+
+# Build options shared by every HNSW index on the embeddings table
+HNSW_INDEX_OPTIONS: dict[str, Any] = {
+    "postgresql_using": "hnsw",
+    "postgresql_with": {"m": 16, "ef_construction": 128},
+    "postgresql_ops": {"embedding": "halfvec_cosine_ops"},
+}
+
+
+def search_index_name(source_type: str, embedding_model: str) -> str:
+    """Name of the partial HNSW index for one source type and model.
+
+    Model names can be long and contain any character, so the name uses a
+    digest of the pair, which keeps it within PostgreSQL's 63 characters.
+    """
+    digest = hashlib.sha256(f"{source_type}\0{embedding_model}".encode()).hexdigest()
+    return f"ix_embeddings_hnsw_{digest[:16]}"
+
+
+def search_index_predicate(source_type: str, embedding_model: str) -> TextClause:
+    """WHERE clause of the partial HNSW index for one source type and model."""
+
+    def quote(value: str) -> str:
+        return "'" + value.replace("'", "''") + "'"
+
+    return text(
+        f"source_type = {quote(source_type)} "
+        f"AND embedding_model = {quote(embedding_model)}"
+    )
+
+
+# (source_type, embedding_model) pairs with a partial HNSW index. Fixed
+# rather than read from settings so the schema does not depend on who runs
+# the migrations; add a pair together with a migration that builds it.
+SEARCH_INDEXES: tuple[tuple[str, str], ...] = (
+    ("document", "openai:text-embedding-3-small"),
+)
+
+
+def get_search_indexes() -> list[Index]:
+    """Partial HNSW indexes for the pairs in :data:`SEARCH_INDEXES`.
+
+    A search filtered to one source type and model walks only the graph
+    of matching rows, so rows of other types or of previous embedding
+    models neither slow it down nor crowd out its results.
+    """
+    return [
+        Index(
+            search_index_name(source_type, embedding_model),
+            "embedding",
+            postgresql_where=search_index_predicate(source_type, embedding_model),
+            **HNSW_INDEX_OPTIONS,
+        )
+        for source_type, embedding_model in SEARCH_INDEXES
+    ]
+
+
 class Embedding(SQLModel, table=True):
     """Polymorphic embeddings table with pgvector halfvec storage.
 
@@ -45,18 +142,20 @@ class Embedding(SQLModel, table=True):
             "embedding_model",
             name="uq_embeddings_source_chunk_model",
         ),
-        Index(
-            "ix_embeddings_halfvec_hnsw",
-            "embedding",
-            postgresql_using="hnsw",
-            postgresql_with={"m": 16, "ef_construction": 128},
-            postgresql_ops={"embedding": "halfvec_cosine_ops"},
-        ),
+        # Serves searches across all source types
+        Index("ix_embeddings_halfvec_hnsw", "embedding", **HNSW_INDEX_OPTIONS),
+        *get_search_indexes(),
         Index(
             "ix_embeddings_source",
             "source_type",
             "source_id",
         ),
+        # Content-addressed lookups for the embedding cache
+        Index(
+            "ix_embeddings_model_content_hash",
+            "embedding_model",
+            "content_hash",
+        ),
     )
 
     id: _uuid.UUID = Field(default_factory=_uuid.uuid4, primary_key=True)
@@ -196,6 +295,7 @@ class Embedding(SQLModel, table=True):
             existing.embedding = vector
             existing.content_hash = content_hash
             existing.chunk_text = embedding_in.chunk_text
+            existing.token_count = stored_token_count(embedding_in.token_count)
             existing.metadata_ = embedding_in.extra_metadata  # pyright: ignore[reportAttributeAccessIssue]
             session.add(existing)
             await session.commit()
@@ -210,6 +310,7 @@ class Embedding(SQLModel, table=True):
             chunk_index=embedding_in.chunk_index,
             chunk_text=embedding_in.chunk_text,
             embedding_model=model_name,
+            token_count=stored_token_count(embedding_in.token_count),
             metadata_=embedding_in.extra_metadata,  # pyright: ignore[reportArgumentType]
         )
         session.add(record)
@@ -217,21 +318,243 @@ class Embedding(SQLModel, table=True):
         await session.refresh(record)
         return record
 
+    @classmethod
+    async def get_vectors_by_content_hash(
+        cls,
+        session: AsyncSession,
+        content_hashes: Sequence[str],
+        embedding_model: str,
+    ) -> dict[str, list[float]]:
+        """Find stored vectors for content already embedded by a model.
+
+        Identical chunk text always produces the same vector for a given
+        model, so any row with a matching content_hash can be reused,
+        regardless of which source it belongs to.
+
+        Args:
+            session: The async database session.
+            content_hashes: SHA-256 hashes from :meth:`hash_content`.
+            embedding_model: The model used to generate the embedding.
+
+        Returns:
+            A mapping of content_hash to vector for every hash found.
+        """
+        if not content_hashes:
+            return {}
+
+        statement = (
+            select(cls.content_hash, cls.embedding)
+            .where(
+                cls.embedding_model == embedding_model,
+                cls.content_hash.in_(content_hashes),  # pyright: ignore[reportAttributeAccessIssue]
+            )
+            .distinct(cls.content_hash)  # pyright: ignore[reportArgumentType]
+        )
+        result = await session.exec(statement)
+        return {
+            content_hash: embedding.to_list()
+            for content_hash, embedding in result.all()
+        }
+
+    @classmethod
+    async def bulk_upsert(
+        cls,
+        session: AsyncSession,
+        items: Sequence[EmbeddingCreate],
+        vectors: Sequence[list[float]],
+        model_name: str,
+        *,
+        batch_size: int = 500,
+        commit: bool = True,
+    ) -> BulkUpsertResult:
+        """Insert or update many embeddings with multi-row ``INSERT ... ON CONFLICT``.
+
+        Each batch is one statement: new chunks are inserted, chunks whose
+        content_hash changed are updated in place, and unchanged chunks are
+        left alone. Everything is committed once at the end.
+
+        Args:
+            session: The async database session.
+            items: The embedding creation data, one per vector.
+            vectors: The embedding vectors from the provider, in item order.
+            model_name: The embedding model identifier.
+            batch_size: Maximum rows per INSERT statement.
+            commit: Commit at the end. Pass False to keep the rows in the
+                caller's transaction (e.g. across several calls).
+
+        Returns:
+            Counts of inserted, updated, and skipped (unchanged) rows, and
+            of duplicate items that were collapsed.
+        """
+        if len(items) != len(vectors):
+            raise ValueError(
+                f"Got {len(items)} items but {len(vectors)} vectors; "
+                "each item needs exactly one vector"
+            )
+
+        # A single INSERT ... ON CONFLICT cannot touch the same row twice,
+        # so collapse duplicate keys (last one wins).
+        rows: dict[tuple[str, _uuid.UUID, int], dict[str, Any]] = {}
+        for item, vector in zip(items, vectors):
+            rows[(item.source_type, item.source_id, item.chunk_index)] = {
+                "id": _uuid.uuid4(),
+                "source_type": item.source_type,
+                "source_id": item.source_id,
+                "embedding": vector,
+                "content_hash": cls.hash_content(item.chunk_text),
+                "chunk_index": item.chunk_index,
+                "chunk_text": item.chunk_text,
+                "embedding_model": model_name,
+                "token_count": stored_token_count(item.token_count),
+                "metadata": item.extra_metadata,
+            }
+
+        table = cls.__table__  # pyright: ignore[reportAttributeAccessIssue]
+        values = list(rows.values())
+        result = BulkUpsertResult()
+        for start in range(0, len(values), batch_size):
+            statement = pg_insert(table).values(values[start : start + batch_size])
+            excluded = statement.excluded
+            statement = statement.on_conflict_do_update(
+                constraint="uq_embeddings_source_chunk_model",
+                set_={
+                    "embedding": excluded["embedding"],
+                    "content_hash": excluded["content_hash"],
+                    "chunk_text": excluded["chunk_text"],
+                    "token_count": excluded["token_count"],
+                    "metadata": excluded["metadata"],
+                },
+                where=table.c.content_hash != excluded["content_hash"],
+            ).returning(literal_column("xmax = 0").label("inserted"))
+            written = await session.exec(statement)  # type: ignore[call-overload]
+            for inserted in written.scalars():
+                if inserted:
+                    result.inserted += 1
+                else:
+                    result.updated += 1
+
+        if commit:
+            await session.commit()
+        result.skipped = len(values) - result.inserted - result.updated
+        result.duplicates = len(items) - len(values)
+        return result
+
+    @classmethod
+    async def copy_source(
+        cls,
+        session: AsyncSession,
+        source_type: str,
+        from_source_id: _uuid.UUID,
+        to_source_id: _uuid.UUID,
+        embedding_model: str,
+        metadata: dict | None = None,
+    ) -> int:
+        """Copy one source's embeddings to another with ``INSERT ... SELECT``.
+
+        Existing embeddings of the target source are replaced in the same
+        transaction. When there is nothing to copy, the target's embeddings
+        are kept and nothing is committed. Vectors never leave the database.
+
+        Args:
+            session: The async database session.
+            source_type: The type of both sources (e.g. "document").
+            from_source_id: The UUID of the source to copy from.
+            to_source_id: The UUID of the source to copy to.
+            embedding_model: Only rows from this model are copied.
+            metadata: Keys merged into each copied row's metadata.
+
+        Returns:
+            The number of records copied.
+        """
+        table = cls.__table__  # pyright: ignore[reportAttributeAccessIssue]
+        rows = select(  # pyright: ignore[reportCallIssue]
+            func.gen_random_uuid(),
+            table.c.source_type,
+            literal(to_source_id, type_=Uuid),
+            table.c.embedding,
+            table.c.content_hash,
+            table.c.chunk_index,
+            table.c.chunk_text,
+            table.c.embedding_model,
+            table.c.token_count,
+            table.c.metadata.op("||")(literal(metadata or {}, type_=postgresql.JSONB)),
+        ).where(
+            table.c.source_type == source_type,
+            table.c.source_id == from_source_id,
+            table.c.embedding_model == embedding_model,
+        )
+        statement = pg_insert(table).from_select(
+            [
+                "id",
+                "source_type",
+                "source_id",
+                "embedding",
+                "content_hash",
+                "chunk_index",
+                "chunk_text",
+                "embedding_model",
+                "token_count",
+                "metadata",
+            ],
+            rows,
+        )
+        async with session.begin_nested() as savepoint:
+            await cls.delete_by_source(session, source_type, to_source_id, commit=False)
+            result = await session.exec(statement)  # type: ignore[call-overload]
+            copied: int = result.rowcount  # type: ignore[union-attr]
+            if not copied:
+                # Keep the target's embeddings rather than leave it empty
+                await savepoint.rollback()
+        if copied:
+            await session.commit()
+        return copied
+
+    @staticmethod
+    def _search_settings(profile: SearchProfile):
+        """A SELECT applying ``profile`` until the transaction or savepoint ends."""
+        settings = {
+            "hnsw.ef_search": str(profile.ef_search),
+            "hnsw.iterative_scan": profile.iterative_scan.value,
+        }
+        if profile.max_scan_tuples is not None:
+            settings["hnsw.max_scan_tuples"] = str(profile.max_scan_tuples)
+        return select(  # pyright: ignore[reportCallIssue]
+            *(func.set_config(name, value, True) for name, value in settings.items())
+        )
+
     @classmethod
     async def search_similar(
         cls,
         session: AsyncSession,
         query_vector: list[float],
+        embedding_model: str,
         source_type: str | None = None,
         limit: int = 5,
+        profile: SearchProfile | None = None,
+        inline_filters: bool = True,
     ) -> list[SearchResult]:
         """Cosine similarity search using pgvector HNSW index.
 
+        Only rows of ``embedding_model`` are searched; vectors of different
+        models are not comparable. With ``inline_filters``, the filter
+        values are inlined into the SQL so the planner can prove a partial
+        index's predicate (see :func:`get_search_indexes`), which it cannot
+        do for bind parameters of a generic plan.
+
+        Served by a read replica when the session routes to one. The
+        profile's settings are set with ``set_config(..., is_local => true)``
+        in a savepoint on the connection that runs the search, and are
+        undone when the search returns.
+
         Args:
             session: The async database session.
             query_vector: The query embedding vector.
+            embedding_model: The model that produced ``query_vector``.
             source_type: Optional filter by source type.
             limit: Maximum number of results.
+            profile: HNSW search settings; server defaults if omitted.
+            inline_filters: Inline the filter values; pass False when no
+                partial index covers them, so the statement can be cached.
 
         Returns:
             A list of SearchResult ordered by similarity (highest first).
@@ -248,16 +571,158 @@ class Embedding(SQLModel, table=True):
                 (1 - distance_col).label("score"),
                 cls.metadata_.label("metadata"),  # pyright: ignore[reportAttributeAccessIssue]
             )
+            .where(*cls._search_filters(embedding_model, source_type, inline_filters))
             .order_by(distance_col)
             .limit(limit)
+            .execution_options(use_replica=True)
+        )
+
+        rows = await cls._run_search(session, statement, profile)
+        if (
+            profile is not None
+            and profile.iterative_scan == IterativeScan.RELAXED_ORDER
+        ):
+            rows.sort(key=lambda row: row.score, reverse=True)
+        return cls._search_results(rows)
+
+    @classmethod
+    async def search_hybrid(
+        cls,
+        session: AsyncSession,
+        query_text: str,
+        query_vector: list[float],
+        embedding_model: str,
+        source_type: str | None = None,
+        limit: int = 5,
+        *,
+        candidates: int = 40,
+        rrf_k: int = 60,
+        profile: SearchProfile | None = None,
+        inline_filters: bool = True,
+    ) -> list[SearchResult]:
+        """Fuse vector and full-text search with reciprocal rank fusion.
+
+        Takes the top ``candidates`` rows by cosine distance (HNSW) and the
+        top ``candidates`` full-text matches of ``query_text`` (GIN), then
+        scores each row by ``sum(1 / (rrf_k + rank))`` over the lists it
+        appears in. Exact identifiers, error codes and names that the
+        vector search ranks poorly still surface through the full-text
+        list. Everything runs as one statement.
+
+        Args:
+            session: The async database session.
+            query_text: The user's query, parsed with ``websearch_to_tsquery``.
+            query_vector: Embedding of ``query_text``.
+            embedding_model: The model that produced ``query_vector``.
+            source_type: Optional filter by source type.
+            limit: Maximum number of results.
+            candidates: Rows taken from each list before fusion.
+            rrf_k: RRF damping constant; higher flattens the rank weights.
+            profile: HNSW search settings; server defaults if omitted.
+            inline_filters: As for :meth:`search_similar`.
+
+        Returns:
+            A list of SearchResult ordered by fused score (highest first).
+            Scores are RRF scores, at most ``2 / (rrf_k + 1)``.
+        """
+        filters = cls._search_filters(embedding_model, source_type, inline_filters)
+
+        distance = cls.embedding.cosine_distance(query_vector)  # pyright: ignore[reportAttributeAccessIssue]
+        # Rank outside the LIMIT so the inner query can use the HNSW index
+        vector_hits = (
+            select(cls.id, distance.label("distance"))
+            .where(*filters)
+            .order_by(distance)
+            .limit(candidates)
+            .subquery("vector_hits")
+        )
+        vector_ranked = select(
+            vector_hits.c.id,
+            func.row_number().over(order_by=vector_hits.c.distance).label("rank"),
+        ).cte("vector_ranked")
+
+        tsquery = func.websearch_to_tsquery(
+            literal_column(f"'{TEXT_SEARCH_CONFIG}'::regconfig"), query_text
+        )
+        text_rank = func.ts_rank_cd(search_vector_column, tsquery)
+        text_hits = (
+            select(cls.id, text_rank.label("text_rank"))
+            .where(*filters, search_vector_column.bool_op("@@")(tsquery))
+            .order_by(text_rank.desc())
+            .limit(candidates)
+            .subquery("text_hits")
+        )
+        text_ranked = select(
+            text_hits.c.id,
+            func.row_number().over(order_by=text_hits.c.text_rank.desc()).label("rank"),
+        ).cte("text_ranked")
+
+        def rrf(rank: ColumnElement[int]) -> ColumnElement[float]:
+            # Rows missing from a list contribute nothing for it
+            return type_coerce(
+                func.coalesce(1.0 / cast(rrf_k + rank, Float), 0.0), Float
+            )
+
+        score = (rrf(vector_ranked.c.rank) + rrf(text_ranked.c.rank)).label("score")
+        statement = (
+            select(  # pyright: ignore[reportCallIssue]
+                cls.source_type,
+                cls.source_id,
+                cls.chunk_text,
+                score,
+                cls.metadata_.label("metadata"),  # pyright: ignore[reportAttributeAccessIssue]
+            )
+            .select_from(
+                vector_ranked.join(
+                    text_ranked, vector_ranked.c.id == text_ranked.c.id, full=True
+                )
+            )
+            .join(cls, cls.id == func.coalesce(vector_ranked.c.id, text_ranked.c.id))
+            .order_by(score.desc())
+            .limit(limit)
+            .execution_options(use_replica=True)
         )
 
+        return cls._search_results(await cls._run_search(session, statement, profile))
+
+    @classmethod
+    def _search_filters(
+        cls, embedding_model: str, source_type: str | None, inline: bool
+    ) -> list[ColumnElement[bool]]:
+        # Inlined when a partial index covers the search, so its predicate
+        # can match; bound otherwise
+        filters = [
+            cls.embedding_model == literal(embedding_model, literal_execute=inline)
+        ]
         if source_type is not None:
-            statement = statement.where(cls.source_type == source_type)
+            filters.append(
+                cls.source_type == literal(source_type, literal_execute=inline)
+            )
+        return filters  # pyright: ignore[reportReturnType]
 
-        result = await session.exec(statement)
-        rows = result.all()
+    @classmethod
+    async def _run_search(
+        cls,
+        session: AsyncSession,
+        statement: Select,
+        profile: SearchProfile | None,
+    ) -> list[Row]:
+        # Resolve the connection first (a replica, if routed) so the
+        # settings and the search share it
+        connection = await session.connection(bind_arguments={"clause": statement})
+        if profile is None:
+            return list((await connection.execute(statement)).all())
+        # The settings are transaction-local; rolling back a savepoint undoes
+        # them (releasing it would not), so later queries in the caller's
+        # transaction do not inherit the profile
+        async with connection.begin_nested() as savepoint:
+            await connection.execute(cls._search_settings(profile))
+            rows = list((await connection.execute(statement)).all())
+            await savepoint.rollback()
+        return rows
 
+    @staticmethod
+    def _search_results(rows: Sequence[Row]) -> list[SearchResult]:
         return [
             SearchResult(
                 source_type=row.source_type,
@@ -269,12 +734,58 @@ class Embedding(SQLModel, table=True):
             for row in rows
         ]
 
+    @classmethod
+    async def merge_metadata(
+        cls,
+        session: AsyncSession,
+        source_type: str,
+        source_id: _uuid.UUID,
+        embedding_model: str,
+        metadata: dict,
+        *,
+        commit: bool = True,
+    ) -> int:
+        """Merge keys into the metadata of every embedding of a source.
+
+        Args:
+            session: The async database session.
+            source_type: The type of source (e.g. "document").
+            source_id: The UUID of the source record.
+            embedding_model: Only rows from this model are updated.
+            metadata: Keys merged into each row's metadata.
+            commit: Commit immediately. Pass False to keep the update in the
+                caller's transaction.
+
+        Returns:
+            The number of records updated.
+        """
+        table = cls.__table__  # pyright: ignore[reportAttributeAccessIssue]
+        statement = (
+            sa_update(table)
+            .where(
+                table.c.source_type == source_type,
+                table.c.source_id == source_id,
+                table.c.embedding_model == embedding_model,
+            )
+            .values(
+                metadata=table.c.metadata.op("||")(
+                    literal(metadata, type_=postgresql.JSONB)
+                )
+            )
+        )
+        result = await session.exec(statement)  # type: ignore[call-overload]
+        if commit:
+            await session.commit()
+        return result.rowcount  # type: ignore[union-attr]
+
     @classmethod
     async def delete_by_source(
         cls,
         session: AsyncSession,
         source_type: str,
         source_id: _uuid.UUID,
+        *,
+        commit: bool = True,
     ) -> int:
         """Delete all embeddings for a given source.
 
@@ -282,6 +793,8 @@ class Embedding(SQLModel, table=True):
             session: The async database session.
             source_type: The type of source (e.g. "item").
             source_id: The UUID of the source record.
+            commit: Commit immediately. Pass False to keep the delete in the
+                caller's transaction (e.g. before :meth:`bulk_upsert`).
 
         Returns:
             The number of records deleted.
@@ -292,7 +805,8 @@ class Embedding(SQLModel, table=True):
             .where(cls.source_id == source_id)  # type: ignore[arg-type]
         )
         result = await session.exec(statement)  # type: ignore[call-overload]
-        await session.commit()
+        if commit:
+            await session.commit()
         return result.rowcount  # type: ignore[union-attr]
 
     @classmethod
@@ -326,3 +840,15 @@ class Embedding(SQLModel, table=True):
         result = await session.exec(statement)
         existing_hash = result.first()
         return existing_hash != content_hash
+
+
+# Full-text search vector, generated by PostgreSQL from chunk_text. It is
+# added to the table but not mapped, so the ORM never loads or writes it.
+search_vector_column = Column(
+    "search_vector",
+    TSVECTOR,
+    Computed(f"to_tsvector('{TEXT_SEARCH_CONFIG}', chunk_text)", persisted=True),
+    nullable=True,
+)
+Embedding.__table__.append_column(search_vector_column)  # pyright: ignore[reportAttributeAccessIssue]
+Index("ix_embeddings_search_vector", search_vector_column, postgresql_using="gin")
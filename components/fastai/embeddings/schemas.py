@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime
+from enum import StrEnum
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from sqlmodel import SQLModel
 
 
@@ -15,6 +16,8 @@ class EmbeddingCreate(SQLModel):
     chunk_text: str
     chunk_index: int = 0
     extra_metadata: dict = Field(default_factory=dict)
+    # Filled in by KnowledgeBase when not given
+    token_count: int | None = None
 
 
 class EmbeddingRead(BaseModel):
@@ -38,3 +41,66 @@ class SearchResult(BaseModel):
     chunk_text: str
     score: float
     metadata: dict
+
+
+class BulkUpsertResult(BaseModel):
+    """Row counts from a bulk embedding upsert.
+
+    ``skipped`` counts rows left alone because their content is unchanged;
+    ``duplicates`` counts items dropped because a later item in the same
+    call had the same source and chunk index.
+    """
+
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    duplicates: int = 0
+
+
+class IterativeScan(StrEnum):
+    """pgvector ``hnsw.iterative_scan`` modes.
+
+    With a filter, a plain HNSW scan stops after ``ef_search`` candidates
+    and can return fewer than ``limit`` rows. Iterative scans keep
+    searching the graph until enough rows pass the filter.
+    """
+
+    OFF = "off"
+    # Fastest; results can be slightly out of distance order and are
+    # re-sorted after the query
+    RELAXED_ORDER = "relaxed_order"
+    STRICT_ORDER = "strict_order"
+
+
+class SearchProfile(BaseModel):
+    """Recall/latency trade-off of an HNSW search, applied per transaction."""
+
+    model_config = ConfigDict(frozen=True)
+
+    ef_search: int = Field(
+        default=40,
+        ge=1,
+        le=1000,
+        description="Candidate list size; higher is slower with better recall.",
+    )
+    iterative_scan: IterativeScan = IterativeScan.RELAXED_ORDER
+    max_scan_tuples: int | None = Field(
+        default=None,
+        ge=1,
+        description="Cap on tuples visited by an iterative scan (server default if unset).",
+    )
+
+
+class SearchProfileName(StrEnum):
+    FAST = "fast"
+    BALANCED = "balanced"
+    ACCURATE = "accurate"
+
+
+SEARCH_PROFILES: dict[SearchProfileName, SearchProfile] = {
+    SearchProfileName.FAST: SearchProfile(ef_search=20, max_scan_tuples=5_000),
+    SearchProfileName.BALANCED: SearchProfile(ef_search=40),
+    SearchProfileName.ACCURATE: SearchProfile(
+        ef_search=200, iterative_scan=IterativeScan.STRICT_ORDER
+    ),
+}
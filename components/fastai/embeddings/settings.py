@@ -1,7 +1,11 @@
-from pydantic import Field
+from typing import Self
+
+from pydantic import Field, field_validator, model_validator
 from pydantic_settings import SettingsConfigDict
 
+from fastai.embeddings.schemas import SearchProfileName
 from fastai.utils.settings import FastAISettings
+from fastai.utils.tokens import APPROXIMATE, get_token_counter
 
 
 class EmbeddingSettings(FastAISettings):
@@ -36,3 +40,95 @@ class EmbeddingSettings(FastAISettings):
         gt=0,
         description="Max texts per embedding API call.",
     )
+    batch_max_tokens: int = Field(
+        default=250_000,
+        gt=0,
+        description=(
+            "Max tokens per embedding API call, as counted by token_counter. "
+            "Keep it under the provider's per-request limit."
+        ),
+    )
+    token_counter: str = Field(
+        default=APPROXIMATE,
+        description=(
+            "How tokens are counted for chunk sizing, batching and "
+            "token_count: 'approximate' (fast, no tokenizer) or "
+            "'tiktoken:<encoding>', e.g. 'tiktoken:cl100k_base' for OpenAI "
+            "embedding models."
+        ),
+    )
+    chunk_tokens: int = Field(
+        default=375,
+        gt=0,
+        le=8192,
+        description=(
+            "Max tokens per document chunk. Must stay under the model's input "
+            "limit. The default matches the previous 1500-character chunks "
+            "for English text."
+        ),
+    )
+    chunk_overlap_tokens: int = Field(
+        default=25,
+        ge=0,
+        description="Tokens from the end of a chunk repeated at the next one's start.",
+    )
+    cache_size: int = Field(
+        default=2048,
+        ge=0,
+        description=(
+            "Max vectors kept in the in-process embedding cache (0 disables it). "
+            "Vectors already stored in the database are reused either way."
+        ),
+    )
+    stream_queue_size: int = Field(
+        default=4,
+        gt=0,
+        description=(
+            "Batches buffered between the chunking, embedding and storing "
+            "stages of KnowledgeBase.embed_and_store_stream."
+        ),
+    )
+    query_cache_size: int = Field(
+        default=1024,
+        ge=0,
+        description=(
+            "Max search query vectors kept in process (0 disables the query cache)."
+        ),
+    )
+    query_cache_ttl_seconds: float = Field(
+        default=3600.0,
+        gt=0,
+        description="Seconds a cached search query vector stays valid.",
+    )
+    search_profile: SearchProfileName = Field(
+        default=SearchProfileName.BALANCED,
+        description=(
+            "Default HNSW recall/latency profile for semantic search: "
+            "'fast', 'balanced' or 'accurate'."
+        ),
+    )
+    hybrid_candidates: int = Field(
+        default=40,
+        gt=0,
+        description=(
+            "Rows taken from each of the vector and full-text rankings before "
+            "hybrid search fuses them."
+        ),
+    )
+    hybrid_rrf_k: int = Field(
+        default=60,
+        ge=0,
+        description="Reciprocal rank fusion constant k in 1 / (k + rank).",
+    )
+
+    @field_validator("token_counter")
+    @classmethod
+    def check_token_counter(cls, name: str) -> str:
+        get_token_counter(name)
+        return name
+
+    @model_validator(mode="after")
+    def check_chunk_overlap(self) -> Self:
+        if self.chunk_overlap_tokens >= self.chunk_tokens:
+            raise ValueError("chunk_overlap_tokens must be less than chunk_tokens")
+        return self
@@ -1,7 +1,12 @@
 from fastai.events.core import EventPublisher
-from fastai.events.schemas import DocumentDeleted, DocumentUploaded
+from fastai.events.schemas import (
+    ConversationHistoryInvalidated,
+    DocumentDeleted,
+    DocumentUploaded,
+)
 from fastai.events.settings import (
     DOCUMENT_STREAM,
+    SUBJECT_CONVERSATION_HISTORY_INVALIDATED,
     SUBJECT_DOCUMENT_DELETED,
     SUBJECT_DOCUMENT_UPLOADED,
     NatsSettings,
@@ -9,8 +14,10 @@ from fastai.events.settings import (
 
 __all__ = [
     "DOCUMENT_STREAM",
+    "SUBJECT_CONVERSATION_HISTORY_INVALIDATED",
     "SUBJECT_DOCUMENT_DELETED",
     "SUBJECT_DOCUMENT_UPLOADED",
+    "ConversationHistoryInvalidated",
     "DocumentDeleted",
     "DocumentUploaded",
     "EventPublisher",
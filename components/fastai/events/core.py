@@ -1,10 +1,17 @@
+import uuid
+from collections.abc import Callable
 from typing import Self
 
 import structlog.stdlib
 from faststream.nats import NatsBroker
 
-from fastai.events.schemas import DocumentDeleted, DocumentUploaded
+from fastai.events.schemas import (
+    ConversationHistoryInvalidated,
+    DocumentDeleted,
+    DocumentUploaded,
+)
 from fastai.events.settings import (
+    SUBJECT_CONVERSATION_HISTORY_INVALIDATED,
     SUBJECT_DOCUMENT_DELETED,
     SUBJECT_DOCUMENT_UPLOADED,
     NatsSettings,
@@ -59,3 +66,27 @@ class EventPublisher:
             "Published document.deleted event",
             document_id=str(event.document_id),
         )
+
+    async def publish_history_invalidated(
+        self, event: ConversationHistoryInvalidated
+    ) -> None:
+        """Publish a ConversationHistoryInvalidated event to all api processes."""
+        await self._broker.publish(
+            event, subject=SUBJECT_CONVERSATION_HISTORY_INVALIDATED
+        )
+        logger.debug(
+            "Published conversation.history.invalidated event",
+            conversation_id=str(event.conversation_id),
+        )
+
+    def on_history_invalidated(self, callback: Callable[[uuid.UUID], None]) -> None:
+        """Call ``callback`` with the conversation ID of every invalidation.
+
+        Must be registered before entering the context manager, so the
+        subscription starts with the broker.
+        """
+
+        async def handle(event: ConversationHistoryInvalidated) -> None:
+            callback(event.conversation_id)
+
+        self._broker.subscriber(SUBJECT_CONVERSATION_HISTORY_INVALIDATED)(handle)
@@ -10,6 +10,9 @@ class DocumentUploaded(BaseModel):
     storage_path: str
     content_type: str
     filename: str
+    # Set by an explicit reprocess: always re-extract, even when a completed
+    # document has the same content
+    reprocess: bool = False
 
 
 class DocumentDeleted(BaseModel):
@@ -17,3 +20,9 @@ class DocumentDeleted(BaseModel):
 
     document_id: uuid.UUID
     storage_path: str
+
+
+class ConversationHistoryInvalidated(BaseModel):
+    """Event published when cached history of a conversation must be dropped."""
+
+    conversation_id: uuid.UUID
@@ -8,6 +8,8 @@ from fastai.utils.settings import FastAISettings
 # Subject constants — domain contract shared by publisher and subscriber
 SUBJECT_DOCUMENT_UPLOADED = "document.uploaded"
 SUBJECT_DOCUMENT_DELETED = "document.deleted"
+# Plain NATS (not JetStream): every api process receives every message
+SUBJECT_CONVERSATION_HISTORY_INVALIDATED = "conversation.history.invalidated"
 
 # Default stream for subscriber decorators (must exist at import time)
 DOCUMENT_STREAM = JStream(name="documents")
@@ -1,5 +1,8 @@
-from fastai.extraction.core import ExtractionService
+from fastai.extraction.core import ChunkSizing, ExtractionService
+from fastai.extraction.settings import ExtractionSettings
 
 __all__ = [
+    "ChunkSizing",
     "ExtractionService",
+    "ExtractionSettings",
 ]
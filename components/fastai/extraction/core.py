@@ -3,14 +3,26 @@
 # DOCX/PPTX/XLSX/image extraction, docling can return as a separate
 # sidecar/API (similar to Open-WebUI's architecture).
 import asyncio
+import itertools
+import multiprocessing
 import os
+from collections import deque
+from collections.abc import AsyncGenerator, Callable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 from functools import partial
 from io import BytesIO
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, NamedTuple
 
 import ftfy  # pyright: ignore[reportMissingImports]
 import structlog.stdlib
 from pypdf import PdfReader  # pyright: ignore[reportMissingImports]
 
+from fastai.extraction.settings import ExtractionSettings
+from fastai.utils.tokens import APPROXIMATE, TokenCounter, get_token_counter
+
 logger = structlog.stdlib.get_logger(__name__)
 
 # Separators used by the recursive character splitter, tried in order.
@@ -19,93 +31,367 @@ _SEPARATORS = ["\n\n", "\n", ". ", " ", ""]
 _TEXT_EXTENSIONS = {".md", ".markdown", ".html", ".htm", ".txt", ".text"}
 
 
+def _split_on(text: str, sep: str, max_chars: int, overlap: int) -> list[str]:
+    """Pack the *sep*-separated parts of *text* into chunks.
+
+    Equivalent to joining ``text.split(sep)`` (or ``list(text)`` for an
+    empty *sep*) part by part, but the current chunk is tracked as a
+    ``text[start:end]`` window, so the text is scanned once and only the
+    emitted chunks are copied.
+    """
+    length = len(text)
+    width = len(sep)
+    # Unless sep can overlap itself (as "\n\n" does), any occurrence found
+    # by rfind is one that split() would have used too
+    can_jump = not any(sep[:k] == sep[-k:] for k in range(1, width))
+    chunks: list[str] = []
+    start = 0
+    end = text.find(sep) if sep else 1
+    while end < length:
+        limit = start + max_chars
+        if end < limit:
+            # Take every whole part that still fits in one step
+            if not sep or length <= limit:
+                end = min(limit, length)
+                continue
+            if can_jump:
+                last = text.rfind(sep, end + width, limit + width)
+                if last != -1:
+                    end = last
+                    continue
+
+        part_start = end + width
+        part_end = text.find(sep, part_start) if sep else part_start + 1
+        if part_end == -1:
+            part_end = length
+        if part_end - start <= max_chars:
+            end = part_end
+            continue
+
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        # Start the next chunk with overlap from the previous one
+        if overlap and end > start:
+            start = max(start, end - overlap)
+        else:
+            start = part_start
+        end = part_end
+
+    chunk = text[start:end].strip()
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
 def _chunk_text(text: str, max_chars: int = 1500, overlap: int = 100) -> list[str]:
     """Split *text* into chunks using recursive character splitting.
 
     Tries splitting on paragraph boundaries first, then newlines, then
     sentences, then spaces, and finally hard character splits. Chunks
     include *overlap* characters from the end of the previous chunk to
-    preserve context across boundaries.
+    preserve context across boundaries. Runs in time linear in the text.
     """
     text = text.strip()
     if not text:
         return []
     if len(text) <= max_chars:
         return [text]
+    chunks, _ = _split_text(text, max_chars, overlap, _SEPARATORS)
+    return chunks
+
+
+def _split_text(
+    text: str, max_chars: int, overlap: int, separators: list[str]
+) -> tuple[list[str], list[str]]:
+    """Split on the first of *separators* that yields several chunks.
 
+    Returns the chunks and the separators after the one used.
+    """
     # Find the best separator that produces a split
-    for sep in _SEPARATORS:
+    for level, sep in enumerate(separators):
         if sep and sep not in text:
             continue
-        parts = text.split(sep) if sep else list(text)
-        if len(parts) <= 1 and sep:
-            continue
-
-        chunks: list[str] = []
-        current = parts[0]
-        for part in parts[1:]:
-            candidate = current + sep + part if sep else current + part
-            if len(candidate) <= max_chars:
-                current = candidate
-            else:
-                if current.strip():
-                    chunks.append(current.strip())
-                # Start new chunk with overlap from the previous one
-                if overlap and current:
-                    tail = current[-overlap:]
-                    current = tail + sep + part if sep else tail + part
-                else:
-                    current = part
-
-        if current.strip():
-            chunks.append(current.strip())
-
+        chunks = _split_on(text, sep, max_chars, overlap)
         if len(chunks) > 1:
-            return chunks
+            return chunks, separators[level + 1 :]
 
     # Fallback: hard split (shouldn't normally reach here)
-    return [text[i : i + max_chars] for i in range(0, len(text), max_chars - overlap)]
+    step = max_chars - overlap
+    return [text[i : i + max_chars] for i in range(0, len(text), step)], []
+
+
+def _chunk_by_tokens(
+    text: str,
+    max_tokens: int,
+    overlap_tokens: int,
+    count: TokenCounter,
+    separators: list[str] = _SEPARATORS,
+) -> list[str]:
+    """Split *text* into chunks of at most *max_tokens* tokens.
+
+    The token budgets become character budgets through the text's own
+    characters per token, so the character splitter does the work.
+    Chunks still over budget (denser text than average, or a paragraph
+    longer than a chunk) are split again with the finer separators only.
+    """
+    text = text.strip()
+    if not text:
+        return []
+    tokens = count(text)
+    if tokens <= max_tokens:
+        return [text]
+
+    chars_per_token = len(text) / tokens
+    max_chars = max(int(max_tokens * chars_per_token), 1)
+    overlap = min(int(overlap_tokens * chars_per_token), max_chars - 1)
+    chunks, finer = _split_text(text, max_chars, overlap, separators)
+    if not finer:
+        return chunks
+    result: list[str] = []
+    for chunk in chunks:
+        if count(chunk) > max_tokens:
+            result.extend(
+                _chunk_by_tokens(chunk, max_tokens, overlap_tokens, count, finer)
+            )
+        else:
+            result.append(chunk)
+    return result
+
+
+class ChunkSizing(NamedTuple):
+    """Chunk size and overlap in tokens, as counted by ``token_counter``.
+
+    ``token_counter`` is a name for :func:`fastai.utils.tokens.get_token_counter`,
+    so the sizing can be sent to extraction processes.
+    """
+
+    max_tokens: int = 375
+    overlap_tokens: int = 25
+    token_counter: str = APPROXIMATE
+
+    def split(self, text: str) -> list[str]:
+        """Split extracted text into non-empty chunks."""
+        count = get_token_counter(self.token_counter)
+        chunks = _chunk_by_tokens(text, self.max_tokens, self.overlap_tokens, count)
+        return [c for c in chunks if c.strip()]
+
+
+class _SharedDocument(NamedTuple):
+    """A document the parent copied into a shared memory block."""
+
+    name: str
+    size: int
+
+    def read(self) -> bytes:
+        shm = SharedMemory(name=self.name, track=False)
+        try:
+            buf = shm.buf
+            assert buf is not None
+            return bytes(buf[: self.size])
+        finally:
+            shm.close()
+
+
+def _call(func: Callable[..., Any], document: bytes | _SharedDocument, *args) -> Any:
+    """Process-pool entry point: ``func(document bytes, *args)``."""
+    if isinstance(document, _SharedDocument):
+        document = document.read()
+    return func(document, *args)
+
+
+def _page_ranges(page_count: int, parts: int) -> list[tuple[int, int]]:
+    """Split ``range(page_count)`` into *parts* contiguous, near-equal ranges."""
+    bounds = [page_count * i // parts for i in range(parts + 1)]
+    return list(itertools.pairwise(bounds))
 
 
 class ExtractionService:
     """Document text extraction and chunking using pypdf.
 
-    Reuses lightweight pypdf readers per call (no model loading).
-    Extraction runs in a thread executor to avoid blocking the event loop.
+    Reuses lightweight pypdf readers per call (no model loading). pypdf and
+    ftfy are pure Python and hold the GIL, so extraction runs in a pool of
+    spawned processes, started on first use. Processes are replaced after
+    ``max_tasks_per_child`` documents, and large documents are handed over
+    through shared memory rather than pickled. PDFs of at least
+    ``parallel_page_threshold`` pages are split into page ranges that are
+    extracted in parallel and reassembled in order.
     """
 
+    def __init__(
+        self,
+        settings: ExtractionSettings | None = None,
+        chunk_sizing: ChunkSizing | None = None,
+    ) -> None:
+        self.settings = settings or ExtractionSettings()
+        self.chunk_sizing = chunk_sizing or ChunkSizing()
+        self._pool: ProcessPoolExecutor | None = None
+
+    @property
+    def _processes(self) -> int:
+        if self.settings.max_workers is not None:
+            return self.settings.max_workers
+        return os.process_cpu_count() or 1
+
+    def _executor(self) -> Executor | None:
+        """The process pool, or None for the default thread pool."""
+        if self._processes == 0:
+            return None
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=self.settings.max_tasks_per_child,
+            )
+        return self._pool
+
+    @contextmanager
+    def _share(self, file_bytes: bytes) -> Iterator[bytes | _SharedDocument]:
+        """Yield the document as handed to pool tasks, bytes or shared memory."""
+        size = len(file_bytes)
+        if (
+            self._processes == 0
+            or not size
+            or size < self.settings.shared_memory_threshold
+        ):
+            yield file_bytes
+            return
+
+        shm = SharedMemory(create=True, size=size)
+        try:
+            buf = shm.buf
+            assert buf is not None
+            buf[:size] = file_bytes
+            yield _SharedDocument(shm.name, size)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    async def _submit(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run ``func(*args)`` in the pool (or default thread pool)."""
+        loop = asyncio.get_running_loop()
+        executor = self._executor()
+        try:
+            return await loop.run_in_executor(executor, partial(func, *args))
+        except BrokenProcessPool:
+            # A process died (e.g. killed for memory); start a fresh pool
+            # for the next document rather than failing every later one.
+            if executor is not None and executor is self._pool:
+                logger.warning("Extraction process pool broken, restarting")
+                self._pool = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    async def _extract(
+        self, file_bytes: bytes, filename: str, sizing: ChunkSizing | None
+    ) -> Any:
+        """Extract (and optionally chunk) a document in the pool.
+
+        Most documents take a single task. For a PDF over the page
+        threshold, that task only counts its pages; the page ranges are
+        then extracted in parallel.
+        """
+        parts = min(self.settings.max_page_ranges, self._processes)
+        page_threshold = self.settings.parallel_page_threshold if parts > 1 else None
+
+        with self._share(file_bytes) as document:
+            result = await self._submit(
+                _call, self._prepare_sync, document, filename, sizing, page_threshold
+            )
+            if not isinstance(result, int):
+                return result
+
+            ranges = _page_ranges(result, min(parts, result))
+            texts = await asyncio.gather(
+                *(
+                    self._submit(_call, self._extract_pdf_range, document, *pages)
+                    for pages in ranges
+                )
+            )
+        logger.info(
+            "Extracted PDF page ranges in parallel",
+            filename=filename,
+            page_count=result,
+            range_count=len(ranges),
+        )
+        text = "\n\n".join(texts)
+        if sizing is not None:
+            return await self._submit(sizing.split, text)
+        return text
+
+    def shutdown(self) -> None:
+        """Stop the extraction processes."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
     # ------------------------------------------------------------------
     # Extraction
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _extract_pdf(file_bytes: bytes) -> str:
-        """Extract text from a PDF using pypdf."""
-        reader = PdfReader(BytesIO(file_bytes))
-        pages = [page.extract_text() or "" for page in reader.pages]
+    def _pdf_text(reader: PdfReader, start: int = 0, stop: int | None = None) -> str:
+        """Extract the text of pages ``start:stop``."""
+        pages = [page.extract_text() or "" for page in reader.pages[start:stop]]
         return "\n\n".join(pages)
 
+    @classmethod
+    def _extract_pdf(cls, file_bytes: bytes) -> str:
+        """Extract text from a PDF using pypdf."""
+        return cls._pdf_text(PdfReader(BytesIO(file_bytes)))
+
+    @classmethod
+    def _extract_pdf_range(cls, file_bytes: bytes, start: int, stop: int) -> str:
+        """Extract and clean the text of one page range of a PDF."""
+        return ftfy.fix_text(cls._pdf_text(PdfReader(BytesIO(file_bytes)), start, stop))
+
     @staticmethod
     def _extract_text_content(file_bytes: bytes) -> str:
         """Decode raw bytes as UTF-8 text."""
         return file_bytes.decode("utf-8", errors="replace")
 
-    def _extract_sync(self, file_bytes: bytes, filename: str) -> str:
+    @classmethod
+    def _extract_sync(cls, file_bytes: bytes, filename: str) -> str:
         """Synchronous text extraction, routed by file extension."""
         ext = os.path.splitext(filename)[1].lower()
         if ext == ".pdf":
-            raw = self._extract_pdf(file_bytes)
+            raw = cls._extract_pdf(file_bytes)
         elif ext in _TEXT_EXTENSIONS:
-            raw = self._extract_text_content(file_bytes)
+            raw = cls._extract_text_content(file_bytes)
         else:
-            raw = self._extract_text_content(file_bytes)
+            raw = cls._extract_text_content(file_bytes)
 
         return ftfy.fix_text(raw)
 
+    @classmethod
+    def _prepare_sync(
+        cls,
+        file_bytes: bytes,
+        filename: str,
+        sizing: ChunkSizing | None,
+        page_threshold: int | None,
+    ) -> str | list[str] | int:
+        """Extract (and chunk) a document, unless it is a PDF to split.
+
+        Returns the page count instead when the document is a PDF with at
+        least *page_threshold* pages.
+        """
+        ext = os.path.splitext(filename)[1].lower()
+        if page_threshold is not None and ext == ".pdf":
+            reader = PdfReader(BytesIO(file_bytes))
+            page_count = len(reader.pages)
+            if page_count >= page_threshold:
+                return page_count
+            text = ftfy.fix_text(cls._pdf_text(reader))
+        else:
+            text = cls._extract_sync(file_bytes, filename)
+        return sizing.split(text) if sizing is not None else text
+
     async def extract_text(self, file_bytes: bytes, filename: str) -> str:
         """Extract text from a document.
 
-        Runs extraction in a thread executor since pypdf is synchronous.
+        Runs extraction in the process pool since pypdf is synchronous
+        and CPU-bound.
 
         Args:
             file_bytes: The raw file content.
@@ -114,11 +400,7 @@ class ExtractionService:
         Returns:
             Extracted and cleaned text.
         """
-        loop = asyncio.get_running_loop()
-        text = await loop.run_in_executor(
-            None,
-            partial(self._extract_sync, file_bytes, filename),
-        )
+        text = await self._extract(file_bytes, filename, None)
         logger.info("Extracted text", filename=filename, text_length=len(text))
         return text
 
@@ -126,17 +408,11 @@ class ExtractionService:
     # Chunking
     # ------------------------------------------------------------------
 
-    def _chunk_sync(self, file_bytes: bytes, filename: str) -> list[str]:
-        """Synchronous extraction + chunking."""
-        text = self._extract_sync(file_bytes, filename)
-        chunks = _chunk_text(text)
-        return [c for c in chunks if c.strip()]
-
     async def extract_and_chunk(self, file_bytes: bytes, filename: str) -> list[str]:
         """Extract text and split into chunks for embedding.
 
         Uses recursive character splitting on paragraph, newline,
-        and sentence boundaries.
+        and sentence boundaries, sized in tokens by ``chunk_sizing``.
 
         Args:
             file_bytes: The raw file content.
@@ -145,14 +421,99 @@ class ExtractionService:
         Returns:
             A list of text chunks suitable for embedding.
         """
-        loop = asyncio.get_running_loop()
-        chunks = await loop.run_in_executor(
-            None,
-            partial(self._chunk_sync, file_bytes, filename),
-        )
+        chunks = await self._extract(file_bytes, filename, self.chunk_sizing)
         logger.info(
             "Extracted and chunked document",
             filename=filename,
             chunk_count=len(chunks),
         )
         return chunks
+
+    async def iter_chunks(
+        self, file_bytes: bytes, filename: str
+    ) -> AsyncGenerator[str, None]:
+        """Yield a document's chunks as its pages are extracted.
+
+        PDFs with more than ``stream_pages`` pages are extracted
+        ``stream_pages`` at a time, with up to one step per process running
+        ahead, so only a few steps' text is held at once. The last chunk
+        of each step is carried into the next, so chunks still span page
+        boundaries; chunk boundaries may differ slightly from
+        :meth:`extract_and_chunk`.
+
+        Use with ``contextlib.aclosing`` when the consumer may stop early,
+        so in-flight extraction is cancelled promptly.
+
+        Args:
+            file_bytes: The raw file content.
+            filename: The filename (used to infer format).
+
+        Yields:
+            Text chunks suitable for embedding, in document order.
+        """
+        step = self.settings.stream_pages
+        lookahead = max(1, min(self.settings.max_page_ranges, self._processes))
+        chunk_count = 0
+
+        with self._share(file_bytes) as document:
+            result = await self._submit(
+                _call,
+                self._prepare_sync,
+                document,
+                filename,
+                self.chunk_sizing,
+                step + 1,
+            )
+            if not isinstance(result, int):
+                for chunk in result:
+                    yield chunk
+                logger.info(
+                    "Extracted and chunked document",
+                    filename=filename,
+                    chunk_count=len(result),
+                )
+                return
+
+            ranges = iter(
+                [(start, min(start + step, result)) for start in range(0, result, step)]
+            )
+            in_flight: deque[asyncio.Future[str]] = deque()
+
+            def schedule() -> None:
+                for pages in itertools.islice(ranges, lookahead - len(in_flight)):
+                    in_flight.append(
+                        asyncio.ensure_future(
+                            self._submit(
+                                _call, self._extract_pdf_range, document, *pages
+                            )
+                        )
+                    )
+
+            carry = ""
+            try:
+                schedule()
+                while in_flight:
+                    text = await in_flight.popleft()
+                    schedule()
+                    chunks = await self._submit(
+                        self.chunk_sizing.split, f"{carry}\n\n{text}" if carry else text
+                    )
+                    carry = chunks.pop() if chunks else ""
+                    for chunk in chunks:
+                        yield chunk
+                    chunk_count += len(chunks)
+                if carry:
+                    yield carry
+                    chunk_count += 1
+            finally:
+                for future in in_flight:
+                    future.cancel()
+                # Stop reading ahead when the consumer stops early
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+        logger.info(
+            "Extracted and chunked document",
+            filename=filename,
+            page_count=result,
+            chunk_count=chunk_count,
+        )
@@ -0,0 +1,60 @@
+from pydantic import Field
+from pydantic_settings import SettingsConfigDict
+
+from fastai.utils.settings import FastAISettings
+
+
+class ExtractionSettings(FastAISettings):
+    """Settings for document text extraction."""
+
+    model_config = SettingsConfigDict(env_prefix="FASTAI_EXTRACTION_")
+
+    max_workers: int | None = Field(
+        default=None,
+        ge=0,
+        description=(
+            "Extraction processes. Defaults to the number of CPUs; 0 runs "
+            "extraction in the event loop's default thread pool instead."
+        ),
+    )
+    max_tasks_per_child: int | None = Field(
+        default=50,
+        gt=0,
+        description=(
+            "Documents a process extracts before it is replaced, bounding "
+            "memory growth from large PDFs. None keeps processes for the "
+            "pool's lifetime."
+        ),
+    )
+    shared_memory_threshold: int = Field(
+        default=64 * 1024,
+        ge=0,
+        description=(
+            "Documents of at least this many bytes reach extraction processes "
+            "through shared memory instead of being pickled."
+        ),
+    )
+    parallel_page_threshold: int = Field(
+        default=100,
+        gt=0,
+        description=(
+            "PDFs with at least this many pages are split into page ranges "
+            "extracted in parallel."
+        ),
+    )
+    max_page_ranges: int = Field(
+        default=8,
+        gt=0,
+        description=(
+            "Most page ranges one PDF is split into, further capped by the "
+            "number of extraction processes."
+        ),
+    )
+    stream_pages: int = Field(
+        default=20,
+        gt=0,
+        description=(
+            "Pages extracted per step when streaming a PDF's chunks with "
+            "ExtractionService.iter_chunks."
+        ),
+    )
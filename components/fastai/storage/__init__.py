@@ -1,6 +1,8 @@
 from fastai.storage.core import StorageService, StorageSettings
+from fastai.storage.schemas import UploadResult
 
 __all__ = [
     "StorageService",
     "StorageSettings",
+    "UploadResult",
 ]
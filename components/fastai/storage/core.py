@@ -1,14 +1,20 @@
-from typing import IO, Self
+import asyncio
+import hashlib
+import os
+from typing import IO, Any, Literal, Protocol, Self
 
 import aioboto3
 import structlog.stdlib
 from aioboto3.session import ResourceCreatorContext
+from aiobotocore.config import AioConfig
 from botocore.exceptions import ClientError
-from pydantic import SecretStr
+from pydantic import Field, SecretStr
 from pydantic_settings import SettingsConfigDict
 from types_aiobotocore_s3 import S3ServiceResource
 from types_aiobotocore_s3.service_resource import Bucket, ObjectSummary
+from types_aiobotocore_s3.type_defs import CompletedPartTypeDef
 
+from fastai.storage.schemas import UploadResult
 from fastai.utils.settings import FastAISettings
 
 logger = structlog.stdlib.get_logger(__name__)
@@ -29,6 +35,41 @@ class StorageSettings(FastAISettings):
     secret_key: SecretStr
     region: str = "us-east-1"
     bucket: str = "fastai"
+    multipart_part_size: int = Field(
+        default=8 * 1024 * 1024,
+        ge=5 * 1024 * 1024,
+        description=(
+            "Bytes per part for streamed multipart uploads. S3 requires at "
+            "least 5 MiB for every part but the last. Also the range size "
+            "for parallel downloads."
+        ),
+    )
+    multipart_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description=(
+            "Max parts uploaded or ranges downloaded concurrently per object. "
+            "A streamed upload buffers up to this many parts."
+        ),
+    )
+    max_pool_connections: int = Field(
+        default=50,
+        ge=1,
+        description=(
+            "Max pooled HTTP connections of the shared S3 client. Should cover "
+            "concurrent requests times multipart_concurrency."
+        ),
+    )
+    connect_timeout: float = Field(default=5.0, gt=0)
+    read_timeout: float = Field(default=60.0, gt=0)
+    tcp_keepalive: bool = True
+    checksum_algorithm: Literal["CRC32", "CRC32C", "SHA256"] | None = Field(
+        default=None,
+        description=(
+            "Client-side checksum sent with every upload and verified by S3. "
+            "CRC32C requires the awscrt package."
+        ),
+    )
 
     def create_session(self) -> aioboto3.Session:
         """Create an aioboto3 session from these settings.
@@ -52,7 +93,45 @@ class StorageSettings(FastAISettings):
                 ...
         """
         session = self.create_session()
-        return session.resource("s3", endpoint_url=self.endpoint_url)
+        return session.resource(
+            "s3", endpoint_url=self.endpoint_url, config=self.create_client_config()
+        )
+
+    def create_client_config(self) -> AioConfig:
+        """Create the botocore config for the connection pool."""
+        return AioConfig(
+            max_pool_connections=self.max_pool_connections,
+            connect_timeout=self.connect_timeout,
+            read_timeout=self.read_timeout,
+            tcp_keepalive=self.tcp_keepalive,
+        )
+
+
+class AsyncReadable(Protocol):
+    """Anything with an awaitable ``read(size)``, e.g. FastAPI's ``UploadFile``."""
+
+    async def read(self, size: int = -1) -> bytes: ...
+
+
+async def _read_part(stream: AsyncReadable, size: int) -> bytes:
+    """Read exactly ``size`` bytes unless the stream ends first."""
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = await stream.read(size - len(buffer))
+        if not chunk:
+            break
+        buffer += chunk
+    return bytes(buffer)
+
+
+class _ThreadedReader:
+    """Adapts a blocking file object to :class:`AsyncReadable`."""
+
+    def __init__(self, fileobj: IO[bytes]) -> None:
+        self._fileobj = fileobj
+
+    async def read(self, size: int = -1) -> bytes:
+        return await asyncio.to_thread(self._fileobj.read, size)
 
 
 class StorageService:
@@ -62,6 +141,10 @@ class StorageService:
 
         async with StorageService(settings) as svc:
             await svc.upload_bytes(b"data", "key")
+
+    Entering opens an S3 client with its own HTTP connection pool, so the
+    api and worker open one service in their lifespans and share it across
+    requests and messages; the client is safe for concurrent use.
     """
 
     def __init__(self, settings: StorageSettings) -> None:
@@ -96,43 +179,235 @@ class StorageService:
             )
         return self._bucket
 
+    @property
+    def part_size(self) -> int:
+        """Bytes per multipart upload part and per ranged download GET."""
+        return self._settings.multipart_part_size
+
+    def _checksum_args(self) -> dict[str, Any]:
+        algorithm = self._settings.checksum_algorithm
+        return {"ChecksumAlgorithm": algorithm} if algorithm else {}
+
+    def _checksum(self, response: Any) -> str | None:
+        algorithm = self._settings.checksum_algorithm
+        return response.get(f"Checksum{algorithm}") if algorithm else None
+
     async def upload_fileobj(
         self,
         fileobj: IO[bytes],
         key: str,
         content_type: str = "application/octet-stream",
-    ) -> str:
+    ) -> UploadResult:
         """Upload a file-like object to S3.
 
-        Returns the ETag of the uploaded object (quotes stripped).
+        Reads happen in a worker thread and large files are sent as a
+        multipart upload, see :meth:`upload_stream`.
         """
+        return await self.upload_stream(
+            _ThreadedReader(fileobj), key, content_type=content_type
+        )
+
+    async def upload_bytes(
+        self,
+        data: bytes,
+        key: str,
+        content_type: str = "application/octet-stream",
+    ) -> UploadResult:
+        """Upload raw bytes to S3 with a single PUT."""
         b = self.bucket
-        await b.upload_fileobj(
-            Fileobj=fileobj,
+        response = await self.resource.meta.client.put_object(
+            Bucket=b.name,
             Key=key,
-            ExtraArgs={"ContentType": content_type},
+            Body=data,
+            ContentType=content_type,
+            **self._checksum_args(),
         )
-        obj = await b.Object(key)
-        await obj.load()
-        etag: str = (await obj.e_tag).strip('"')
+        etag = response["ETag"].strip('"')
         logger.info("Uploaded object", bucket=b.name, key=key, etag=etag)
-        return etag
+        return UploadResult(
+            key=key,
+            etag=etag,
+            size=len(data),
+            sha256=hashlib.sha256(data).hexdigest(),
+            checksum=self._checksum(response),
+        )
 
-    async def upload_bytes(
+    async def upload_stream(
         self,
-        data: bytes,
+        stream: AsyncReadable,
         key: str,
         content_type: str = "application/octet-stream",
-    ) -> str:
-        """Upload raw bytes to S3.
+        part_size: int | None = None,
+        concurrency: int | None = None,
+    ) -> UploadResult:
+        """Stream an object to S3 without holding it in memory.
+
+        The stream is read in ``part_size`` pieces. Anything that fits in one
+        part is sent with a single PUT; larger streams use a multipart upload
+        with up to ``concurrency`` parts in flight, so at most that many parts
+        are buffered at a time. The SHA-256 and size are computed along the
+        way. ETag and checksum come from the upload responses, so no HEAD
+        request is needed. A failed multipart upload is aborted.
+        """
+        b = self.bucket
+        part_size = part_size or self._settings.multipart_part_size
+        digest = hashlib.sha256()
+
+        part = await _read_part(stream, part_size)
+        digest.update(part)
+
+        if len(part) < part_size:
+            response = await self.resource.meta.client.put_object(
+                Bucket=b.name,
+                Key=key,
+                Body=part,
+                ContentType=content_type,
+                **self._checksum_args(),
+            )
+            size = len(part)
+        else:
+            response, size = await self._upload_parts(
+                stream,
+                key,
+                content_type,
+                part,
+                digest,
+                part_size,
+                concurrency or self._settings.multipart_concurrency,
+            )
 
-        Returns the ETag of the uploaded object (quotes stripped).
+        etag = response["ETag"].strip('"')
+        logger.info("Uploaded object", bucket=b.name, key=key, etag=etag, size=size)
+        return UploadResult(
+            key=key,
+            etag=etag,
+            size=size,
+            sha256=digest.hexdigest(),
+            checksum=self._checksum(response),
+        )
+
+    async def upload_multipart(
+        self,
+        stream: AsyncReadable,
+        key: str,
+        content_type: str = "application/octet-stream",
+        part_size: int | None = None,
+        concurrency: int | None = None,
+    ) -> UploadResult:
+        """Upload a stream with a multipart upload regardless of its size.
+
+        Parts of ``part_size`` bytes are uploaded with up to ``concurrency``
+        in flight. Prefer :meth:`upload_stream`, which skips the multipart
+        round trips for small objects.
         """
         b = self.bucket
-        obj = await b.put_object(Key=key, Body=data, ContentType=content_type)
-        etag: str = (await obj.e_tag).strip('"')
-        logger.info("Uploaded object", bucket=b.name, key=obj.key, etag=etag)
-        return etag
+        part_size = part_size or self._settings.multipart_part_size
+        digest = hashlib.sha256()
+
+        part = await _read_part(stream, part_size)
+        digest.update(part)
+        response, size = await self._upload_parts(
+            stream,
+            key,
+            content_type,
+            part,
+            digest,
+            part_size,
+            concurrency or self._settings.multipart_concurrency,
+        )
+
+        etag = response["ETag"].strip('"')
+        logger.info("Uploaded object", bucket=b.name, key=key, etag=etag, size=size)
+        return UploadResult(
+            key=key,
+            etag=etag,
+            size=size,
+            sha256=digest.hexdigest(),
+            checksum=self._checksum(response),
+        )
+
+    async def _upload_parts(
+        self,
+        stream: AsyncReadable,
+        key: str,
+        content_type: str,
+        first_part: bytes,
+        digest: "hashlib._Hash",
+        part_size: int,
+        concurrency: int,
+    ) -> tuple[Any, int]:
+        """Run a multipart upload starting from an already read first part.
+
+        Parts are read sequentially (feeding ``digest``) and uploaded
+        concurrently. Returns the CompleteMultipartUpload response and the
+        total size.
+        """
+        b = self.bucket
+        client = self.resource.meta.client
+        checksum_args = self._checksum_args()
+        checksum_field = f"Checksum{self._settings.checksum_algorithm}"
+        upload = await client.create_multipart_upload(
+            Bucket=b.name, Key=key, ContentType=content_type, **checksum_args
+        )
+        upload_id = upload["UploadId"]
+        completed_parts: dict[int, CompletedPartTypeDef] = {}
+
+        async def upload_part(part_number: int, body: bytes) -> None:
+            response = await client.upload_part(
+                Bucket=b.name,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=body,
+                **checksum_args,
+            )
+            completed_part: CompletedPartTypeDef = {
+                "ETag": response["ETag"],
+                "PartNumber": part_number,
+            }
+            if checksum_args:
+                completed_part[checksum_field] = response[checksum_field]
+            completed_parts[part_number] = completed_part
+
+        pending: set[asyncio.Task[None]] = set()
+        part, size, part_number = first_part, len(first_part), 0
+        try:
+            # An empty stream still needs one (empty) part
+            while part or part_number == 0:
+                if len(pending) >= concurrency:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        task.result()
+                part_number += 1
+                pending.add(asyncio.create_task(upload_part(part_number, part)))
+                part = await _read_part(stream, part_size)
+                digest.update(part)
+                size += len(part)
+            await asyncio.gather(*pending)
+
+            completed = await client.complete_multipart_upload(
+                Bucket=b.name,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={
+                    "Parts": [
+                        completed_parts[number] for number in sorted(completed_parts)
+                    ]
+                },
+            )
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            # Let cancelled parts finish before aborting, or a part still in
+            # flight can land after the abort and be orphaned
+            await asyncio.gather(*pending, return_exceptions=True)
+            await client.abort_multipart_upload(
+                Bucket=b.name, Key=key, UploadId=upload_id
+            )
+            raise
+        return completed, size
 
     async def download_fileobj(
         self,
@@ -156,6 +431,77 @@ class StorageService:
         logger.info("Downloaded object", bucket=b.name, key=key)
         return data
 
+    async def download_range(
+        self,
+        key: str,
+        start: int,
+        end: int,
+    ) -> bytes:
+        """Download bytes ``start`` through ``end`` (inclusive) of an object."""
+        b = self.bucket
+        response = await self.resource.meta.client.get_object(
+            Bucket=b.name, Key=key, Range=f"bytes={start}-{end}"
+        )
+        data = await response["Body"].read()
+        logger.debug(
+            "Downloaded object range", bucket=b.name, key=key, start=start, end=end
+        )
+        return data
+
+    async def download_to_file(
+        self,
+        key: str,
+        path: str | os.PathLike[str],
+        part_size: int | None = None,
+        concurrency: int | None = None,
+    ) -> int:
+        """Download an object to a local file using parallel ranged GETs.
+
+        The file is preallocated to the object's size and each range is
+        written at its offset as it arrives, with up to ``concurrency``
+        ranges in flight. Returns the number of bytes written.
+        """
+        b = self.bucket
+        part_size = part_size or self._settings.multipart_part_size
+        semaphore = asyncio.Semaphore(
+            concurrency or self._settings.multipart_concurrency
+        )
+        head = await self.resource.meta.client.head_object(Bucket=b.name, Key=key)
+        size: int = head["ContentLength"]
+
+        with open(path, "wb") as f:
+            f.truncate(size)
+            fd = f.fileno()
+
+            async def fetch(start: int) -> None:
+                async with semaphore:
+                    data = await self.download_range(
+                        key, start, min(start + part_size, size) - 1
+                    )
+                write = asyncio.ensure_future(
+                    asyncio.to_thread(os.pwrite, fd, data, start)
+                )
+                try:
+                    await asyncio.shield(write)
+                except asyncio.CancelledError:
+                    # The thread keeps writing; the file must stay open
+                    await write
+                    raise
+
+            tasks = [
+                asyncio.create_task(fetch(start)) for start in range(0, size, part_size)
+            ]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+
+        logger.info("Downloaded object", bucket=b.name, key=key, size=size)
+        return size
+
     async def delete_object(
         self,
         key: str,
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+
+
+class UploadResult(BaseModel):
+    """Outcome of an upload, taken from the upload responses themselves."""
+
+    key: str
+    etag: str
+    size: int
+    sha256: str
+    # Base64 S3 checksum when StorageSettings.checksum_algorithm is set;
+    # "<checksum>-<parts>" for multipart uploads
+    checksum: str | None = None
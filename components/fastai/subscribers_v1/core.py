@@ -11,7 +11,7 @@ def init_subscribers_v1() -> NatsRouter:
     by the worker lifespan:
 
     - ``db_engine`` (AsyncEngine)
-    - ``storage_settings`` (StorageSettings)
+    - ``storage`` (StorageService, already entered)
     - ``extraction_service`` (ExtractionService)
     - ``knowledge_base`` (KnowledgeBase)
     """
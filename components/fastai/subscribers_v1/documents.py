@@ -1,3 +1,10 @@
+import asyncio
+import tempfile
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+from pathlib import Path
+
 import structlog.stdlib
 from faststream.nats import NatsRouter, PullSub
 from sqlmodel.ext.asyncio.session import AsyncSession
@@ -7,6 +14,7 @@ from fastai.embeddings.models import Embedding
 from fastai.embeddings.schemas import EmbeddingCreate
 from fastai.events import DOCUMENT_STREAM, SUBJECT_DOCUMENT_UPLOADED
 from fastai.events.schemas import DocumentUploaded
+from fastai.storage.core import StorageService
 from fastai.subscribers_v1.dependencies import (
     EngineDep,
     ExtractionDep,
@@ -19,6 +27,32 @@ logger = structlog.stdlib.get_logger(__name__)
 router = NatsRouter()
 
 
+async def _download(storage: StorageService, key: str, size: int) -> bytes:
+    """Download a document, as parallel ranged GETs if it spans several parts."""
+    if size <= storage.part_size:
+        return await storage.download_bytes(key)
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "document"
+        await storage.download_to_file(key, path)
+        return await asyncio.to_thread(path.read_bytes)
+
+
+async def _embedding_items(
+    chunks: AsyncIterator[str], document_id: uuid.UUID, metadata: dict
+) -> AsyncIterator[EmbeddingCreate]:
+    """Wrap a document's chunks, in order, as embeddings to create."""
+    chunk_index = 0
+    async for chunk_text in chunks:
+        yield EmbeddingCreate(
+            source_type="document",
+            source_id=document_id,
+            chunk_text=chunk_text,
+            chunk_index=chunk_index,
+            extra_metadata={**metadata, "chunk_index": chunk_index},
+        )
+        chunk_index += 1
+
+
 @router.subscriber(
     SUBJECT_DOCUMENT_UPLOADED,
     stream=DOCUMENT_STREAM,
@@ -37,9 +71,10 @@ async def process_document(
     Steps:
         1. Mark document as "processing"
         2. Check content type support
-        3. Download file from S3
-        4. Extract text and chunk
-        5. Embed each chunk
+        3. Reuse embeddings of a completed document with the same content
+        4. Download file from S3
+        5. Stream chunks from extraction into batched embedding and
+           storage, overlapping the three, in one transaction
         6. Mark document as "completed"
 
     On error, marks the document as "failed".
@@ -66,13 +101,57 @@ async def process_document(
                 await doc.update_embedding_status(session, "skipped")
                 return
 
-            # Download file from S3
-            file_bytes = await storage.download_bytes(event.storage_path)
+            # Identical content was already embedded: copy its rows instead
+            # of extracting and embedding again, unless an explicit
+            # reprocess asks for fresh extraction
+            if doc.content_hash and not event.reprocess:
+                duplicate = await Document.get_completed_duplicate(
+                    session, doc.content_hash, exclude_id=doc.id
+                )
+                if duplicate is not None:
+                    copied = await Embedding.copy_source(
+                        session,
+                        "document",
+                        duplicate.id,
+                        doc.id,
+                        kb.model_name,
+                        metadata={
+                            "filename": event.filename,
+                            "content_type": event.content_type,
+                        },
+                    )
+                    if copied:
+                        logger.info(
+                            "Reused embeddings from duplicate document",
+                            document_id=str(document_id),
+                            duplicate_id=str(duplicate.id),
+                            chunks_copied=copied,
+                        )
+                        await doc.update_embedding_status(session, "completed")
+                        return
 
-            # Extract text and chunk
-            chunks = await extraction.extract_and_chunk(file_bytes, event.filename)
+            # Download file from S3
+            file_bytes = await _download(storage, event.storage_path, doc.file_size)
+
+            # Embed chunks in provider-sized batches while extraction is
+            # still running; existing embeddings for this document
+            # (re-processing) are replaced in the same transaction
+            metadata = {
+                "filename": event.filename,
+                "content_type": event.content_type,
+            }
+            async with aclosing(
+                extraction.iter_chunks(file_bytes, event.filename)
+            ) as chunks:
+                result = await kb.embed_and_store_stream(
+                    session,
+                    _embedding_items(chunks, document_id, metadata),
+                    replace=True,
+                    commit=False,
+                )
+            chunk_count = result.inserted + result.updated + result.skipped
 
-            if not chunks:
+            if not chunk_count:
                 logger.warning(
                     "No text extracted from document",
                     document_id=str(document_id),
@@ -80,31 +159,20 @@ async def process_document(
                 await doc.update_embedding_status(session, "skipped")
                 return
 
-            # Delete any existing embeddings for this document (re-processing)
-            await Embedding.delete_by_source(session, "document", document_id)
-
-            # Embed each chunk
-            for chunk_index, chunk_text in enumerate(chunks):
-                embedding_in = EmbeddingCreate(
-                    source_type="document",
-                    source_id=document_id,
-                    chunk_text=chunk_text,
-                    chunk_index=chunk_index,
-                    extra_metadata={
-                        "filename": event.filename,
-                        "content_type": event.content_type,
-                        "chunk_index": chunk_index,
-                        "total_chunks": len(chunks),
-                    },
-                )
-                result = await kb.embedder.embed_documents(chunk_text)
-                vector = list(result.embeddings[0])
-                await Embedding.upsert(session, embedding_in, vector, kb.model_name)
+            # The chunk count is only known once the stream ends; this
+            # commits the whole transaction
+            await Embedding.merge_metadata(
+                session,
+                "document",
+                document_id,
+                kb.model_name,
+                {"total_chunks": chunk_count},
+            )
 
             logger.info(
                 "Document processing completed",
                 document_id=str(document_id),
-                chunks_embedded=len(chunks),
+                chunks_embedded=chunk_count,
             )
 
             await doc.update_embedding_status(session, "completed")
@@ -0,0 +1,87 @@
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastai.users.schemas import UserPrincipal
+
+
+@dataclass
+class PrincipalCacheStats:
+    """Running counters for a :class:`PrincipalCache` and the auth it serves."""
+
+    hits: int = 0
+    misses: int = 0
+    auth_count: int = 0
+    auth_seconds: float = 0.0
+    auth_max_seconds: float = 0.0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def auth_mean_seconds(self) -> float:
+        return self.auth_seconds / self.auth_count if self.auth_count else 0.0
+
+    def record_auth(self, seconds: float) -> None:
+        """Record the latency of one request authentication."""
+        self.auth_count += 1
+        self.auth_seconds += seconds
+        self.auth_max_seconds = max(self.auth_max_seconds, seconds)
+
+
+class PrincipalCache:
+    """Size-bounded, short-TTL cache of :class:`UserPrincipal` by user ID.
+
+    Lets access-token verification skip the ``users`` lookup on most
+    requests. ``User`` methods that change a principal (update and deletes)
+    invalidate the entry in this process; other processes pick the change
+    up when their entry expires, so keep the TTL short. Login lockouts are
+    not part of the principal and need no invalidation.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.stats = PrincipalCacheStats()
+        # user_id -> (monotonic expiry, principal)
+        self._entries: OrderedDict[uuid.UUID, tuple[float, UserPrincipal]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, user_id: uuid.UUID) -> UserPrincipal | None:
+        """Return an unexpired principal and mark it recently used, or None."""
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.stats.hits += 1
+        return entry[1]
+
+    def put(self, principal: UserPrincipal, *, ttl: float) -> None:
+        """Store a principal for ``ttl`` seconds, evicting the LRU entry if full."""
+        if self.max_size <= 0 or ttl <= 0:
+            return
+        self._entries[principal.id] = (time.monotonic() + ttl, principal)
+        self._entries.move_to_end(principal.id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        """Drop a user's cached principal, if any."""
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# Module-level instance shared by the auth dependencies and the User model,
+# so model changes invalidate what the auth layer has cached.
+principal_cache = PrincipalCache(max_size=10_000)
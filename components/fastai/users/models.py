@@ -10,13 +10,20 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from fastai.auth import AuthSettings
 from fastai.auth.core import PasswordService, password_service
+from fastai.users.cache import principal_cache
 from fastai.users.exceptions import (
     UserInvalidCredentials,
     UserLockedError,
     UserNotFoundError,
     UserStatusError,
 )
-from fastai.users.schemas import AccountStatus, UserBase, UserCreate, UserUpdate
+from fastai.users.schemas import (
+    AccountStatus,
+    UserBase,
+    UserCreate,
+    UserPrincipal,
+    UserUpdate,
+)
 from fastai.utils.models import TimestampMixin
 
 if TYPE_CHECKING:
@@ -144,6 +151,29 @@ class User(UserBase, TimestampMixin, table=True):
             return None
         return user
 
+    @classmethod
+    async def get_principal(
+        cls, session: AsyncSession, user_id: _uuid.UUID
+    ) -> UserPrincipal | None:
+        """Load only the fields needed to authorize a request.
+
+        Unlike :meth:`get`, soft-deleted users are returned (with
+        ``deleted_at`` set) so that the rejection can be cached too.
+        """
+        statement = select(
+            cls.id,
+            cls.is_active,
+            cls.is_admin,
+            cls.deleted_at,
+        ).where(cls.id == user_id)
+        row = (await session.exec(statement)).first()
+        if row is None:
+            return None
+        id_, is_active, is_admin, deleted_at = row
+        return UserPrincipal(
+            id=id_, is_active=is_active, is_admin=is_admin, deleted_at=deleted_at
+        )
+
     @classmethod
     async def get_by_email(cls, session: AsyncSession, email: str) -> "User | None":
         """Get a single user by email. Excludes soft-deleted users."""
@@ -199,6 +229,7 @@ class User(UserBase, TimestampMixin, table=True):
         session.add(self)
         await session.commit()
         await session.refresh(self)
+        principal_cache.invalidate(self.id)
         return self
 
     async def soft_delete(self, session: AsyncSession) -> "User":
@@ -209,6 +240,7 @@ class User(UserBase, TimestampMixin, table=True):
         session.add(self)
         await session.commit()
         await session.refresh(self)
+        principal_cache.invalidate(self.id)
         return self
 
     async def delete(self, session: AsyncSession) -> None:
@@ -216,8 +248,10 @@ class User(UserBase, TimestampMixin, table=True):
 
         Prefer soft_delete() in production.
         """
+        user_id = self.id
         await session.delete(self)
         await session.commit()
+        principal_cache.invalidate(user_id)
 
     def verify_password(
         self,
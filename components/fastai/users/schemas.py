@@ -54,6 +54,23 @@ class AuthenticatedUser(SQLModel):
     is_admin: bool
 
 
+class UserPrincipal(SQLModel):
+    """The user fields needed to authorize a request.
+
+    Small and detached, so the auth layer can cache it between requests.
+    """
+
+    id: uuid.UUID
+    is_active: bool
+    is_admin: bool
+    deleted_at: AwareDatetime | None = None
+
+    @property
+    def can_authenticate(self) -> bool:
+        """Whether requests may be authorized as this user."""
+        return self.is_active and self.deleted_at is None
+
+
 class UserRead(UserBase):
     """Schema for reading a user.
 
@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from fastai.database.core import get_db_session
+from fastai.database.routing import ReadReplicas
 
 
 def get_db_engine(request: Request) -> AsyncEngine:
@@ -12,12 +13,19 @@ def get_db_engine(request: Request) -> AsyncEngine:
     return request.app.state.db_engine
 
 
+def get_read_replicas(request: Request) -> ReadReplicas | None:
+    """Retrieve the read replicas, if any, from the application state."""
+    return request.app.state.read_replicas
+
+
 async def get_session(
     engine: Annotated[AsyncEngine, Depends(get_db_engine)],
+    replicas: Annotated[ReadReplicas | None, Depends(get_read_replicas)],
 ) -> AsyncIterator[AsyncSession]:
-    async for sess in get_db_session(engine):
+    async for sess in get_db_session(engine, replicas):
         yield sess
 
 
 SessionDep = Annotated[AsyncSession, Depends(get_session)]
 EngineDep = Annotated[AsyncEngine, Depends(get_db_engine)]
+ReadReplicasDep = Annotated[ReadReplicas | None, Depends(get_read_replicas)]
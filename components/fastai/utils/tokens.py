@@ -0,0 +1,52 @@
+import math
+from collections.abc import Callable
+from functools import cache
+
+# Returns the number of tokens in a text
+TokenCounter = Callable[[str], int]
+
+APPROXIMATE = "approximate"
+
+
+def approximate_token_count(text: str) -> int:
+    """Estimate tokens without a tokenizer: 4 ASCII characters or 1 other.
+
+    English BPE tokenizers average about 4 characters per token. Scripts
+    outside ASCII (CJK, Cyrillic, accented text) take about one token per
+    character or more, so they are counted conservatively.
+    """
+    non_ascii = len(text) - len(text.encode("ascii", "ignore"))
+    return math.ceil((len(text) - non_ascii) / 4) + non_ascii
+
+
+@cache
+def get_token_counter(name: str) -> TokenCounter:
+    """Resolve a token counter by name.
+
+    Args:
+        name: ``"approximate"`` for :func:`approximate_token_count`, or
+            ``"tiktoken:<encoding>"`` (e.g. ``"tiktoken:cl100k_base"``) for
+            exact counts with tiktoken, which must be installed.
+
+    Raises:
+        ValueError: If the name is unknown or tiktoken is not available.
+    """
+    if name == APPROXIMATE:
+        return approximate_token_count
+    kind, _, encoding_name = name.partition(":")
+    if kind != "tiktoken" or not encoding_name:
+        raise ValueError(
+            f"Unknown token counter {name!r}; "
+            "use 'approximate' or 'tiktoken:<encoding>'"
+        )
+    try:
+        import tiktoken  # pyright: ignore[reportMissingImports]
+    except ImportError as exc:
+        raise ValueError(f"Token counter {name!r} requires tiktoken") from exc
+
+    encoding = tiktoken.get_encoding(encoding_name)
+
+    def count(text: str) -> int:
+        return len(encoding.encode(text, disallowed_special=()))
+
+    return count
@@ -0,0 +1,181 @@
+"""Load test: concurrent chats per connection pool, held vs released.
+
+Each simulated chat turn does what ``POST /chat`` does against the
+database: authenticate the user, load the conversation and its history,
+wait for the model (a sleep of ``--llm-latency`` seconds), then save the
+user and assistant messages. "held" keeps the request session's
+connection through the model call, as the endpoint used to; "released"
+calls ``release_connection`` first, as it does now.
+
+The pool is fixed at ``--pool-size`` connections with no overflow, so a
+turn that cannot get a connection within ``--pool-timeout`` seconds fails
+the way a request would under load.
+
+Requires the PostgreSQL from ``compose.yml`` with migrations applied (or
+any database configured through ``FASTAI_POSTGRES_*``).
+
+Usage::
+
+    uv run python development/benchmarks/chat_pool.py --pool-size 5 \\
+        --concurrency 10 25 50 100
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from benchmarks.common import argument_parser, run_main
+from sqlalchemy import delete
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from fastai.chats.models import Conversation, Message
+from fastai.chats.schemas import ConversationCreate, MessageCreate, MessageRole
+from fastai.database.core import PostgresSettings, release_connection
+from fastai.users.models import User
+from fastai.users.schemas import UserCreate
+
+
+async def _chat_turn(
+    engine: AsyncEngine,
+    user_id: uuid.UUID,
+    conversation_id: uuid.UUID,
+    llm_latency: float,
+    release: bool,
+) -> None:
+    async with AsyncSession(engine) as session:
+        await User.get_principal(session, user_id)
+        loaded = await Conversation.get_with_recent_messages(
+            session, conversation_id, user_id=user_id
+        )
+        assert loaded is not None
+        conversation, _ = loaded
+        if release:
+            await release_connection(session)
+
+        await asyncio.sleep(llm_latency)
+
+        await conversation.save_turn(
+            session,
+            [
+                Message.model_validate(
+                    MessageCreate(
+                        conversation_id=conversation_id,
+                        role=role,
+                        content_text="benchmark",
+                    )
+                )
+                for role in (MessageRole.USER, MessageRole.ASSISTANT)
+            ],
+        )
+
+
+async def _run(
+    engine: AsyncEngine,
+    user_id: uuid.UUID,
+    conversation_ids: list[uuid.UUID],
+    llm_latency: float,
+    release: bool,
+) -> tuple[int, int, list[float], float]:
+    latencies: list[float] = []
+    timeouts = 0
+
+    async def timed(conversation_id: uuid.UUID) -> None:
+        nonlocal timeouts
+        start = time.perf_counter()
+        try:
+            await _chat_turn(engine, user_id, conversation_id, llm_latency, release)
+        except PoolTimeoutError:
+            timeouts += 1
+            return
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed(conv_id) for conv_id in conversation_ids))
+    return len(latencies), timeouts, latencies, time.perf_counter() - start
+
+
+async def _main(args: argparse.Namespace) -> None:
+    settings = PostgresSettings()  # pyright: ignore[reportCallIssue]
+    engine = create_async_engine(
+        str(settings.dsn),
+        pool_size=args.pool_size,
+        max_overflow=0,
+        pool_timeout=args.pool_timeout,
+    )
+    async with AsyncSession(engine) as session:
+        user = await User.create(
+            session,
+            UserCreate(
+                email=f"benchmark-{uuid.uuid4().hex[:8]}@example.com",
+                password="benchmark-password",
+            ),
+        )
+        user_id = user.id
+        conversation_ids: list[uuid.UUID] = []
+        for _ in range(max(args.concurrency)):
+            conversation = await Conversation.create(
+                session, ConversationCreate(user_id=user_id, title="benchmark")
+            )
+            conversation_ids.append(conversation.id)
+
+    print(
+        f"pool_size={args.pool_size}, pool_timeout={args.pool_timeout:.0f} s, "
+        f"llm_latency={args.llm_latency:.1f} s"
+    )
+    try:
+        for concurrency in args.concurrency:
+            for label, release in (("held", False), ("released", True)):
+                completed, timeouts, latencies, elapsed = await _run(
+                    engine,
+                    user_id,
+                    conversation_ids[:concurrency],
+                    args.llm_latency,
+                    release,
+                )
+                p95 = (
+                    statistics.quantiles(latencies, n=20)[-1]
+                    if len(latencies) > 1
+                    else 0.0
+                )
+                print(
+                    f"  {concurrency:>4} chats  {label:<9}"
+                    f"{completed:>5} ok {timeouts:>5} pool timeouts  "
+                    f"p95 {p95:7.2f} s  wall {elapsed:7.2f} s"
+                )
+    finally:
+        async with AsyncSession(engine) as session:
+            await session.exec(  # type: ignore[call-overload]
+                delete(Conversation).where(Conversation.user_id == user_id)  # pyright: ignore[reportArgumentType]
+            )
+            await session.exec(delete(User).where(User.id == user_id))  # type: ignore[call-overload]
+            await session.commit()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argument_parser(__doc__)
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument(
+        "--pool-timeout",
+        type=float,
+        default=5.0,
+        help="Seconds to wait for a pooled connection before failing a turn.",
+    )
+    parser.add_argument(
+        "--llm-latency",
+        type=float,
+        default=2.0,
+        help="Seconds each simulated model call takes.",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[5, 10, 25, 50, 100]
+    )
+    run_main(_main, parser)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Benchmark the extraction chunker on large texts.
+
+Chunks synthetic texts of each ``--sizes`` megabytes in three shapes:
+prose with paragraphs (split on ``"\\n\\n"``), one long line of words
+(split on ``" "``), and a text without any separator (split into
+characters). Reports time, throughput, chunk count and peak memory
+allocated while chunking (tracemalloc, which slows both runs alike).
+
+With ``--reference``, also runs the previous concatenation-based chunker
+on inputs up to ``--reference-max-mb`` and checks that both produce the
+same chunks. Its character split builds one string per character, so
+keep that limit small.
+
+Usage::
+
+    uv run python development/benchmarks/chunking.py --sizes 1 10 50 \\
+        --reference
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from benchmarks.common import argument_parser
+
+from fastai.extraction.core import _SEPARATORS, _chunk_text
+
+WORDS = (
+    "the device reports an error when the firmware update fails and the "
+    "service restarts after a timeout while the network connection drops"
+).split()
+
+
+def _reference_chunk_text(
+    text: str, max_chars: int = 1500, overlap: int = 100
+) -> list[str]:
+    """The chunker before it worked on offsets, kept for comparison."""
+    text = text.strip()
+    if not text:
+        return []
+    if len(text) <= max_chars:
+        return [text]
+
+    for sep in _SEPARATORS:
+        if sep and sep not in text:
+            continue
+        parts = text.split(sep) if sep else list(text)
+        if len(parts) <= 1 and sep:
+            continue
+
+        chunks: list[str] = []
+        current = parts[0]
+        for part in parts[1:]:
+            candidate = current + sep + part if sep else current + part
+            if len(candidate) <= max_chars:
+                current = candidate
+            else:
+                if current.strip():
+                    chunks.append(current.strip())
+                if overlap and current:
+                    tail = current[-overlap:]
+                    current = tail + sep + part if sep else tail + part
+                else:
+                    current = part
+
+        if current.strip():
+            chunks.append(current.strip())
+
+        if len(chunks) > 1:
+            return chunks
+
+    return [text[i : i + max_chars] for i in range(0, len(text), max_chars - overlap)]
+
+
+def _sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randrange(6, 20))) + "."
+
+
+def _text(rng: random.Random, shape: str, size: int) -> str:
+    if shape == "no separators":
+        return "".join(rng.choice("abcdefghij") for _ in range(1024)) * (size // 1024)
+    pieces: list[str] = []
+    length = 0
+    while length < size:
+        if shape == "paragraphs":
+            piece = " ".join(_sentence(rng) for _ in range(rng.randrange(2, 8)))
+            piece += "\n\n"
+        else:
+            piece = rng.choice(WORDS) + " "
+        pieces.append(piece)
+        length += len(piece)
+    return "".join(pieces)
+
+
+def _measure(
+    chunker: Callable[..., list[str]], text: str, args: argparse.Namespace
+) -> tuple[list[str], float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    chunks = chunker(text, args.max_chars, args.overlap)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return chunks, elapsed, peak
+
+
+def main() -> None:
+    parser = argument_parser(__doc__)
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--max-chars", type=int, default=1500)
+    parser.add_argument("--overlap", type=int, default=100)
+    parser.add_argument("--reference", action="store_true")
+    parser.add_argument("--reference-max-mb", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"max_chars={args.max_chars} overlap={args.overlap}")
+    for shape in ("paragraphs", "words", "no separators"):
+        for size_mb in args.sizes:
+            text = _text(rng, shape, int(size_mb * 1_000_000))
+            runs = [("offsets", _chunk_text)]
+            if args.reference and size_mb <= args.reference_max_mb:
+                runs.append(("reference", _reference_chunk_text))
+            results: list[list[str]] = []
+            for label, chunker in runs:
+                chunks, elapsed, peak = _measure(chunker, text, args)
+                results.append(chunks)
+                print(
+                    f"  {shape:<14}{size_mb:6g} MB  {label:<10}"
+                    f"{elapsed:8.3f} s  {len(text) / elapsed / 1e6:8.1f} MB/s  "
+                    f"chunks {len(chunks):7d}  peak {peak / 1e6:8.1f} MB"
+                )
+            if len(results) > 1:
+                assert results[0] == results[1], f"outputs differ: {shape} {size_mb}"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""Command-line helpers shared by the benchmark scripts."""
+
+import argparse
+import asyncio
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+
+def argument_parser(doc: str | None) -> argparse.ArgumentParser:
+    """Create a parser described by the first line of a module docstring."""
+    return argparse.ArgumentParser(description=(doc or "").strip().partition("\n")[0])
+
+
+def run_main(
+    main: Callable[[argparse.Namespace], Coroutine[Any, Any, None]],
+    parser: argparse.ArgumentParser,
+) -> None:
+    """Parse the command line and run the benchmark's async *main* with it."""
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,113 @@
+"""Benchmark per-chunk vs batched document embedding.
+
+Uses a fake embedding model that sleeps for a fixed per-request latency
+(simulating a provider HTTP round trip) plus a small per-text cost, so the
+numbers reflect request overhead rather than any real provider.
+
+Usage::
+
+    uv run python development/benchmarks/embedding_pipeline.py --chunks 400
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Sequence
+from typing import Literal
+
+from benchmarks.common import argument_parser, run_main
+from pydantic_ai.embeddings import Embedder, EmbeddingModel, EmbeddingResult
+from pydantic_ai.embeddings.settings import EmbeddingSettings as PAIEmbeddingSettings
+
+from fastai.embeddings.core import KnowledgeBase
+from fastai.embeddings.settings import EmbeddingSettings
+
+
+class FakeEmbeddingModel(EmbeddingModel):
+    """Embedding model with simulated network latency and zero vectors."""
+
+    def __init__(
+        self, dimensions: int, request_latency: float, per_text_latency: float
+    ) -> None:
+        super().__init__()
+        self._dimensions = dimensions
+        self._request_latency = request_latency
+        self._per_text_latency = per_text_latency
+        self.requests = 0
+
+    @property
+    def model_name(self) -> str:
+        return "fake-embed"
+
+    @property
+    def system(self) -> str:
+        return "benchmark"
+
+    async def embed(
+        self,
+        inputs: str | Sequence[str],
+        *,
+        input_type: Literal["query", "document"],
+        settings: PAIEmbeddingSettings | None = None,
+    ) -> EmbeddingResult:
+        texts, settings = self.prepare_embed(inputs, settings)
+        self.requests += 1
+        await asyncio.sleep(self._request_latency + self._per_text_latency * len(texts))
+        return EmbeddingResult(
+            embeddings=[[0.0] * self._dimensions for _ in texts],
+            inputs=texts,
+            input_type=input_type,
+            model_name=self.model_name,
+            provider_name=self.system,
+        )
+
+
+async def _per_chunk(kb: KnowledgeBase, chunks: list[str]) -> None:
+    for chunk in chunks:
+        await kb.embedder.embed_documents(chunk)
+
+
+async def _batched(kb: KnowledgeBase, chunks: list[str]) -> None:
+    await kb.embed_many(chunks)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    chunks = [f"Chunk {i}: " + "lorem ipsum " * 100 for i in range(args.chunks)]
+    settings = EmbeddingSettings(batch_size=args.batch_size)
+
+    print(
+        f"{args.chunks} chunks, {args.latency * 1000:.0f} ms/request, "
+        f"batch_size={args.batch_size}"
+    )
+    for label, run in (("per-chunk", _per_chunk), ("batched", _batched)):
+        model = FakeEmbeddingModel(
+            settings.dimensions, args.latency, args.per_text_latency
+        )
+        kb = KnowledgeBase(Embedder(model), settings)
+        start = time.perf_counter()
+        await run(kb, chunks)
+        elapsed = time.perf_counter() - start
+        print(
+            f"  {label:<10} {elapsed:8.3f} s  {args.chunks / elapsed:10.1f} chunks/s"
+            f"  ({model.requests} requests)"
+        )
+
+
+def main() -> None:
+    parser = argument_parser(__doc__)
+    parser.add_argument("--chunks", type=int, default=400)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="Seconds per provider request."
+    )
+    parser.add_argument(
+        "--per-text-latency",
+        type=float,
+        default=0.0002,
+        help="Additional seconds per text in a request.",
+    )
+    run_main(_main, parser)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Benchmark HNSW search profiles: recall@k and latency against exact search.
+
+Generates a clustered corpus of random vectors, labels a ``--selectivity``
+fraction of it with the searched source_type, and runs each query once
+with index scans disabled (the exact top k) and once per search profile.
+Reports, per profile, mean recall@k, how many of the k rows came back
+(filtered HNSW scans without iterative scanning can return fewer), and
+latency percentiles.
+
+Requires the PostgreSQL from ``compose.yml`` with migrations applied (or
+any database configured through ``FASTAI_POSTGRES_*``). Benchmark rows are
+deleted afterwards.
+
+Usage::
+
+    uv run python development/benchmarks/hnsw_recall.py --corpus 20000 \\
+        --selectivity 0.02 --queries 100 --k 10
+"""
+
+import argparse
+import math
+import random
+import statistics
+import time
+import uuid
+
+from benchmarks.common import argument_parser, run_main
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from fastai.database.core import PostgresSettings
+from fastai.embeddings.models import Embedding
+from fastai.embeddings.schemas import (
+    SEARCH_PROFILES,
+    EmbeddingCreate,
+    IterativeScan,
+    SearchProfile,
+    SearchProfileName,
+)
+from fastai.embeddings.settings import EmbeddingSettings
+
+TARGET = "benchmark-target"
+OTHER = "benchmark-other"
+MODEL_NAME = "benchmark:random"
+
+
+def _unit(vector: list[float]) -> list[float]:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+def _corpus(
+    rng: random.Random, size: int, dimensions: int, clusters: int, spread: float
+) -> tuple[list[list[float]], list[list[float]]]:
+    centroids = [
+        _unit([rng.gauss(0, 1) for _ in range(dimensions)]) for _ in range(clusters)
+    ]
+    vectors = [
+        _unit([c + rng.gauss(0, spread) for c in rng.choice(centroids)])
+        for _ in range(size)
+    ]
+    return centroids, vectors
+
+
+async def _load(
+    engine: AsyncEngine,
+    vectors: list[list[float]],
+    selectivity: float,
+    rng: random.Random,
+) -> None:
+    items = [
+        EmbeddingCreate(
+            source_type=TARGET if rng.random() < selectivity else OTHER,
+            source_id=uuid.uuid4(),
+            chunk_text=f"benchmark vector {i}",
+        )
+        for i in range(len(vectors))
+    ]
+    async with AsyncSession(engine) as session:
+        await Embedding.bulk_upsert(session, items, vectors, MODEL_NAME)
+        # Fresh statistics so the planner picks the HNSW index
+        await session.exec(text("ANALYZE embeddings"))  # type: ignore[call-overload]
+        await session.commit()
+
+
+async def _exact(
+    engine: AsyncEngine, query: list[float], k: int, source_type: str | None
+) -> set[uuid.UUID]:
+    async with AsyncSession(engine) as session:
+        await session.exec(text("SET LOCAL enable_indexscan = off"))  # type: ignore[call-overload]
+        results = await Embedding.search_similar(
+            session,
+            query_vector=query,
+            embedding_model=MODEL_NAME,
+            source_type=source_type,
+            limit=k,
+        )
+    return {r.source_id for r in results}
+
+
+async def _approximate(
+    engine: AsyncEngine,
+    query: list[float],
+    k: int,
+    source_type: str | None,
+    profile: SearchProfile,
+) -> tuple[set[uuid.UUID], float]:
+    async with AsyncSession(engine) as session:
+        # Check out the connection before timing
+        await session.connection()
+        start = time.perf_counter()
+        results = await Embedding.search_similar(
+            session,
+            query_vector=query,
+            embedding_model=MODEL_NAME,
+            source_type=source_type,
+            limit=k,
+            profile=profile,
+        )
+        elapsed = time.perf_counter() - start
+    return {r.source_id for r in results}, elapsed
+
+
+async def _main(args: argparse.Namespace) -> None:
+    dimensions = EmbeddingSettings().dimensions
+    rng = random.Random(args.seed)
+    centroids, vectors = _corpus(
+        rng, args.corpus, dimensions, args.clusters, args.spread
+    )
+    queries = [
+        _unit([c + rng.gauss(0, args.spread) for c in rng.choice(centroids)])
+        for _ in range(args.queries)
+    ]
+    source_type = None if args.unfiltered else TARGET
+
+    profiles: dict[str, SearchProfile] = {
+        str(name): profile for name, profile in SEARCH_PROFILES.items()
+    }
+    profiles["balanced, no iterative scan"] = SearchProfile(
+        ef_search=SEARCH_PROFILES[SearchProfileName.BALANCED].ef_search,
+        iterative_scan=IterativeScan.OFF,
+    )
+    for ef_search in args.ef_search:
+        profiles[f"ef_search={ef_search}"] = SearchProfile(ef_search=ef_search)
+
+    settings = PostgresSettings()  # pyright: ignore[reportCallIssue]
+    engine = create_async_engine(str(settings.dsn), pool_size=1)
+    try:
+        start = time.perf_counter()
+        await _load(engine, vectors, args.selectivity, rng)
+        print(
+            f"corpus={args.corpus} dims={dimensions} "
+            f"selectivity={'none' if args.unfiltered else args.selectivity} "
+            f"queries={args.queries} k={args.k} "
+            f"(loaded in {time.perf_counter() - start:.1f} s)"
+        )
+
+        exact = [await _exact(engine, q, args.k, source_type) for q in queries]
+
+        for label, profile in profiles.items():
+            recalls: list[float] = []
+            returned: list[int] = []
+            latencies: list[float] = []
+            for query, truth in zip(queries, exact):
+                found, elapsed = await _approximate(
+                    engine, query, args.k, source_type, profile
+                )
+                recalls.append(len(found & truth) / len(truth) if truth else 1.0)
+                returned.append(len(found))
+                latencies.append(elapsed)
+            p95 = (
+                statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else 0.0
+            )
+            print(
+                f"  {label:<30} recall@{args.k} {statistics.mean(recalls):6.3f}  "
+                f"rows {statistics.mean(returned):5.1f}/{args.k}  "
+                f"p50 {statistics.median(latencies) * 1000:7.2f} ms  "
+                f"p95 {p95 * 1000:7.2f} ms"
+            )
+    finally:
+        async with AsyncSession(engine) as session:
+            await session.exec(  # type: ignore[call-overload]
+                delete(Embedding).where(
+                    Embedding.source_type.in_([TARGET, OTHER])  # pyright: ignore[reportAttributeAccessIssue]
+                )
+            )
+            await session.commit()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argument_parser(__doc__)
+    parser.add_argument("--corpus", type=int, default=20_000)
+    parser.add_argument(
+        "--selectivity",
+        type=float,
+        default=0.02,
+        help="Fraction of the corpus matching the source_type filter.",
+    )
+    parser.add_argument(
+        "--unfiltered",
+        action="store_true",
+        help="Search without a source_type filter.",
+    )
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=50)
+    parser.add_argument(
+        "--spread",
+        type=float,
+        default=0.05,
+        help="Per-dimension noise around cluster centroids.",
+    )
+    parser.add_argument(
+        "--ef-search",
+        type=int,
+        nargs="*",
+        default=[],
+        help="Extra ef_search values to try with the default iterative scan.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    run_main(_main, parser)
+
+
+if __name__ == "__main__":
+    main()
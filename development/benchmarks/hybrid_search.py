@@ -0,0 +1,237 @@
+"""Benchmark hybrid (vector + full-text, RRF) search against vector-only search.
+
+Builds a synthetic knowledge base of support notes. Each note names one
+product and one error code, so every query has exactly one right answer.
+Queries ask for an error code, a product name, or paraphrase a note's
+topic. Query vectors are embedded up front, so the timings cover only the
+database search.
+
+Reports per query kind and method the hit rate (right note in the top k),
+the mean reciprocal rank, and latency percentiles.
+
+Embeds with the configured model (``FASTAI_EMBEDDING_*`` plus the provider's
+API key), since hit rates from fake vectors would mean nothing. Requires
+the PostgreSQL from ``compose.yml`` with migrations applied (or any database
+configured through ``FASTAI_POSTGRES_*``). Benchmark rows are deleted
+afterwards.
+
+Usage::
+
+    uv run python development/benchmarks/hybrid_search.py --notes 500 \\
+        --queries 60 --k 5
+"""
+
+import argparse
+import random
+import statistics
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from benchmarks.common import argument_parser, run_main
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from fastai.database.core import PostgresSettings
+from fastai.embeddings.core import KnowledgeBase
+from fastai.embeddings.models import Embedding
+from fastai.embeddings.providers import create_embedder
+from fastai.embeddings.schemas import EmbeddingCreate
+from fastai.embeddings.settings import EmbeddingSettings
+
+SOURCE_TYPE = "benchmark-note"
+
+TOPICS = [
+    (
+        "fails to start after a firmware update and shows a blank screen",
+        "device will not boot after updating firmware",
+    ),
+    (
+        "drops its wireless connection every few minutes",
+        "wifi keeps disconnecting",
+    ),
+    (
+        "reports the battery as full but shuts down at random",
+        "unexpected power off even though battery is charged",
+    ),
+    (
+        "rejects valid login credentials after a password reset",
+        "cannot sign in after changing my password",
+    ),
+    (
+        "prints faded pages when the toner is new",
+        "printouts are too light with a fresh cartridge",
+    ),
+    (
+        "overheats when several video streams play at once",
+        "gets very hot while playing multiple videos",
+    ),
+    (
+        "loses its settings after a power outage",
+        "configuration resets when electricity goes out",
+    ),
+    (
+        "syncs calendar events twice to the cloud",
+        "duplicate appointments appear after syncing",
+    ),
+]
+
+
+@dataclass
+class Note:
+    source_id: uuid.UUID
+    product: str
+    code: str
+    topic: int
+    text: str
+
+
+@dataclass
+class Query:
+    kind: str
+    text: str
+    target: uuid.UUID
+    vector: list[float] = field(default_factory=list)
+
+
+def _notes(rng: random.Random, count: int) -> list[Note]:
+    notes: list[Note] = []
+    for i in range(count):
+        product = f"{rng.choice(['Zen', 'Quor', 'Vel', 'Mox', 'Tarn'])}tra {i}"
+        code = f"E{rng.randrange(10_000, 99_999)}-{i}"
+        topic = rng.randrange(len(TOPICS))
+        text = (
+            f"Support note for the {product}: the unit {TOPICS[topic][0]}. "
+            f"The log shows error {code}. Power cycle the unit and reinstall "
+            f"the latest release."
+        )
+        notes.append(Note(uuid.uuid4(), product, code, topic, text))
+    return notes
+
+
+def _queries(rng: random.Random, notes: list[Note], count: int) -> list[Query]:
+    queries: list[Query] = []
+    for i in range(count):
+        note = rng.choice(notes)
+        kind = ("code", "product", "paraphrase")[i % 3]
+        if kind == "code":
+            text = f"What does error {note.code} mean?"
+        elif kind == "product":
+            text = f"Known problems with the {note.product}"
+        else:
+            text = f"My {note.product} {TOPICS[note.topic][1]}"
+        queries.append(Query(kind, text, note.source_id))
+    return queries
+
+
+async def _search(
+    engine: AsyncEngine,
+    kb: KnowledgeBase,
+    query: Query,
+    k: int,
+    hybrid: bool,
+) -> tuple[int | None, float]:
+    async with AsyncSession(engine) as session:
+        # Check out the connection before timing
+        await session.connection()
+        start = time.perf_counter()
+        if hybrid:
+            results = await Embedding.search_hybrid(
+                session,
+                query_text=query.text,
+                query_vector=query.vector,
+                embedding_model=kb.model_name,
+                source_type=SOURCE_TYPE,
+                limit=k,
+                candidates=kb.settings.hybrid_candidates,
+                rrf_k=kb.settings.hybrid_rrf_k,
+            )
+        else:
+            results = await Embedding.search_similar(
+                session,
+                query_vector=query.vector,
+                embedding_model=kb.model_name,
+                source_type=SOURCE_TYPE,
+                limit=k,
+            )
+        elapsed = time.perf_counter() - start
+    ranks = [i for i, r in enumerate(results, 1) if r.source_id == query.target]
+    return (ranks[0] if ranks else None), elapsed
+
+
+async def _main(args: argparse.Namespace) -> None:
+    settings = EmbeddingSettings()
+    kb = KnowledgeBase(create_embedder(settings), settings)
+    rng = random.Random(args.seed)
+    notes = _notes(rng, args.notes)
+    queries = _queries(rng, notes, args.queries)
+
+    db_settings = PostgresSettings()  # pyright: ignore[reportCallIssue]
+    engine = create_async_engine(str(db_settings.dsn), pool_size=1)
+    try:
+        start = time.perf_counter()
+        async with AsyncSession(engine) as session:
+            await kb.embed_and_store_many(
+                session,
+                [
+                    EmbeddingCreate(
+                        source_type=SOURCE_TYPE,
+                        source_id=note.source_id,
+                        chunk_text=note.text,
+                    )
+                    for note in notes
+                ],
+            )
+        vectors = await kb.embed_many([q.text for q in queries])
+        for query, vector in zip(queries, vectors):
+            query.vector = vector
+        print(
+            f"model={kb.model_name} notes={args.notes} queries={args.queries} "
+            f"k={args.k} (embedded in {time.perf_counter() - start:.1f} s)"
+        )
+
+        for kind in ("code", "product", "paraphrase"):
+            subset = [q for q in queries if q.kind == kind]
+            for label, hybrid in (("vector", False), ("hybrid", True)):
+                ranks: list[int | None] = []
+                latencies: list[float] = []
+                for query in subset:
+                    rank, elapsed = await _search(engine, kb, query, args.k, hybrid)
+                    ranks.append(rank)
+                    latencies.append(elapsed)
+                hits = sum(rank is not None for rank in ranks)
+                mrr = statistics.mean(1 / rank if rank else 0.0 for rank in ranks)
+                p95 = (
+                    statistics.quantiles(latencies, n=20)[-1]
+                    if len(latencies) > 1
+                    else 0.0
+                )
+                print(
+                    f"  {kind:<11}{label:<7} hit@{args.k} {hits / len(subset):6.1%}  "
+                    f"MRR {mrr:5.3f}  "
+                    f"p50 {statistics.median(latencies) * 1000:7.2f} ms  "
+                    f"p95 {p95 * 1000:7.2f} ms"
+                )
+    finally:
+        async with AsyncSession(engine) as session:
+            await session.exec(  # type: ignore[call-overload]
+                delete(Embedding).where(Embedding.source_type == SOURCE_TYPE)  # pyright: ignore[reportArgumentType]
+            )
+            await session.commit()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argument_parser(__doc__)
+    parser.add_argument("--notes", type=int, default=500)
+    parser.add_argument(
+        "--queries", type=int, default=60, help="Split evenly across query kinds."
+    )
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    run_main(_main, parser)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Benchmark document extraction throughput by number of extraction processes.
+
+Extracts a corpus of PDFs concurrently, the way a worker does when several
+document events arrive at once, with the thread-pool baseline (0
+processes) and each ``--processes`` count. Also samples event loop lag
+(how late a 10 ms sleep wakes up) while extraction runs, since the thread
+pool holds the GIL and stalls the loop.
+
+The corpus is either every PDF under ``--corpus`` or synthetic text PDFs.
+PDFs of at least ``--parallel-page-threshold`` pages are split into page
+ranges across the processes; ``--documents 1 --pages 2000`` measures one
+large PDF. Pool start-up is excluded from the timings.
+
+Usage::
+
+    uv run python development/benchmarks/pdf_extraction.py --documents 16 \\
+        --pages 200 --processes 1 2 4 8
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from pathlib import Path
+
+from benchmarks.common import argument_parser, run_main
+
+from fastai.extraction.core import ExtractionService
+from fastai.extraction.settings import ExtractionSettings
+
+WORDS = (
+    "the device reports an error when the firmware update fails and the "
+    "service restarts after a timeout while the network connection drops"
+).split()
+
+
+def _pdf_string(line: str) -> bytes:
+    escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return b"(" + escaped.encode("latin-1") + b") Tj T* "
+
+
+def _make_pdf(pages: list[str]) -> bytes:
+    """Build a minimal PDF with one Helvetica text page per item."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids: list[bytes] = []
+    for text in pages:
+        lines = b"".join(_pdf_string(line) for line in text.splitlines())
+        stream = b"BT /F1 10 Tf 12 TL 50 780 Td " + lines + b"ET"
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(kids),
+        len(kids),
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets: list[int] = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(out)
+
+
+def _synthetic_corpus(
+    rng: random.Random, documents: int, pages: int
+) -> list[tuple[str, bytes]]:
+    def page() -> str:
+        return "\n".join(
+            " ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(50)
+        )
+
+    return [
+        (f"synthetic-{i}.pdf", _make_pdf([page() for _ in range(pages)]))
+        for i in range(documents)
+    ]
+
+
+async def _loop_lag(stop: asyncio.Event, samples: list[float]) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        samples.append(time.perf_counter() - start - 0.01)
+
+
+async def _run(
+    corpus: list[tuple[str, bytes]], processes: int, args: argparse.Namespace
+) -> tuple[float, list[float]]:
+    service = ExtractionService(
+        ExtractionSettings(
+            max_workers=processes,
+            max_tasks_per_child=args.max_tasks_per_child,
+            parallel_page_threshold=args.parallel_page_threshold,
+        )
+    )
+    try:
+        # Start the processes before timing
+        await asyncio.gather(
+            *(service.extract_text(b"warm-up", "a.txt") for _ in range(processes))
+        )
+        stop = asyncio.Event()
+        lag: list[float] = []
+        sampler = asyncio.create_task(_loop_lag(stop, lag))
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(service.extract_and_chunk(data, name) for name, data in corpus)
+        )
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await sampler
+    finally:
+        service.shutdown()
+    return elapsed, lag
+
+
+async def _main(args: argparse.Namespace) -> None:
+    if args.corpus:
+        corpus = [
+            (path.name, path.read_bytes())
+            for path in sorted(Path(args.corpus).rglob("*.pdf"))
+        ]
+    else:
+        corpus = _synthetic_corpus(random.Random(args.seed), args.documents, args.pages)
+    total_mb = sum(len(data) for _, data in corpus) / 1e6
+    print(
+        f"documents={len(corpus)} size={total_mb:.1f} MB cpus={os.cpu_count()} "
+        f"max_tasks_per_child={args.max_tasks_per_child} "
+        f"parallel_page_threshold={args.parallel_page_threshold}"
+    )
+
+    baseline: float | None = None
+    for processes in [0, *args.processes]:
+        elapsed, lag = await _run(corpus, processes, args)
+        baseline = baseline or elapsed
+        label = "threads" if processes == 0 else f"{processes} processes"
+        print(
+            f"  {label:<13} {elapsed:7.2f} s  {len(corpus) / elapsed:6.2f} docs/s  "
+            f"x{baseline / elapsed:4.2f}  "
+            f"loop lag p50 {statistics.median(lag or [0.0]) * 1000:6.1f} ms "
+            f"max {max(lag or [0.0]) * 1000:6.1f} ms"
+        )
+
+
+def main() -> None:
+    parser = argument_parser(__doc__)
+    parser.add_argument(
+        "--corpus", help="Directory of PDFs to use instead of synthetic ones."
+    )
+    parser.add_argument("--documents", type=int, default=16)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--max-tasks-per-child", type=int, default=50)
+    parser.add_argument("--parallel-page-threshold", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    run_main(_main, parser)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark per-call vs shared StorageService overhead.
+
+"per-call" opens a new StorageService (aioboto3 resource, connection pool
+and bucket handle) around every request, as the api and worker used to do.
+"shared" reuses one service for the whole run, as they do now. Each call is
+a HEAD on a small object, so the numbers are dominated by client setup and
+connection reuse.
+
+Requires the S3-compatible storage from ``compose.yml`` (or any endpoint
+configured through ``FASTAI_STORAGE_*``).
+
+Usage::
+
+    uv run python development/benchmarks/storage_client.py --calls 200
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import argument_parser, run_main
+
+from fastai.storage.core import StorageService, StorageSettings
+
+KEY = "benchmarks/storage-client.txt"
+
+
+async def _per_call(settings: StorageSettings, calls: int, concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call() -> None:
+        async with semaphore, StorageService(settings) as storage:
+            await storage.object_exists(KEY)
+
+    await asyncio.gather(*(call() for _ in range(calls)))
+
+
+async def _shared(settings: StorageSettings, calls: int, concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with StorageService(settings) as storage:
+
+        async def call() -> None:
+            async with semaphore:
+                await storage.object_exists(KEY)
+
+        await asyncio.gather(*(call() for _ in range(calls)))
+
+
+async def _main(args: argparse.Namespace) -> None:
+    settings = StorageSettings()  # pyright: ignore[reportCallIssue]
+    async with StorageService(settings) as storage:
+        await storage.upload_bytes(b"benchmark", KEY)
+
+    print(f"{args.calls} calls, concurrency={args.concurrency}")
+    try:
+        for label, run in (("per-call", _per_call), ("shared", _shared)):
+            start = time.perf_counter()
+            await run(settings, args.calls, args.concurrency)
+            elapsed = time.perf_counter() - start
+            print(
+                f"  {label:<9} {elapsed:8.3f} s  "
+                f"{elapsed / args.calls * 1000:8.2f} ms/call"
+            )
+    finally:
+        async with StorageService(settings) as storage:
+            await storage.delete_object(KEY)
+
+
+def main() -> None:
+    parser = argument_parser(__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    run_main(_main, parser)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""add embeddings content hash index
+
+Revision ID: b7e3c91d2f04
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-17 09:00:00.000000
+
+The index is built concurrently, outside the migration transaction, so
+writes to embeddings are not blocked while it is built.
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e3c91d2f04"
+down_revision: Union[str, Sequence[str], None] = "a1b2c3d4e5f6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_embeddings_model_content_hash",
+            "embeddings",
+            ["embedding_model", "content_hash"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_embeddings_model_content_hash",
+            table_name="embeddings",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,58 @@
+"""add partial embedding search indexes
+
+Revision ID: d9a3f6b1c527
+Revises: c4d8e2a7b913
+Create Date: 2026-10-17 15:00:00.000000
+
+Builds a partial HNSW index for document embeddings of the default model
+(openai:text-embedding-3-small). Indexes for other source types or models
+need a migration of their own, listed in
+fastai.embeddings.models.SEARCH_INDEXES. Indexes are built concurrently,
+outside the migration transaction, so writes to embeddings are not blocked
+while the graphs are built.
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d9a3f6b1c527"
+down_revision: Union[str, Sequence[str], None] = "c4d8e2a7b913"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = "ix_embeddings_hnsw_6db6f74d4974a2da"
+INDEX_PREDICATE = (
+    "source_type = 'document' AND embedding_model = 'openai:text-embedding-3-small'"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            INDEX_NAME,
+            "embeddings",
+            ["embedding"],
+            unique=False,
+            postgresql_where=sa.text(INDEX_PREDICATE),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 128},
+            postgresql_ops={"embedding": "halfvec_cosine_ops"},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            INDEX_NAME,
+            table_name="embeddings",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
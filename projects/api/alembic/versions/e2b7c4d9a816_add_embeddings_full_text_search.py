@@ -0,0 +1,51 @@
+"""add embeddings full text search
+
+Revision ID: e2b7c4d9a816
+Revises: d9a3f6b1c527
+Create Date: 2026-10-17 16:00:00.000000
+
+Adding a stored generated column rewrites the embeddings table under an
+exclusive lock; run it in a maintenance window on large tables. The GIN
+index is then built concurrently.
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "e2b7c4d9a816"
+down_revision: Union[str, Sequence[str], None] = "d9a3f6b1c527"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "embeddings",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('english', chunk_text)", persisted=True),
+            nullable=True,
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_embeddings_search_vector",
+            "embeddings",
+            ["search_vector"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_embeddings_search_vector", table_name="embeddings")
+    op.drop_column("embeddings", "search_vector")
@@ -14,7 +14,7 @@ from fastai.documents.models import Document
 from fastai.documents.schemas import DocumentCreate
 from fastai.events import NatsSettings
 from fastai.events.core import EventPublisher
-from fastai.storage.core import StorageSettings
+from fastai.storage.core import StorageService
 
 
 @pytest_asyncio.fixture
@@ -30,13 +30,13 @@ async def event_publisher() -> AsyncGenerator[EventPublisher, None]:
 async def app(
     test_db_settings: PostgresSettings,
     test_db_engine,
-    storage_settings: StorageSettings,
+    storage: StorageService,
     event_publisher: EventPublisher,
 ) -> AsyncGenerator[FastAPI, None]:
     """Create FastAPI test application with storage configured."""
     application = init_admin_v1_app(
         test_db_engine,
-        storage_settings=storage_settings,
+        storage=storage,
         event_publisher=event_publisher,
     )
     yield application
@@ -1,3 +1,4 @@
+import hashlib
 import uuid
 
 import pytest
@@ -33,7 +34,7 @@ async def test_create_document(
     assert body["content_type"] == "application/pdf"
     assert body["file_size"] == len(b"sample file content")
     assert body["storage_path"].startswith("documents/")
-    assert body["content_hash"]  # ETag from S3
+    assert body["content_hash"] == hashlib.sha256(b"sample file content").hexdigest()
     assert "id" in body
     assert "created_at" in body
     assert "updated_at" in body
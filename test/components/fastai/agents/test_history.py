@@ -0,0 +1,135 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pydantic_ai import models
+from pydantic_ai.messages import ModelRequest, SystemPromptPart, UserPromptPart
+from pydantic_ai.models.test import TestModel
+
+from fastai.agents.core import (
+    build_history,
+    create_summary_agent,
+    estimate_tokens,
+    select_history_window,
+    summarize_messages,
+    summary_overflow,
+)
+from fastai.agents.settings import AgentSettings
+from fastai.chats.models import Message
+from fastai.chats.schemas import MessageRole
+
+models.ALLOW_MODEL_REQUESTS = False
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+# estimate_tokens of each message below
+TOKENS = estimate_tokens("x" * 40)
+
+
+def _turns(count: int) -> list[Message]:
+    """Alternating user/assistant messages of TOKENS estimated tokens each."""
+    conversation_id = uuid.uuid4()
+    return [
+        Message(
+            conversation_id=conversation_id,
+            role=MessageRole.USER if i % 2 == 0 else MessageRole.ASSISTANT,
+            content_text=f"{i:02d}" + "x" * 38,
+            created_at=START + timedelta(minutes=i),
+        )
+        for i in range(count)
+    ]
+
+
+def test_window_keeps_newest_messages_within_budget() -> None:
+    messages = _turns(10)
+
+    window = select_history_window(messages, token_budget=TOKENS * 4)
+
+    assert window == messages[6:]
+
+
+def test_window_never_starts_with_assistant_message() -> None:
+    messages = _turns(10)
+
+    window = select_history_window(messages, token_budget=TOKENS * 3)
+
+    assert window == messages[8:]
+    assert window[0].role == MessageRole.USER
+
+
+def test_build_history_fits_budget() -> None:
+    history = build_history(_turns(10), token_budget=TOKENS * 4)
+
+    assert len(history) == 4
+    first = history[0]
+    assert isinstance(first, ModelRequest)
+    prompt_part = first.parts[0]
+    assert isinstance(prompt_part, UserPromptPart)
+    assert isinstance(prompt_part.content, str)
+    assert prompt_part.content.startswith("06")
+
+
+def test_build_history_prepends_summary_and_skips_summarized() -> None:
+    messages = _turns(10)
+
+    history = build_history(
+        messages,
+        token_budget=TOKENS * 100,
+        summary="The user asked about invoices.",
+        summarized_until=messages[3].created_at,
+    )
+
+    assert len(history) == 6
+    first = history[0]
+    assert isinstance(first, ModelRequest)
+    assert len(first.parts) == 2
+    summary_part = first.parts[0]
+    prompt_part = first.parts[1]
+    assert isinstance(summary_part, SystemPromptPart)
+    assert "The user asked about invoices." in summary_part.content
+    assert isinstance(prompt_part, UserPromptPart)
+    assert isinstance(prompt_part.content, str)
+    assert prompt_part.content.startswith("04")
+
+
+def test_summary_overflow_empty_within_budget() -> None:
+    assert summary_overflow(_turns(4), token_budget=TOKENS * 4) == []
+
+
+def test_summary_overflow_keeps_half_the_budget() -> None:
+    messages = _turns(10)
+
+    overflow = summary_overflow(messages, token_budget=TOKENS * 8)
+
+    assert overflow == messages[:6]
+
+
+def test_summary_overflow_keeps_unanswered_user_message() -> None:
+    """The newest user message is not summarized before its reply exists."""
+    messages = _turns(9)
+
+    overflow = summary_overflow(messages, token_budget=TOKENS)
+
+    assert overflow == messages[:8]
+    assert overflow[-1].role == MessageRole.ASSISTANT
+
+
+def test_summary_overflow_ignores_summarized_messages() -> None:
+    messages = _turns(10)
+
+    overflow = summary_overflow(
+        messages,
+        token_budget=TOKENS * 4,
+        summarized_until=messages[3].created_at,
+    )
+
+    assert overflow == messages[4:8]
+
+
+@pytest.mark.asyncio
+async def test_summarize_messages_returns_agent_output() -> None:
+    agent = create_summary_agent(AgentSettings(model="test"))
+
+    with agent.override(model=TestModel(custom_output_text="Invoices.")):
+        summary = await summarize_messages(agent, _turns(2), "Earlier.")
+
+    assert summary == "Invoices."
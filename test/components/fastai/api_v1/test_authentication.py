@@ -1,8 +1,13 @@
 import pytest
 import pytest_asyncio
+from fastapi import FastAPI, HTTPException
 from httpx import AsyncClient
+from pydantic import SecretStr
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from fastai.api_v1.dependencies import get_current_user
+from fastai.auth.settings import AuthSettings
+from fastai.users.cache import PrincipalCache
 from fastai.users.models import User
 
 pytestmark = pytest.mark.integration
@@ -346,3 +351,54 @@ class TestToken:
         )
 
         assert json_response.json().keys() == form_response.json().keys()
+
+
+class TestAccessToken:
+    """Tests for access-token verification on protected endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_repeat_requests_use_cached_principal(
+        self, app: FastAPI, api_v1_client: AsyncClient, registered_user: User
+    ) -> None:
+        cache = app.state.principal_cache
+        login = await _login(api_v1_client, "auth@example.com", TEST_PASSWORD)
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        hits = cache.stats.hits
+        assert (await api_v1_client.get("/auth/me", headers=headers)).status_code == 200
+        assert (await api_v1_client.get("/auth/me", headers=headers)).status_code == 200
+
+        assert cache.stats.hits == hits + 1
+
+    @pytest.mark.asyncio
+    async def test_soft_delete_rejects_cached_principal(
+        self,
+        api_v1_client: AsyncClient,
+        registered_user: User,
+        test_db_session: AsyncSession,
+    ) -> None:
+        login = await _login(api_v1_client, "auth@example.com", TEST_PASSWORD)
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        assert (await api_v1_client.get("/auth/me", headers=headers)).status_code == 200
+
+        await registered_user.soft_delete(test_db_session)
+
+        assert (await api_v1_client.get("/auth/me", headers=headers)).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_records_auth_latency() -> None:
+    """get_current_user goes through the same checks and stats as scoped auth."""
+    cache = PrincipalCache(max_size=10)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_user(
+            None,  # pyright: ignore[reportArgumentType]
+            None,  # pyright: ignore[reportArgumentType]
+            None,
+            cache,
+            AuthSettings(secret_key=SecretStr("s" * 32)),
+        )
+
+    assert exc_info.value.status_code == 401
+    assert cache.stats.auth_count == 1
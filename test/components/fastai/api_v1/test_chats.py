@@ -1,6 +1,9 @@
+import json
 import uuid
+from datetime import datetime
 
 import pytest
+from fastapi import FastAPI
 from httpx import AsyncClient
 from pydantic_ai import models
 
@@ -245,6 +248,49 @@ async def test_chat_multi_turn_persists_all_messages(
     assert roles == ["user", "assistant", "user", "assistant"]
 
 
+@pytest.mark.asyncio
+async def test_chat_reuses_cached_history(
+    app: FastAPI,
+    authenticated_client: AsyncClient,
+) -> None:
+    """Follow-up turns are served from the history cache until a delete."""
+    cache = app.state.history_cache
+    res1 = await authenticated_client.post(
+        BASE_URL, json=_chat_payload(message="Turn 1")
+    )
+    conversation_id = res1.json()["conversation_id"]
+
+    await authenticated_client.post(
+        BASE_URL,
+        json=_chat_payload(message="Turn 2", conversation_id=conversation_id),
+    )
+    assert cache.stats.hits == 1
+
+    msgs_res = await authenticated_client.get(
+        f"{CONVERSATIONS_URL}/{conversation_id}/messages"
+    )
+    first_id = msgs_res.json()[0]["id"]
+    await authenticated_client.delete(
+        f"{CONVERSATIONS_URL}/{conversation_id}/messages/{first_id}"
+    )
+    assert uuid.UUID(conversation_id) not in cache
+
+    res3 = await authenticated_client.post(
+        BASE_URL,
+        json=_chat_payload(message="Turn 3", conversation_id=conversation_id),
+    )
+    assert res3.status_code == 200
+    msgs_res = await authenticated_client.get(
+        f"{CONVERSATIONS_URL}/{conversation_id}/messages"
+    )
+    messages = msgs_res.json()
+    cached = cache.get(
+        uuid.UUID(conversation_id), datetime.fromisoformat(messages[-1]["created_at"])
+    )
+    assert cached is not None
+    assert [str(m.id) for m in cached] == [m["id"] for m in messages]
+
+
 # ═══════════════════════════════════════════════════════════════════════
 # Auto-title
 # ═══════════════════════════════════════════════════════════════════════
@@ -307,3 +353,82 @@ async def test_chat_does_not_overwrite_existing_title(
 
     conv_res = await authenticated_client.get(f"{CONVERSATIONS_URL}/{conversation_id}")
     assert conv_res.json()["title"] == "Original title"
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Streaming
+# ═══════════════════════════════════════════════════════════════════════
+
+
+def _parse_sse(body: str) -> list[tuple[str, dict]]:
+    """Split an SSE body into (event, data) pairs."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_unauthenticated_rejected(
+    api_v1_client: AsyncClient,
+) -> None:
+    res = await api_v1_client.post(f"{BASE_URL}/stream", json=_chat_payload())
+    assert res.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_emits_events(
+    authenticated_client: AsyncClient,
+) -> None:
+    """The stream starts with the conversation, then tokens, then done."""
+    res = await authenticated_client.post(
+        f"{BASE_URL}/stream", json=_chat_payload(message="Stream please")
+    )
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(res.text)
+    names = [name for name, _ in events]
+    assert names[0] == "start"
+    assert names[-1] == "done"
+    assert "token" in names
+    # TestModel calls every registered tool
+    assert "tool_call" in names and "tool_result" in names
+
+    done = events[-1][1]
+    tokens = "".join(data["content"] for name, data in events if name == "token")
+    assert tokens.endswith(done["message"])
+    assert done["conversation_id"] == events[0][1]["conversation_id"]
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_persists_messages_and_title(
+    authenticated_client: AsyncClient,
+) -> None:
+    res = await authenticated_client.post(
+        f"{BASE_URL}/stream", json=_chat_payload(message="Streamed question")
+    )
+    done = _parse_sse(res.text)[-1][1]
+    conversation_id = done["conversation_id"]
+
+    msgs_res = await authenticated_client.get(
+        f"{CONVERSATIONS_URL}/{conversation_id}/messages"
+    )
+    messages = msgs_res.json()
+    assert [m["role"] for m in messages] == ["user", "assistant"]
+    assert messages[1]["content_text"] == done["message"]
+
+    conv_res = await authenticated_client.get(f"{CONVERSATIONS_URL}/{conversation_id}")
+    assert conv_res.json()["title"] == "Streamed question"
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_invalid_conversation_id_returns_404(
+    authenticated_client: AsyncClient,
+) -> None:
+    res = await authenticated_client.post(
+        f"{BASE_URL}/stream",
+        json=_chat_payload(conversation_id=str(uuid.uuid4())),
+    )
+    assert res.status_code == 404
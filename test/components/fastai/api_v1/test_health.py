@@ -0,0 +1,38 @@
+from test.conftest import CountingEmbeddingModel
+
+from pydantic_ai.embeddings import Embedder
+from starlette.datastructures import State
+
+from fastai.api_v1.health import cache_stats
+from fastai.chats.cache import HistoryCache
+from fastai.embeddings.core import KnowledgeBase
+from fastai.users.cache import PrincipalCache
+
+
+def test_cache_stats_reports_every_cache() -> None:
+    """cache_stats reports size, counters and hit ratio of each cache."""
+    principals = PrincipalCache(max_size=10)
+    principals.stats.hits = 3
+    principals.stats.misses = 1
+    principals.stats.record_auth(0.002)
+    state = State(
+        {
+            "knowledge_base": KnowledgeBase(Embedder(CountingEmbeddingModel())),
+            "principal_cache": principals,
+            "history_cache": HistoryCache(max_size=10, max_messages=10),
+        }
+    )
+
+    report = cache_stats(state)
+
+    assert set(report) == {"embeddings", "query_embeddings", "principals", "history"}
+    assert report["embeddings"] == {
+        "size": 0,
+        "memory_hits": 0,
+        "database_hits": 0,
+        "misses": 0,
+        "hit_ratio": 0.0,
+    }
+    assert report["principals"]["hit_ratio"] == 0.75
+    assert report["principals"]["auth_count"] == 1
+    assert report["principals"]["auth_mean_seconds"] == 0.002
@@ -0,0 +1,105 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastai.chats.cache import HistoryCache
+from fastai.chats.schemas import MessageRead, MessageRole
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _messages(conversation_id: uuid.UUID, start: int, count: int) -> list[MessageRead]:
+    return [
+        MessageRead(
+            id=uuid.uuid4(),
+            conversation_id=conversation_id,
+            role=MessageRole.USER if i % 2 == 0 else MessageRole.ASSISTANT,
+            content_text=f"message {i}",
+            created_at=START + timedelta(minutes=i),
+        )
+        for i in range(start, start + count)
+    ]
+
+
+def test_get_requires_matching_last_message_time() -> None:
+    """An entry is only served while no other process has appended."""
+    conv_id = uuid.uuid4()
+    messages = _messages(conv_id, 0, 3)
+    cache = HistoryCache(max_size=10, max_messages=100)
+    cache.put(conv_id, messages)
+
+    assert cache.get(conv_id, messages[-1].created_at) == messages
+    assert cache.get(conv_id, messages[-1].created_at + timedelta(seconds=1)) is None
+    # A stale entry is dropped
+    assert conv_id not in cache
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+
+
+def test_empty_conversation_matches_no_messages() -> None:
+    conv_id = uuid.uuid4()
+    cache = HistoryCache(max_size=10, max_messages=100)
+    cache.put(conv_id, [])
+
+    assert cache.get(conv_id, None) == []
+
+
+def test_append_extends_and_trims_to_max_messages() -> None:
+    conv_id = uuid.uuid4()
+    cache = HistoryCache(max_size=10, max_messages=4)
+    cache.put(conv_id, _messages(conv_id, 0, 3))
+    turn = _messages(conv_id, 3, 2)
+
+    cache.append(conv_id, turn)
+
+    cached = cache.get(conv_id, turn[-1].created_at)
+    assert cached is not None
+    assert [m.content_text for m in cached] == [f"message {i}" for i in range(1, 5)]
+
+
+def test_append_out_of_order_drops_entry() -> None:
+    conv_id = uuid.uuid4()
+    cache = HistoryCache(max_size=10, max_messages=100)
+    cache.put(conv_id, _messages(conv_id, 5, 2))
+
+    cache.append(conv_id, _messages(conv_id, 0, 1))
+
+    assert conv_id not in cache
+
+
+def test_append_ignores_uncached_conversation() -> None:
+    conv_id = uuid.uuid4()
+    cache = HistoryCache(max_size=10, max_messages=100)
+
+    cache.append(conv_id, _messages(conv_id, 0, 2))
+
+    assert len(cache) == 0
+
+
+def test_evicts_least_recently_used_conversation() -> None:
+    first, second, third = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    cache = HistoryCache(max_size=2, max_messages=100)
+    cache.put(first, [])
+    cache.put(second, [])
+    assert cache.get(first, None) == []
+
+    cache.put(third, [])
+
+    assert first in cache
+    assert second not in cache
+
+
+def test_invalidate() -> None:
+    conv_id = uuid.uuid4()
+    cache = HistoryCache(max_size=10, max_messages=100)
+    cache.put(conv_id, _messages(conv_id, 0, 2))
+
+    cache.invalidate(conv_id)
+    cache.invalidate(uuid.uuid4())
+
+    assert len(cache) == 0
+
+
+def test_disabled_with_zero_size() -> None:
+    cache = HistoryCache(max_size=0, max_messages=100)
+    cache.put(uuid.uuid4(), [])
+    assert len(cache) == 0
@@ -1,4 +1,5 @@
 import uuid
+from datetime import datetime, timedelta, timezone
 
 import pytest
 import pytest_asyncio
@@ -492,3 +493,141 @@ async def test_delete_message(
         user_id=sample_user_id,  # pyright: ignore[reportCallIssue]
     )
     assert fetched is None
+
+
+# ── Chat turn persistence ──
+
+
+@pytest.mark.asyncio
+async def test_get_with_recent_messages(
+    test_db_session: AsyncSession,
+    sample_conversation: Conversation,
+    sample_user_id: uuid.UUID,
+) -> None:
+    """Returns the latest messages, oldest first, in one query."""
+    conv_id = sample_conversation.id
+    for i in range(4):
+        await Message.create(
+            test_db_session,
+            MessageCreate(
+                conversation_id=conv_id, role=MessageRole.USER, content_text=f"m{i}"
+            ),
+        )
+
+    loaded = await Conversation.get_with_recent_messages(
+        test_db_session, conv_id, user_id=sample_user_id, limit=3
+    )
+
+    assert loaded is not None
+    conversation, messages = loaded
+    assert conversation.id == conv_id
+    assert [m.content_text for m in messages] == ["m1", "m2", "m3"]
+
+
+@pytest.mark.asyncio
+async def test_get_with_recent_messages_empty_and_wrong_user(
+    test_db_session: AsyncSession,
+    sample_conversation: Conversation,
+    sample_user_id: uuid.UUID,
+) -> None:
+    conv_id = sample_conversation.id
+
+    loaded = await Conversation.get_with_recent_messages(
+        test_db_session, conv_id, user_id=sample_user_id
+    )
+    assert loaded is not None
+    assert loaded[1] == []
+
+    assert (
+        await Conversation.get_with_recent_messages(
+            test_db_session, conv_id, user_id=uuid.uuid4()
+        )
+        is None
+    )
+
+
+@pytest.mark.asyncio
+async def test_save_turn_inserts_new_conversation(
+    test_db_session: AsyncSession,
+    sample_user_id: uuid.UUID,
+) -> None:
+    """A new conversation is inserted with its first messages and title."""
+    conversation = Conversation.model_validate(
+        ConversationCreate(user_id=sample_user_id)
+    )
+    conv_id = conversation.id
+    messages = [
+        Message.model_validate(
+            MessageCreate(conversation_id=conv_id, role=role, content_text=text)
+        )
+        for role, text in [
+            (MessageRole.USER, "Question"),
+            (MessageRole.ASSISTANT, "Answer"),
+        ]
+    ]
+
+    await conversation.save_turn(test_db_session, messages, title="Question")
+
+    loaded = await Conversation.get_with_recent_messages(
+        test_db_session, conv_id, user_id=sample_user_id
+    )
+    assert loaded is not None
+    saved, history = loaded
+    assert saved.title == "Question"
+    assert [m.content_text for m in history] == ["Question", "Answer"]
+
+
+@pytest.mark.asyncio
+async def test_update_summary_never_moves_backwards(
+    test_db_session: AsyncSession,
+    sample_conversation: Conversation,
+    sample_user_id: uuid.UUID,
+) -> None:
+    """An older summary does not overwrite a newer one."""
+    conv_id = sample_conversation.id
+    newer = datetime(2026, 1, 2, tzinfo=timezone.utc)
+
+    await Conversation.update_summary(test_db_session, conv_id, "Newer", newer)
+    await Conversation.update_summary(
+        test_db_session, conv_id, "Older", newer - timedelta(days=1)
+    )
+
+    updated = await Conversation.get(test_db_session, conv_id, user_id=sample_user_id)
+    assert updated is not None
+    assert updated.summary == "Newer"
+    assert updated.summarized_until == newer
+
+
+@pytest.mark.asyncio
+async def test_get_with_last_message_at(
+    test_db_session: AsyncSession,
+    sample_conversation: Conversation,
+    sample_user_id: uuid.UUID,
+) -> None:
+    """The newest message time is loaded with the conversation."""
+    conv_id = sample_conversation.id
+    found = await Conversation.get_with_last_message_at(
+        test_db_session, conv_id, user_id=sample_user_id
+    )
+    assert found is not None
+    assert found[1] is None
+
+    message = await Message.create(
+        test_db_session,
+        MessageCreate(
+            conversation_id=conv_id, role=MessageRole.USER, content_text="Hi"
+        ),
+    )
+    created_at = message.created_at
+
+    found = await Conversation.get_with_last_message_at(
+        test_db_session, conv_id, user_id=sample_user_id
+    )
+    assert found is not None
+    assert found[1] == created_at
+    assert (
+        await Conversation.get_with_last_message_at(
+            test_db_session, conv_id, user_id=uuid.uuid4()
+        )
+        is None
+    )
@@ -1,7 +1,23 @@
+import uuid
+from typing import cast
+from unittest.mock import MagicMock
+
 import pytest
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.util import greenlet_spawn
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from fastai.chats.models import Conversation
 from fastai.database import core
-from fastai.database.core import PostgresSettings
+from fastai.database.core import (
+    PostgresSettings,
+    create_db_engine,
+    release_connection,
+)
+from fastai.database.pool import InstrumentedAsyncPool, PoolMetrics, get_pool_stats
+from fastai.users.models import User
 
 
 def test_sample():
@@ -157,3 +173,122 @@ class TestPostgresSettingsFromUrl:
 
         assert settings.port == 25060
         assert settings.sslmode == "require"
+
+
+@pytest.mark.asyncio
+async def test_release_connection_rejects_pending_changes() -> None:
+    session = AsyncSession()
+    session.add(Conversation(user_id=uuid.uuid4()))
+
+    with pytest.raises(RuntimeError):
+        await release_connection(session)
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_release_connection_returns_connection_to_pool(
+    test_db_engine: AsyncEngine,
+    create_user,
+) -> None:
+    """Loaded objects stay readable and the session can query again."""
+    user = await create_user()
+    user_id = user.id
+    pool = cast(QueuePool, test_db_engine.pool)
+    # The fixture session may still hold one
+    checked_out = pool.checkedout()
+
+    async with AsyncSession(test_db_engine) as session:
+        loaded = await User.get(session, user_id)
+        assert loaded is not None
+        assert pool.checkedout() == checked_out + 1
+
+        await release_connection(session)
+
+        assert pool.checkedout() == checked_out
+        assert loaded.email == user.email
+        loaded.display_name = "Released"
+        session.add(loaded)
+        await session.commit()
+
+        reloaded = await User.get(session, user_id)
+        assert reloaded is not None
+        assert reloaded.display_name == "Released"
+
+
+class TestPoolSettings:
+    @pytest.fixture(autouse=True)
+    def _required(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("FASTAI_POSTGRES_HOSTNAME", "localhost")
+        monkeypatch.setenv("FASTAI_POSTGRES_NAME", "mydb")
+        monkeypatch.setenv("FASTAI_POSTGRES_USER", "admin")
+        monkeypatch.setenv("FASTAI_POSTGRES_PASSWORD", "secret")
+
+    def test_engine_uses_pool_settings(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setenv("FASTAI_POSTGRES_POOL_SIZE", "20")
+        monkeypatch.setenv("FASTAI_POSTGRES_MAX_OVERFLOW", "0")
+
+        engine = create_db_engine(PostgresSettings())  # pyright: ignore[reportCallIssue]
+
+        assert isinstance(engine.pool, InstrumentedAsyncPool)
+        assert engine.pool.size() == 20
+        stats = get_pool_stats(engine)
+        assert stats is not None
+        assert stats.checked_out == 0
+
+    def test_statement_settings_in_connect_args(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setenv("FASTAI_POSTGRES_STATEMENT_TIMEOUT_MS", "5000")
+        monkeypatch.setenv("FASTAI_POSTGRES_STATEMENT_CACHE_SIZE", "50")
+
+        connect_args = core._connect_args(PostgresSettings())  # pyright: ignore[reportCallIssue]
+
+        assert connect_args["statement_cache_size"] == 50
+        assert connect_args["server_settings"] == {"statement_timeout": "5000"}
+
+    def test_pgbouncer_disables_prepared_statement_caches(
+        self, monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setenv("FASTAI_POSTGRES_PGBOUNCER", "true")
+        monkeypatch.setenv("FASTAI_POSTGRES_STATEMENT_TIMEOUT_MS", "5000")
+
+        connect_args = core._connect_args(PostgresSettings())  # pyright: ignore[reportCallIssue]
+
+        assert connect_args["statement_cache_size"] == 0
+        assert connect_args["prepared_statement_cache_size"] == 0
+        name_func = connect_args["prepared_statement_name_func"]
+        assert name_func() != name_func()
+        assert "server_settings" not in connect_args
+
+
+@pytest.mark.asyncio
+async def test_pool_records_checkout_waits_and_timeouts() -> None:
+    waits: list[float] = []
+    pool = InstrumentedAsyncPool(
+        MagicMock,
+        metrics=PoolMetrics(on_checkout_wait=waits.append),
+        pool_size=1,
+        max_overflow=0,
+        timeout=0.05,
+    )
+
+    def checkout_twice() -> None:
+        held = pool.connect()
+        with pytest.raises(exc.TimeoutError):
+            pool.connect()
+        held.close()
+
+    await greenlet_spawn(checkout_twice)
+
+    assert pool.metrics.checkouts == 1
+    assert pool.metrics.timeouts == 1
+    assert len(waits) == 2
+    assert waits[1] >= 0.05
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_health_check_reports_pool(test_db_session: AsyncSession) -> None:
+    status = await core.health_check(test_db_session)
+
+    assert status["status"] == "ready"
+    assert status["pool"]["checked_out"] >= 1
+    assert status["pool"]["checkouts"] >= 1
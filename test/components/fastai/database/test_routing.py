@@ -0,0 +1,188 @@
+import uuid
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import select
+
+from fastai.chats.models import Conversation
+from fastai.database.core import PostgresSettings, create_read_replicas
+from fastai.database.routing import (
+    ReadReplicas,
+    RoutingSession,
+    create_session,
+    set_read_your_writes_key,
+)
+from fastai.users.models import User  # noqa: F401  # configures the mappers
+
+
+def _engine(host: str) -> AsyncEngine:
+    # Never connects; the tests only inspect which engine gets picked
+    return create_async_engine(f"postgresql+asyncpg://u:p@{host}/db")
+
+
+@pytest.fixture
+def primary() -> AsyncEngine:
+    return _engine("primary")
+
+
+@pytest.fixture
+def replicas() -> ReadReplicas:
+    return ReadReplicas([_engine("replica-1"), _engine("replica-2")], lag_window=60)
+
+
+def _routing_session(primary: AsyncEngine, replicas: ReadReplicas) -> RoutingSession:
+    session = create_session(primary, replicas).sync_session
+    assert isinstance(session, RoutingSession)
+    return session
+
+
+def _marked_read():
+    return select(Conversation).execution_options(use_replica=True)
+
+
+class TestReadReplicas:
+    def test_picks_round_robin(self, replicas: ReadReplicas):
+        first, second = replicas.engines
+
+        assert [replicas.pick() for _ in range(3)] == [first, second, first]
+
+    def test_requires_an_engine(self):
+        with pytest.raises(ValueError):
+            ReadReplicas([], lag_window=5)
+
+    def test_remembers_writes_within_the_window(self):
+        replicas = ReadReplicas([_engine("replica")], lag_window=60)
+
+        replicas.record_write("user")
+
+        assert replicas.wrote_recently("user")
+        assert not replicas.wrote_recently("other")
+        assert not replicas.wrote_recently(None)
+
+    def test_forgets_writes_after_the_window(self):
+        replicas = ReadReplicas([_engine("replica")], lag_window=0)
+
+        replicas.record_write("user")
+
+        assert not replicas.wrote_recently("user")
+
+    def test_tracks_at_most_max_keys(self):
+        replicas = ReadReplicas([_engine("replica")], lag_window=60, max_keys=2)
+
+        for key in ("a", "b", "c"):
+            replicas.record_write(key)
+
+        assert not replicas.wrote_recently("a")
+        assert replicas.wrote_recently("b")
+        assert replicas.wrote_recently("c")
+
+
+class TestRoutingSession:
+    def test_plain_session_without_replicas(self, primary: AsyncEngine):
+        session = create_session(primary)
+
+        assert not isinstance(session.sync_session, RoutingSession)
+
+    def test_marked_reads_go_to_a_replica(
+        self, primary: AsyncEngine, replicas: ReadReplicas
+    ):
+        session = _routing_session(primary, replicas)
+
+        bind = session.get_bind(clause=_marked_read())
+
+        assert bind in [engine.sync_engine for engine in replicas.engines]
+
+    def test_unmarked_reads_go_to_the_primary(
+        self, primary: AsyncEngine, replicas: ReadReplicas
+    ):
+        session = _routing_session(primary, replicas)
+
+        assert session.get_bind(clause=select(Conversation)) is primary.sync_engine
+
+    def test_reads_after_a_write_stay_on_the_primary(
+        self, primary: AsyncEngine, replicas: ReadReplicas
+    ):
+        session = _routing_session(primary, replicas)
+        statement = update(Conversation).values(title="renamed")
+
+        assert session.get_bind(clause=statement) is primary.sync_engine
+        assert session.get_bind(clause=_marked_read()) is primary.sync_engine
+
+    def test_recent_writer_reads_from_the_primary(
+        self, primary: AsyncEngine, replicas: ReadReplicas
+    ):
+        user_id = uuid.uuid4()
+        replicas.record_write(user_id)
+        async_session = create_session(primary, replicas)
+        set_read_your_writes_key(async_session, user_id)
+
+        bind = async_session.sync_session.get_bind(clause=_marked_read())
+
+        assert bind is primary.sync_engine
+
+    def test_commit_after_write_records_the_key(
+        self, primary: AsyncEngine, replicas: ReadReplicas
+    ):
+        user_id = uuid.uuid4()
+        session = _routing_session(primary, replicas)
+        session.info["read_your_writes_key"] = user_id
+        session.info["wrote"] = True
+
+        # No transaction was begun, so nothing connects
+        session.commit()
+
+        assert replicas.wrote_recently(user_id)
+
+    def test_read_only_commit_records_nothing(
+        self, primary: AsyncEngine, replicas: ReadReplicas
+    ):
+        user_id = uuid.uuid4()
+        session = _routing_session(primary, replicas)
+        session.info["read_your_writes_key"] = user_id
+
+        session.commit()
+
+        assert not replicas.wrote_recently(user_id)
+
+
+class TestReplicaSettings:
+    @pytest.fixture(autouse=True)
+    def _primary_env(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setenv("FASTAI_POSTGRES_URL", "postgresql://u:p@primary/db")
+
+    def test_no_replicas_by_default(self):
+        settings = PostgresSettings()  # pyright: ignore[reportCallIssue]
+
+        assert settings.replica_urls == []
+        assert create_read_replicas(settings) is None
+
+    def test_replica_urls_use_asyncpg(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setenv(
+            "FASTAI_POSTGRES_REPLICA_URLS",
+            '["postgres://u:p@replica-1/db", "postgresql://u:p@replica-2/db"]',
+        )
+
+        settings = PostgresSettings()  # pyright: ignore[reportCallIssue]
+
+        assert settings.replica_urls == [
+            "postgresql+asyncpg://u:p@replica-1/db",
+            "postgresql+asyncpg://u:p@replica-2/db",
+        ]
+
+    def test_creates_one_engine_per_replica(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setenv(
+            "FASTAI_POSTGRES_REPLICA_URLS",
+            '["postgresql://u:p@replica-1/db", "postgresql://u:p@replica-2/db"]',
+        )
+        monkeypatch.setenv("FASTAI_POSTGRES_REPLICA_LAG_WINDOW", "2.5")
+        settings = PostgresSettings()  # pyright: ignore[reportCallIssue]
+
+        replicas = create_read_replicas(settings)
+
+        assert replicas is not None
+        assert [engine.url.host for engine in replicas.engines] == [
+            "replica-1",
+            "replica-2",
+        ]
+        assert replicas.lag_window == 2.5
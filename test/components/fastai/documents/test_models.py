@@ -174,6 +174,43 @@ async def test_get_by_content_hash(
     assert docs[0].id == sample_document.id
 
 
+@pytest.mark.asyncio
+async def test_get_completed_duplicate(
+    test_db_session: AsyncSession, sample_document: Document
+) -> None:
+    copy = await Document.create(
+        test_db_session,
+        DocumentCreate(
+            filename="report-copy.pdf",
+            content_type="application/pdf",
+            file_size=1024,
+            storage_path=f"documents/{uuid.uuid4()}/report-copy.pdf",
+            content_hash="abc123def456",
+        ),
+    )
+
+    # The original is still pending
+    assert (
+        await Document.get_completed_duplicate(
+            test_db_session, "abc123def456", exclude_id=copy.id
+        )
+        is None
+    )
+
+    await sample_document.update_embedding_status(test_db_session, "completed")
+    duplicate = await Document.get_completed_duplicate(
+        test_db_session, "abc123def456", exclude_id=copy.id
+    )
+    assert duplicate is not None
+    assert duplicate.id == sample_document.id
+    assert (
+        await Document.get_completed_duplicate(
+            test_db_session, "abc123def456", exclude_id=sample_document.id
+        )
+        is None
+    )
+
+
 @pytest.mark.asyncio
 async def test_count(test_db_session: AsyncSession, sample_document: Document) -> None:
     count = await Document.count(test_db_session)
@@ -0,0 +1,213 @@
+import asyncio
+import uuid
+from test.conftest import CountingEmbeddingModel, _deterministic_vector
+
+import pytest
+from pydantic_ai.embeddings import Embedder
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from fastai.embeddings.cache import EmbeddingCache, QueryEmbeddingCache
+from fastai.embeddings.core import KnowledgeBase
+from fastai.embeddings.models import Embedding
+from fastai.embeddings.schemas import EmbeddingCreate
+from fastai.embeddings.settings import EmbeddingSettings
+
+integration = pytest.mark.integration
+
+MODEL = "test:mock-embed"
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    """The in-process tier holds at most max_size vectors."""
+    cache = EmbeddingCache(max_size=2)
+    cache.put(("a", MODEL, 3), [1.0, 2.0, 3.0])
+    cache.put(("b", MODEL, 3), [4.0, 5.0, 6.0])
+    assert cache.get(("a", MODEL, 3)) == [1.0, 2.0, 3.0]
+
+    cache.put(("c", MODEL, 3), [7.0, 8.0, 9.0])
+
+    assert len(cache) == 2
+    assert cache.get(("b", MODEL, 3)) is None
+    assert cache.get(("a", MODEL, 3)) is not None
+
+
+def test_cache_keys_include_model_and_dimensions() -> None:
+    """The same content hash under another model or size is a miss."""
+    cache = EmbeddingCache(max_size=10)
+    cache.put(("a", MODEL, 3), [1.0, 2.0, 3.0])
+
+    assert cache.get(("a", "other:model", 3)) is None
+    assert cache.get(("a", MODEL, 4)) is None
+
+
+def test_cache_disabled_with_zero_size() -> None:
+    cache = EmbeddingCache(max_size=0)
+    cache.put(("a", MODEL, 3), [1.0, 2.0, 3.0])
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_embed_many_reuses_cached_vectors() -> None:
+    """Repeated and duplicate texts are only sent to the provider once."""
+    model = CountingEmbeddingModel()
+    kb = KnowledgeBase(Embedder(model), EmbeddingSettings(batch_size=10))
+
+    first = await kb.embed_many(["header", "body one", "header"])
+    second = await kb.embed_many(["header", "body two"])
+
+    assert model.batch_sizes == [2, 1]
+    assert first[0] == first[2]
+    # Cached vectors are held as float32
+    assert second[0] == pytest.approx(first[0], rel=1e-6)
+    assert kb.cache.stats.memory_hits == 1
+    assert kb.cache.stats.misses == 3
+
+
+@integration
+@pytest.mark.asyncio
+async def test_lookup_falls_back_to_stored_embeddings(
+    test_db_session: AsyncSession,
+) -> None:
+    """Vectors stored for any source are reused for identical content."""
+    text = "Licensed under the Apache License, Version 2.0"
+    await Embedding.bulk_upsert(
+        test_db_session,
+        [
+            EmbeddingCreate(
+                source_type="document", source_id=uuid.uuid4(), chunk_text=text
+            )
+        ],
+        [_deterministic_vector(text)],
+        MODEL,
+    )
+    cache = EmbeddingCache(max_size=10)
+    content_hash = Embedding.hash_content(text)
+
+    found = await cache.lookup(
+        [content_hash, Embedding.hash_content("unseen")],
+        MODEL,
+        EmbeddingSettings().dimensions,
+        session=test_db_session,
+    )
+
+    assert list(found) == [content_hash]
+    assert cache.stats.database_hits == 1
+    assert cache.stats.misses == 1
+    # Promoted into the in-process tier
+    assert cache.get((content_hash, MODEL, EmbeddingSettings().dimensions))
+
+
+def test_query_cache_normalizes_queries() -> None:
+    """Case and whitespace differences share one entry; models do not."""
+    cache = QueryEmbeddingCache(max_size=10, ttl=60)
+    key = (QueryEmbeddingCache.normalize("  Reset   my\tPASSWORD "), MODEL)
+    cache.put(key, [1.0, 2.0])
+
+    assert key == ("reset my password", MODEL)
+    assert cache.get(("reset my password", MODEL)) == [1.0, 2.0]
+    assert cache.get(("reset my password", "other:model")) is None
+
+
+def test_query_cache_expires_entries(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 1000.0
+    monkeypatch.setattr("fastai.embeddings.cache.time.monotonic", lambda: now)
+    cache = QueryEmbeddingCache(max_size=10, ttl=30)
+    cache.put(("q", MODEL), [1.0])
+
+    now += 29
+    assert cache.get(("q", MODEL)) == [1.0]
+    now += 1
+    assert cache.get(("q", MODEL)) is None
+    assert len(cache) == 0
+
+
+def test_query_cache_evicts_least_recently_used() -> None:
+    cache = QueryEmbeddingCache(max_size=2, ttl=60)
+    cache.put(("a", MODEL), [1.0])
+    cache.put(("b", MODEL), [2.0])
+    cache.get(("a", MODEL))
+
+    cache.put(("c", MODEL), [3.0])
+
+    assert cache.get(("b", MODEL)) is None
+    assert cache.get(("a", MODEL)) == [1.0]
+
+
+@pytest.mark.asyncio
+async def test_search_queries_reuse_cached_vectors() -> None:
+    """Repeated queries are embedded once per normalized text."""
+    model = CountingEmbeddingModel()
+    kb = KnowledgeBase(Embedder(model))
+
+    first = await kb.embed_query("Reset my password")
+    second = await kb.embed_query("reset  my password ")
+
+    assert model.batch_sizes == [1]
+    assert second == pytest.approx(first, rel=1e-6)
+    assert kb.query_cache.stats.hits == 1
+    assert kb.query_cache.stats.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_share_one_provider_call() -> None:
+    calls = 0
+    release = asyncio.Event()
+
+    async def embed() -> list[float]:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return [1.0, 2.0]
+
+    cache = QueryEmbeddingCache(max_size=10, ttl=60)
+    waiters = [
+        asyncio.create_task(cache.get_or_embed("same query", MODEL, embed))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == [[1.0, 2.0]] * 5
+    assert calls == 1
+    assert cache.stats.misses == 5
+    assert cache.stats.coalesced == 4
+    assert cache.get(("same query", MODEL)) == [1.0, 2.0]
+
+
+@pytest.mark.asyncio
+async def test_failed_query_embedding_is_not_cached() -> None:
+    calls = 0
+
+    async def embed() -> list[float]:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("provider down")
+        return [1.0]
+
+    cache = QueryEmbeddingCache(max_size=10, ttl=60)
+    with pytest.raises(RuntimeError):
+        await cache.get_or_embed("q", MODEL, embed)
+
+    assert await cache.get_or_embed("q", MODEL, embed) == [1.0]
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_call() -> None:
+    release = asyncio.Event()
+
+    async def embed() -> list[float]:
+        await release.wait()
+        return [1.0]
+
+    cache = QueryEmbeddingCache(max_size=10, ttl=60)
+    first = asyncio.create_task(cache.get_or_embed("q", MODEL, embed))
+    second = asyncio.create_task(cache.get_or_embed("q", MODEL, embed))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == [1.0]
+    with pytest.raises(asyncio.CancelledError):
+        await first
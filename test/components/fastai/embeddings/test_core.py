@@ -1,13 +1,39 @@
 import uuid
+from collections.abc import AsyncIterator, Sequence
+from test.conftest import CountingEmbeddingModel
 
 import pytest
+from pydantic_ai.embeddings import Embedder
 from sqlmodel.ext.asyncio.session import AsyncSession
+from structlog.testing import capture_logs
 
 from fastai.embeddings.core import KnowledgeBase
+from fastai.embeddings.models import Embedding
+from fastai.embeddings.schemas import (
+    SEARCH_PROFILES,
+    BulkUpsertResult,
+    EmbeddingCreate,
+    SearchProfile,
+    SearchProfileName,
+    SearchResult,
+)
+from fastai.embeddings.settings import EmbeddingSettings
 
 integration = pytest.mark.integration
 
 
+def _document_chunks(source_id: uuid.UUID, count: int) -> list[EmbeddingCreate]:
+    return [
+        EmbeddingCreate(
+            source_type="document",
+            source_id=source_id,
+            chunk_text=f"Chunk number {i}",
+            chunk_index=i,
+        )
+        for i in range(count)
+    ]
+
+
 @integration
 @pytest.mark.asyncio
 async def test_embed_and_store_creates_embedding(
@@ -97,6 +123,30 @@ async def test_search_returns_results(
     assert results[0].score >= results[1].score
 
 
+@integration
+@pytest.mark.asyncio
+async def test_search_hybrid_matches_keywords(
+    test_db_session: AsyncSession,
+    knowledge_base: KnowledgeBase,
+) -> None:
+    """search_hybrid finds a chunk by an identifier it contains."""
+    source_id = uuid.uuid4()
+    await knowledge_base.embed_and_store(
+        test_db_session,
+        source_type="document",
+        source_id=source_id,
+        content="Set FASTAI_WIDGET_MODE to strict for production",
+    )
+
+    results = await knowledge_base.search_hybrid(
+        test_db_session,
+        query="FASTAI_WIDGET_MODE",
+        source_type="document",
+    )
+
+    assert [r.source_id for r in results] == [source_id]
+
+
 @integration
 @pytest.mark.asyncio
 async def test_search_no_results(
@@ -110,3 +160,276 @@ async def test_search_no_results(
         limit=5,
     )
     assert results == []
+
+
+@pytest.mark.asyncio
+async def test_search_resolves_profile(monkeypatch: pytest.MonkeyPatch) -> None:
+    """search uses the configured profile unless one is given."""
+    profiles: list[SearchProfile | None] = []
+
+    async def fake_search_similar(*args, profile=None, **kwargs) -> list[SearchResult]:
+        profiles.append(profile)
+        return []
+
+    monkeypatch.setattr(Embedding, "search_similar", fake_search_similar)
+    kb = KnowledgeBase(
+        Embedder(CountingEmbeddingModel()),
+        EmbeddingSettings(search_profile=SearchProfileName.FAST),
+    )
+    custom = SearchProfile(ef_search=77)
+    session = AsyncSession()
+
+    await kb.search(session, query="q")
+    await kb.search(session, query="q", profile=SearchProfileName.ACCURATE)
+    await kb.search(session, query="q", profile=custom)
+
+    assert profiles == [
+        SEARCH_PROFILES[SearchProfileName.FAST],
+        SEARCH_PROFILES[SearchProfileName.ACCURATE],
+        custom,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_search_inlines_filters_only_for_indexed_source_types(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Filters are inlined only where a partial index for the model exists."""
+    inlined: list[bool] = []
+
+    async def fake_search(*args, inline_filters=True, **kwargs) -> list[SearchResult]:
+        inlined.append(inline_filters)
+        return []
+
+    monkeypatch.setattr(Embedding, "search_similar", fake_search)
+    monkeypatch.setattr(Embedding, "search_hybrid", fake_search)
+    kb = KnowledgeBase(Embedder(CountingEmbeddingModel()))
+    session = AsyncSession()
+
+    # The default index is for another model
+    await kb.search(session, query="q", source_type="document")
+    monkeypatch.setattr(
+        "fastai.embeddings.core.SEARCH_INDEXES", (("document", kb.model_name),)
+    )
+    await kb.search(session, query="q", source_type="document")
+    await kb.search(session, query="q", source_type="item")
+    await kb.search_hybrid(session, query="q", source_type="document")
+    await kb.search_hybrid(session, query="q")
+
+    assert inlined == [False, True, False, True, False]
+
+
+@pytest.mark.asyncio
+async def test_embed_many_groups_by_batch_size() -> None:
+    """embed_many sends one provider request per batch_size texts."""
+    model = CountingEmbeddingModel()
+    kb = KnowledgeBase(Embedder(model), EmbeddingSettings(batch_size=4))
+
+    vectors = await kb.embed_many([f"text {i}" for i in range(10)])
+
+    assert len(vectors) == 10
+    assert model.batch_sizes == [4, 4, 2]
+
+
+@pytest.mark.asyncio
+async def test_embed_many_groups_by_token_budget() -> None:
+    """embed_many also closes a batch before it exceeds batch_max_tokens."""
+    model = CountingEmbeddingModel()
+    kb = KnowledgeBase(
+        Embedder(model), EmbeddingSettings(batch_size=10, batch_max_tokens=100)
+    )
+    # 40 tokens each with the approximate counter; the last is over budget
+    texts = [f"{i:04d}" * 40 for i in range(5)] + ["long " * 100]
+
+    vectors = await kb.embed_many(texts)
+
+    assert len(vectors) == 6
+    assert model.batch_sizes == [2, 2, 1, 1]
+
+
+def test_embedding_settings_rejects_overlap_not_below_chunk_tokens() -> None:
+    with pytest.raises(ValueError, match="chunk_overlap_tokens"):
+        EmbeddingSettings(chunk_tokens=100, chunk_overlap_tokens=100)
+    with pytest.raises(ValueError, match="Unknown token counter"):
+        EmbeddingSettings(token_counter="words")
+
+
+async def _stream(items: Sequence[EmbeddingCreate]) -> AsyncIterator[EmbeddingCreate]:
+    for item in items:
+        yield item
+
+
+@pytest.mark.asyncio
+async def test_embed_and_store_stream_writes_batches_in_one_transaction(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Batches are stored as they are embedded and committed once."""
+    calls: list[tuple] = []
+
+    async def fake_delete_by_source(session, source_type, source_id, *, commit=True):
+        calls.append(("delete", source_id, commit))
+        return 0
+
+    async def fake_bulk_upsert(session, items, vectors, model_name, *, commit=True):
+        assert len(items) == len(vectors)
+        calls.append(("upsert", [item.chunk_index for item in items], commit))
+        stored.extend(items)
+        return BulkUpsertResult(inserted=len(items))
+
+    stored: list[EmbeddingCreate] = []
+    monkeypatch.setattr(Embedding, "delete_by_source", fake_delete_by_source)
+    monkeypatch.setattr(Embedding, "bulk_upsert", fake_bulk_upsert)
+
+    class Session:
+        bind = None
+        commits = 0
+
+        async def commit(self) -> None:
+            self.commits += 1
+
+    model = CountingEmbeddingModel()
+    kb = KnowledgeBase(Embedder(model), EmbeddingSettings(batch_size=3))
+    source_id = uuid.uuid4()
+    session = Session()
+
+    result = await kb.embed_and_store_stream(
+        session,  # pyright: ignore[reportArgumentType]
+        _stream(_document_chunks(source_id, 7)),
+        replace=True,
+    )
+
+    assert result.inserted == 7
+    assert model.batch_sizes == [3, 3, 1]
+    assert all(item.token_count for item in stored)
+    assert calls == [
+        ("delete", source_id, False),
+        ("upsert", [0, 1, 2], False),
+        ("upsert", [3, 4, 5], False),
+        ("upsert", [6], False),
+    ]
+    assert session.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_embed_and_store_logs_only_provider_requests(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Chunks served from the cache do not count as provider requests."""
+
+    async def fake_bulk_upsert(session, items, vectors, model_name, *, commit=True):
+        return BulkUpsertResult(skipped=len(items))
+
+    monkeypatch.setattr(Embedding, "bulk_upsert", fake_bulk_upsert)
+    model = CountingEmbeddingModel()
+    kb = KnowledgeBase(Embedder(model), EmbeddingSettings(batch_size=3))
+    chunks = _document_chunks(uuid.uuid4(), 7)
+    await kb.embed_many([chunk.chunk_text for chunk in chunks])
+    session = AsyncSession()
+
+    with capture_logs() as logs:
+        await kb.embed_and_store_many(session, chunks)
+
+    [stored] = [log for log in logs if log["event"] == "Embeddings stored"]
+    assert stored["requests"] == 0
+    assert model.batch_sizes == [3, 3, 1]
+
+
+@pytest.mark.asyncio
+async def test_embed_and_store_stream_propagates_producer_errors(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A failing chunk source aborts the pipeline without committing."""
+
+    async def fake_bulk_upsert(session, items, vectors, model_name, *, commit=True):
+        return BulkUpsertResult(inserted=len(items))
+
+    monkeypatch.setattr(Embedding, "bulk_upsert", fake_bulk_upsert)
+
+    async def failing() -> AsyncIterator[EmbeddingCreate]:
+        for item in _document_chunks(uuid.uuid4(), 5):
+            yield item
+        raise ValueError("extraction failed")
+
+    kb = KnowledgeBase(
+        Embedder(CountingEmbeddingModel()), EmbeddingSettings(batch_size=2)
+    )
+    session = AsyncSession()
+
+    with pytest.raises(ValueError, match="extraction failed"):
+        await kb.embed_and_store_stream(session, failing())
+
+
+@integration
+@pytest.mark.asyncio
+async def test_embed_and_store_stream_replaces_source(
+    test_db_session: AsyncSession,
+    knowledge_base: KnowledgeBase,
+) -> None:
+    """Streamed chunks replace a source's existing chunks atomically."""
+    source_id = uuid.uuid4()
+    await knowledge_base.embed_and_store_many(
+        test_db_session, _document_chunks(source_id, 5)
+    )
+
+    result = await knowledge_base.embed_and_store_stream(
+        test_db_session, _stream(_document_chunks(source_id, 2)), replace=True
+    )
+
+    assert result.inserted == 2
+    chunks = await Embedding.get_chunks_by_source(
+        test_db_session, "document", source_id
+    )
+    assert [c.chunk_index for c in chunks] == [0, 1]
+
+
+@integration
+@pytest.mark.asyncio
+async def test_embed_and_store_many_stores_all_chunks(
+    test_db_session: AsyncSession,
+) -> None:
+    """embed_and_store_many batches provider calls and stores every chunk."""
+    model = CountingEmbeddingModel()
+    kb = KnowledgeBase(Embedder(model), EmbeddingSettings(batch_size=3))
+    source_id = uuid.uuid4()
+
+    result = await kb.embed_and_store_many(
+        test_db_session, _document_chunks(source_id, 7)
+    )
+
+    assert result.inserted == 7
+    assert model.batch_sizes == [3, 3, 1]
+    chunks = await Embedding.get_chunks_by_source(
+        test_db_session, "document", source_id
+    )
+    assert [c.chunk_index for c in chunks] == list(range(7))
+    assert all(c.token_count for c in chunks)
+
+
+@integration
+@pytest.mark.asyncio
+async def test_embed_and_store_many_replace(
+    test_db_session: AsyncSession,
+    knowledge_base: KnowledgeBase,
+) -> None:
+    """replace=True swaps out a source's existing chunks."""
+    source_id = uuid.uuid4()
+    await knowledge_base.embed_and_store_many(
+        test_db_session, _document_chunks(source_id, 5)
+    )
+
+    result = await knowledge_base.embed_and_store_many(
+        test_db_session, _document_chunks(source_id, 2), replace=True
+    )
+
+    assert result.inserted == 2
+    chunks = await Embedding.get_chunks_by_source(
+        test_db_session, "document", source_id
+    )
+    assert len(chunks) == 2
+
+
+@pytest.mark.asyncio
+async def test_embed_and_store_many_empty(knowledge_base: KnowledgeBase) -> None:
+    """No items means no provider calls and nothing stored."""
+    result = await knowledge_base.embed_and_store_many(None, [])  # pyright: ignore[reportArgumentType]
+    assert result.inserted == result.updated == result.skipped == 0
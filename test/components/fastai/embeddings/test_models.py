@@ -4,10 +4,11 @@ from test.conftest import _deterministic_vector
 
 import pytest
 import pytest_asyncio
+from sqlalchemy import text as sa_text
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from fastai.embeddings.models import Embedding
-from fastai.embeddings.schemas import EmbeddingCreate
+from fastai.embeddings.models import MAX_STORED_TOKEN_COUNT, Embedding
+from fastai.embeddings.schemas import EmbeddingCreate, IterativeScan, SearchProfile
 
 pytestmark = pytest.mark.integration
 
@@ -107,6 +108,25 @@ async def test_upsert_updates_changed_content(
     assert result.content_hash == Embedding.hash_content(new_text)
 
 
+@pytest.mark.asyncio
+async def test_upsert_stores_null_for_oversized_token_count(
+    test_db_session: AsyncSession,
+) -> None:
+    """Token counts too large for the column are stored as NULL."""
+    text = "Unchunked document"
+    embedding_in = EmbeddingCreate(
+        source_type="document",
+        source_id=uuid.uuid4(),
+        chunk_text=text,
+        token_count=MAX_STORED_TOKEN_COUNT + 1,
+    )
+    record = await Embedding.upsert(
+        test_db_session, embedding_in, _deterministic_vector(text), TEST_MODEL_NAME
+    )
+
+    assert record.token_count is None
+
+
 @pytest.mark.asyncio
 async def test_search_similar_returns_results(
     test_db_session: AsyncSession,
@@ -130,6 +150,7 @@ async def test_search_similar_returns_results(
     results = await Embedding.search_similar(
         test_db_session,
         query_vector=query_vector,
+        embedding_model=TEST_MODEL_NAME,
         source_type="item",
         limit=5,
     )
@@ -161,6 +182,7 @@ async def test_search_similar_filters_by_source_type(
     results = await Embedding.search_similar(
         test_db_session,
         query_vector=query_vector,
+        embedding_model=TEST_MODEL_NAME,
         source_type="item",
         limit=10,
     )
@@ -169,6 +191,356 @@ async def test_search_similar_filters_by_source_type(
     assert len(results) == 1
 
 
+@pytest.mark.asyncio
+async def test_search_similar_profile_does_not_outlive_search(
+    test_db_session: AsyncSession,
+) -> None:
+    """The profile's HNSW settings are undone once the search returns."""
+    settings = sa_text(
+        "SELECT current_setting('hnsw.ef_search'), "
+        "current_setting('hnsw.iterative_scan'), "
+        "current_setting('hnsw.max_scan_tuples')"
+    )
+    # Loads pgvector in this connection, which defines the settings
+    await Embedding.search_similar(
+        test_db_session,
+        query_vector=_deterministic_vector("query"),
+        embedding_model=TEST_MODEL_NAME,
+    )
+    before = tuple((await test_db_session.execute(settings)).one())
+
+    await Embedding.search_similar(
+        test_db_session,
+        query_vector=_deterministic_vector("query"),
+        embedding_model=TEST_MODEL_NAME,
+        profile=SearchProfile(
+            ef_search=123,
+            iterative_scan=IterativeScan.STRICT_ORDER,
+            max_scan_tuples=5000,
+        ),
+    )
+
+    after = tuple((await test_db_session.execute(settings)).one())
+    assert after == before
+    assert before[0] != "123"
+
+
+@pytest.mark.asyncio
+async def test_search_similar_filtered_returns_full_limit(
+    test_db_session: AsyncSession,
+) -> None:
+    """A selective filter still fills the limit, ordered by similarity."""
+    for i in range(40):
+        content = f"Document chunk {i}"
+        await Embedding.upsert(
+            test_db_session,
+            EmbeddingCreate(
+                source_type="document", source_id=uuid.uuid4(), chunk_text=content
+            ),
+            _deterministic_vector(content),
+            TEST_MODEL_NAME,
+        )
+    for i in range(3):
+        content = f"Item {i}"
+        await Embedding.upsert(
+            test_db_session,
+            EmbeddingCreate(
+                source_type="item", source_id=uuid.uuid4(), chunk_text=content
+            ),
+            _deterministic_vector(content),
+            TEST_MODEL_NAME,
+        )
+
+    results = await Embedding.search_similar(
+        test_db_session,
+        query_vector=_deterministic_vector("Item 0"),
+        embedding_model=TEST_MODEL_NAME,
+        source_type="item",
+        limit=3,
+        profile=SearchProfile(ef_search=1),
+    )
+
+    assert len(results) == 3
+    assert results[0].chunk_text == "Item 0"
+    assert [r.score for r in results] == sorted(
+        (r.score for r in results), reverse=True
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_similar_only_searches_given_model(
+    test_db_session: AsyncSession,
+) -> None:
+    """Rows embedded with another model are never returned."""
+    content = "Item: Lamp\nDescription: Desk lamp"
+    vector = _deterministic_vector(content)
+    for model_name in (TEST_MODEL_NAME, "test:old-model"):
+        await Embedding.upsert(
+            test_db_session,
+            EmbeddingCreate(
+                source_type="item", source_id=uuid.uuid4(), chunk_text=content
+            ),
+            vector,
+            model_name,
+        )
+
+    results = await Embedding.search_similar(
+        test_db_session,
+        query_vector=vector,
+        embedding_model=TEST_MODEL_NAME,
+        source_type="item",
+        limit=10,
+    )
+
+    assert len(results) == 1
+
+
+async def _store_items(session: AsyncSession, texts: list[str]) -> None:
+    for content in texts:
+        await Embedding.upsert(
+            session,
+            EmbeddingCreate(
+                source_type="item", source_id=uuid.uuid4(), chunk_text=content
+            ),
+            _deterministic_vector(content),
+            TEST_MODEL_NAME,
+        )
+
+
+@pytest.mark.asyncio
+async def test_search_hybrid_finds_exact_identifier(
+    test_db_session: AsyncSession,
+) -> None:
+    """A keyword match ranks first even when its vector is unrelated."""
+    texts = [f"Troubleshooting note {i} about network timeouts" for i in range(20)]
+    texts.append("Error ERR4711 means the upload quota is exhausted")
+    await _store_items(test_db_session, texts)
+
+    results = await Embedding.search_hybrid(
+        test_db_session,
+        query_text="ERR4711",
+        query_vector=_deterministic_vector("unrelated query"),
+        embedding_model=TEST_MODEL_NAME,
+        source_type="item",
+        limit=5,
+    )
+
+    assert results[0].chunk_text == texts[-1]
+    assert [r.score for r in results] == sorted(
+        (r.score for r in results), reverse=True
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_hybrid_fuses_both_rankings(
+    test_db_session: AsyncSession,
+) -> None:
+    """Rows found by only one ranking are still returned."""
+    texts = ["Item: Lamp with brass finish", "Item: Chair", "Item: Table"]
+    await _store_items(test_db_session, texts)
+
+    results = await Embedding.search_hybrid(
+        test_db_session,
+        query_text="brass",
+        query_vector=_deterministic_vector("Item: Chair"),
+        embedding_model=TEST_MODEL_NAME,
+        source_type="item",
+        limit=3,
+        rrf_k=60,
+    )
+
+    assert {r.chunk_text for r in results} == set(texts)
+    # Found by both rankings beats first place in just one
+    assert results[0].chunk_text == texts[0]
+    assert results[0].score <= 2 / 61
+
+
+@pytest.mark.asyncio
+async def test_search_hybrid_ignores_other_models(
+    test_db_session: AsyncSession,
+) -> None:
+    content = "Part number XK-220 replacement guide"
+    await Embedding.upsert(
+        test_db_session,
+        EmbeddingCreate(source_type="item", source_id=uuid.uuid4(), chunk_text=content),
+        _deterministic_vector(content),
+        "test:old-model",
+    )
+
+    results = await Embedding.search_hybrid(
+        test_db_session,
+        query_text="XK-220",
+        query_vector=_deterministic_vector(content),
+        embedding_model=TEST_MODEL_NAME,
+    )
+
+    assert results == []
+
+
+def _chunks(source_id: uuid.UUID, texts: list[str]) -> list[EmbeddingCreate]:
+    return [
+        EmbeddingCreate(
+            source_type="document",
+            source_id=source_id,
+            chunk_text=text,
+            chunk_index=i,
+        )
+        for i, text in enumerate(texts)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_inserts_new_rows(
+    test_db_session: AsyncSession,
+) -> None:
+    """bulk_upsert inserts every new chunk across several batches."""
+    source_id = uuid.uuid4()
+    texts = [f"Chunk {i}" for i in range(5)]
+    items = _chunks(source_id, texts)
+
+    result = await Embedding.bulk_upsert(
+        test_db_session,
+        items,
+        [_deterministic_vector(t) for t in texts],
+        TEST_MODEL_NAME,
+        batch_size=2,
+    )
+
+    assert (result.inserted, result.updated, result.skipped) == (5, 0, 0)
+    chunks = await Embedding.get_chunks_by_source(
+        test_db_session, "document", source_id
+    )
+    assert [c.chunk_text for c in chunks] == texts
+    assert all(c.embedding_model == TEST_MODEL_NAME for c in chunks)
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_counts_collapsed_duplicates_separately(
+    test_db_session: AsyncSession,
+) -> None:
+    """Items repeating a chunk key are not reported as skipped rows."""
+    source_id = uuid.uuid4()
+    items = _chunks(source_id, ["Alpha", "Beta"]) + _chunks(source_id, ["Gamma"])
+
+    result = await Embedding.bulk_upsert(
+        test_db_session,
+        items,
+        [_deterministic_vector(item.chunk_text) for item in items],
+        TEST_MODEL_NAME,
+    )
+
+    assert (result.inserted, result.updated, result.skipped) == (2, 0, 0)
+    assert result.duplicates == 1
+    chunks = await Embedding.get_chunks_by_source(
+        test_db_session, "document", source_id
+    )
+    assert [c.chunk_text for c in chunks] == ["Gamma", "Beta"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_updates_changed_and_skips_unchanged(
+    test_db_session: AsyncSession,
+) -> None:
+    """Only chunks whose content_hash changed are rewritten."""
+    source_id = uuid.uuid4()
+    texts = ["Alpha", "Beta", "Gamma"]
+    await Embedding.bulk_upsert(
+        test_db_session,
+        _chunks(source_id, texts),
+        [_deterministic_vector(t) for t in texts],
+        TEST_MODEL_NAME,
+    )
+
+    new_texts = ["Alpha", "Beta (revised)", "Gamma", "Delta"]
+    result = await Embedding.bulk_upsert(
+        test_db_session,
+        _chunks(source_id, new_texts),
+        [_deterministic_vector(t) for t in new_texts],
+        TEST_MODEL_NAME,
+    )
+
+    assert (result.inserted, result.updated, result.skipped) == (1, 1, 2)
+    chunks = await Embedding.get_chunks_by_source(
+        test_db_session, "document", source_id
+    )
+    assert [c.chunk_text for c in chunks] == new_texts
+    assert chunks[1].content_hash == Embedding.hash_content("Beta (revised)")
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_rejects_mismatched_vectors(
+    test_db_session: AsyncSession,
+) -> None:
+    """Each item needs exactly one vector."""
+    with pytest.raises(ValueError):
+        await Embedding.bulk_upsert(
+            test_db_session,
+            _chunks(uuid.uuid4(), ["one", "two"]),
+            [_deterministic_vector("one")],
+            TEST_MODEL_NAME,
+        )
+
+
+@pytest.mark.asyncio
+async def test_copy_source_replaces_target_rows(
+    test_db_session: AsyncSession,
+) -> None:
+    """copy_source clones vectors server-side and merges metadata."""
+    from_id, to_id = uuid.uuid4(), uuid.uuid4()
+    texts = ["Alpha", "Beta"]
+    await Embedding.bulk_upsert(
+        test_db_session,
+        _chunks(from_id, texts),
+        [_deterministic_vector(t) for t in texts],
+        TEST_MODEL_NAME,
+    )
+    await Embedding.bulk_upsert(
+        test_db_session,
+        _chunks(to_id, ["Stale"]),
+        [_deterministic_vector("Stale")],
+        TEST_MODEL_NAME,
+    )
+
+    copied = await Embedding.copy_source(
+        test_db_session,
+        "document",
+        from_id,
+        to_id,
+        TEST_MODEL_NAME,
+        metadata={"filename": "copy.md"},
+    )
+
+    assert copied == 2
+    chunks = await Embedding.get_chunks_by_source(test_db_session, "document", to_id)
+    assert [c.chunk_text for c in chunks] == texts
+    assert all(c.metadata_["filename"] == "copy.md" for c in chunks)
+    assert chunks[0].embedding.to_list() == pytest.approx(
+        _deterministic_vector("Alpha"), rel=1e-3
+    )
+
+
+@pytest.mark.asyncio
+async def test_copy_source_keeps_target_when_nothing_to_copy(
+    test_db_session: AsyncSession,
+) -> None:
+    """An empty copy leaves the target's embeddings in place."""
+    from_id, to_id = uuid.uuid4(), uuid.uuid4()
+    await Embedding.bulk_upsert(
+        test_db_session,
+        _chunks(to_id, ["Kept"]),
+        [_deterministic_vector("Kept")],
+        TEST_MODEL_NAME,
+    )
+
+    copied = await Embedding.copy_source(
+        test_db_session, "document", from_id, to_id, TEST_MODEL_NAME
+    )
+
+    assert copied == 0
+    chunks = await Embedding.get_chunks_by_source(test_db_session, "document", to_id)
+    assert [c.chunk_text for c in chunks] == ["Kept"]
+
+
 @pytest.mark.asyncio
 async def test_delete_by_source(
     test_db_session: AsyncSession,
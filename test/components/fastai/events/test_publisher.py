@@ -5,7 +5,7 @@ from faststream.nats import NatsBroker, TestNatsBroker
 
 from fastai.events import DOCUMENT_STREAM, SUBJECT_DOCUMENT_UPLOADED, NatsSettings
 from fastai.events.core import EventPublisher
-from fastai.events.schemas import DocumentUploaded
+from fastai.events.schemas import ConversationHistoryInvalidated, DocumentUploaded
 
 
 @pytest.mark.asyncio
@@ -59,3 +59,20 @@ async def test_publish_preserves_document_id() -> None:
         await publisher.publish_document_uploaded(event)
 
     assert received[0].document_id == doc_id
+
+
+@pytest.mark.asyncio
+async def test_history_invalidation_round_trip() -> None:
+    """Registered callbacks receive the invalidated conversation ID."""
+    conv_id = uuid.uuid4()
+    invalidated: list[uuid.UUID] = []
+
+    settings = NatsSettings()  # pyright: ignore[reportCallIssue]
+    publisher = EventPublisher(settings, broker=NatsBroker())
+    publisher.on_history_invalidated(invalidated.append)
+    async with TestNatsBroker(publisher._broker):
+        await publisher.publish_history_invalidated(
+            ConversationHistoryInvalidated(conversation_id=conv_id)
+        )
+
+    assert invalidated == [conv_id]
@@ -1,10 +1,63 @@
+from contextlib import aclosing
+
 import pytest
 
-from fastai.extraction.core import ExtractionService, _chunk_text
+from fastai.extraction.core import (
+    ChunkSizing,
+    ExtractionService,
+    _chunk_text,
+    _page_ranges,
+)
+from fastai.extraction.settings import ExtractionSettings
+from fastai.utils.tokens import get_token_counter
 
 pytestmark = pytest.mark.integration
 
 
+def _pdf_string(line: str) -> bytes:
+    escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return b"(" + escaped.encode("latin-1") + b") Tj T* "
+
+
+def _make_pdf(pages: list[str]) -> bytes:
+    """Build a minimal PDF with one Helvetica text page per item."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids: list[bytes] = []
+    for text in pages:
+        lines = b"".join(_pdf_string(line) for line in text.splitlines())
+        stream = b"BT /F1 10 Tf 12 TL 50 780 Td " + lines + b"ET"
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(kids),
+        len(kids),
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets: list[int] = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(out)
+
+
 @pytest.mark.asyncio
 async def test_extract_text_markdown_simple() -> None:
     """ExtractionService can extract text from a markdown file."""
@@ -32,6 +85,117 @@ async def test_extract_text_markdown() -> None:
     assert "paragraph" in text
 
 
+@pytest.mark.asyncio
+async def test_extract_pdf_in_process_pool() -> None:
+    """PDFs are extracted in worker processes, passed via shared memory."""
+    pdf = _make_pdf(["First page text", "Second page (with parens)"])
+    service = ExtractionService(
+        ExtractionSettings(max_workers=1, shared_memory_threshold=0)
+    )
+    try:
+        text = await service.extract_text(pdf, "report.pdf")
+        chunks = await service.extract_and_chunk(pdf, "report.pdf")
+    finally:
+        service.shutdown()
+
+    assert text == ExtractionService._extract_sync(pdf, "report.pdf")
+    assert "First page text" in text
+    assert "Second page (with parens)" in text
+    assert chunks == [text.strip()]
+
+
+@pytest.mark.asyncio
+async def test_extraction_pool_recycles_processes() -> None:
+    """Each process extracts at most max_tasks_per_child documents."""
+    service = ExtractionService(
+        ExtractionSettings(max_workers=1, max_tasks_per_child=1)
+    )
+    try:
+        texts = [await service.extract_text(b"doc", "a.txt") for _ in range(3)]
+    finally:
+        service.shutdown()
+
+    assert texts == ["doc"] * 3
+
+
+@pytest.mark.asyncio
+async def test_extraction_without_processes() -> None:
+    """max_workers=0 falls back to the default thread pool."""
+    service = ExtractionService(ExtractionSettings(max_workers=0))
+
+    text = await service.extract_text(_make_pdf(["Threaded"]), "a.pdf")
+
+    assert service._pool is None
+    assert "Threaded" in text
+
+
+@pytest.mark.asyncio
+async def test_large_pdf_extracted_in_page_ranges() -> None:
+    """Page ranges extracted in parallel reassemble to the serial result."""
+    pages = [f"Page {i} (of 12)\nSome text on page {i}." for i in range(12)]
+    pdf = _make_pdf(pages)
+    service = ExtractionService(
+        ExtractionSettings(max_workers=2, parallel_page_threshold=10)
+    )
+    try:
+        text = await service.extract_text(pdf, "manual.pdf")
+        chunks = await service.extract_and_chunk(pdf, "manual.pdf")
+    finally:
+        service.shutdown()
+
+    serial = ExtractionService._extract_sync(pdf, "manual.pdf")
+    assert text == serial
+    assert chunks == ChunkSizing().split(serial)
+    assert text.index("Page 5 ") < text.index("Page 6 ")
+
+
+@pytest.mark.asyncio
+async def test_iter_chunks_streams_pdf_pages_in_order() -> None:
+    """Streamed chunks cover every page in order, spanning step boundaries."""
+    pages = [f"Page {i} begins. " + "Filler words here. " * 20 for i in range(25)]
+    pdf = _make_pdf(pages)
+    service = ExtractionService(ExtractionSettings(max_workers=2, stream_pages=4))
+    try:
+        chunks = [chunk async for chunk in service.iter_chunks(pdf, "book.pdf")]
+    finally:
+        service.shutdown()
+
+    text = "\n".join(chunks)
+    positions = [text.index(f"Page {i} begins") for i in range(25)]
+    assert positions == sorted(positions)
+    assert all(len(chunk) <= 1600 for chunk in chunks)
+
+
+@pytest.mark.asyncio
+async def test_iter_chunks_small_document_matches_extract_and_chunk() -> None:
+    service = ExtractionService(ExtractionSettings(max_workers=0))
+    content = b"First paragraph.\n\n" + b"Second paragraph. " * 200
+
+    streamed = [chunk async for chunk in service.iter_chunks(content, "a.md")]
+
+    assert streamed == await service.extract_and_chunk(content, "a.md")
+
+
+@pytest.mark.asyncio
+async def test_iter_chunks_stops_early() -> None:
+    """Closing the generator early cancels the pages still being read."""
+    pdf = _make_pdf([f"Page {i}" for i in range(30)])
+    service = ExtractionService(ExtractionSettings(max_workers=1, stream_pages=2))
+    try:
+        async with aclosing(service.iter_chunks(pdf, "a.pdf")) as chunks:
+            first = await anext(chunks)
+        assert "Page 0" in first
+        # The pool is still usable afterwards
+        assert await service.extract_text(b"next", "a.txt") == "next"
+    finally:
+        service.shutdown()
+
+
+def test_page_ranges_cover_all_pages_in_order() -> None:
+    assert _page_ranges(10, 3) == [(0, 3), (3, 6), (6, 10)]
+    assert _page_ranges(4, 4) == [(0, 1), (1, 2), (2, 3), (3, 4)]
+
+
 def test_chunk_text_splits_on_paragraphs() -> None:
     """Chunks are split on paragraph boundaries."""
     text = "First paragraph.\n\nSecond paragraph.\n\nThird paragraph."
@@ -55,6 +219,41 @@ def test_chunk_text_single_chunk() -> None:
     assert chunks == ["Hello, world!"]
 
 
+def test_chunk_text_overlaps_chunks() -> None:
+    """Each chunk starts with the end of the previous one."""
+    text = "alpha beta gamma delta epsilon zeta eta theta"
+    chunks = _chunk_text(text, max_chars=20, overlap=5)
+    assert chunks == [
+        "alpha beta gamma",
+        "gamma delta epsilon",
+        "silon zeta eta theta",
+    ]
+
+
+def test_chunk_text_splits_characters_without_separators() -> None:
+    """Text without any separator is cut into max_chars windows."""
+    text = "x" * 25
+    chunks = _chunk_text(text, max_chars=10, overlap=2)
+    assert [len(c) for c in chunks] == [10, 10, 9]
+    assert "".join(c[2:] if i else c for i, c in enumerate(chunks)) == text
+
+
+def test_chunk_sizing_splits_by_tokens() -> None:
+    """Chunks stay within the token budget, including non-ASCII text."""
+    sizing = ChunkSizing(max_tokens=50, overlap_tokens=5)
+    count = get_token_counter(sizing.token_counter)
+    english = "\n\n".join("word " * 30 for _ in range(10))
+    chinese = "\n\n".join("文档处理系统。" * 10 for _ in range(10))
+
+    for text in (english, chinese):
+        chunks = sizing.split(text)
+        assert len(chunks) > 1
+        assert max(count(chunk) for chunk in chunks) <= 50
+
+    # 7 characters of CJK text count as 7 tokens, so its chunks are shorter
+    assert max(map(len, sizing.split(chinese))) < max(map(len, sizing.split(english)))
+
+
 def test_chunk_text_empty() -> None:
     """Empty text returns no chunks."""
     assert _chunk_text("") == []
@@ -1,4 +1,8 @@
+import asyncio
+import base64
+import hashlib
 import io
+from types import SimpleNamespace
 
 import pytest
 
@@ -24,7 +28,9 @@ async def test_upload_and_download_fileobj(storage: StorageService) -> None:
     content = b"binary content here"
     upload_buf = io.BytesIO(content)
 
-    await storage.upload_fileobj(upload_buf, key)
+    result = await storage.upload_fileobj(upload_buf, key)
+    assert result.size == len(content)
+    assert result.sha256 == hashlib.sha256(content).hexdigest()
 
     download_buf = io.BytesIO()
     await storage.download_fileobj(key, download_buf)
@@ -102,3 +108,136 @@ async def test_upload_bytes_content_type(storage: StorageService) -> None:
     await obj.load()
     content_type = await obj.content_type
     assert content_type == "application/json"
+
+
+class _AsyncBytesReader:
+    """Async reader that returns at most ``max_read`` bytes per call."""
+
+    def __init__(self, data: bytes, max_read: int = 64 * 1024) -> None:
+        self._buffer = io.BytesIO(data)
+        self._max_read = max_read
+
+    async def read(self, size: int = -1) -> bytes:
+        if size < 0:
+            size = self._max_read
+        return self._buffer.read(min(size, self._max_read))
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_single_part(storage: StorageService) -> None:
+    key = "test/stream-small.txt"
+    data = b"small streamed content"
+
+    result = await storage.upload_stream(_AsyncBytesReader(data), key)
+
+    assert result.size == len(data)
+    assert result.sha256 == hashlib.sha256(data).hexdigest()
+    assert result.etag
+    assert await storage.download_bytes(key) == data
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_multipart(storage: StorageService) -> None:
+    key = "test/stream-large.bin"
+    part_size = 5 * 1024 * 1024
+    data = bytes(range(256)) * (part_size * 2 // 256 + 1000)
+
+    result = await storage.upload_stream(
+        _AsyncBytesReader(data), key, part_size=part_size
+    )
+
+    assert result.size == len(data)
+    assert result.sha256 == hashlib.sha256(data).hexdigest()
+    # Multipart ETags carry the part count
+    assert result.etag.endswith("-3")
+    assert await storage.download_bytes(key) == data
+
+
+@pytest.mark.asyncio
+async def test_upload_multipart_concurrent_parts(storage: StorageService) -> None:
+    key = "test/multipart.bin"
+    part_size = 5 * 1024 * 1024
+    data = bytes(range(256)) * (part_size * 3 // 256 + 7)
+
+    result = await storage.upload_multipart(
+        _AsyncBytesReader(data), key, part_size=part_size, concurrency=2
+    )
+
+    assert result.size == len(data)
+    assert result.etag.endswith("-4")
+    assert await storage.download_bytes(key) == data
+
+
+class _FailingPartClient:
+    """S3 client whose second part fails while the first is still uploading."""
+
+    def __init__(self) -> None:
+        self.events: list[str] = []
+
+    async def create_multipart_upload(self, **kwargs) -> dict:
+        return {"UploadId": "upload"}
+
+    async def upload_part(self, *, PartNumber: int, **kwargs) -> dict:
+        if PartNumber == 2:
+            raise RuntimeError("part failed")
+        try:
+            await asyncio.sleep(10)
+        finally:
+            self.events.append(f"part {PartNumber} stopped")
+        return {"ETag": "etag"}
+
+    async def abort_multipart_upload(self, **kwargs) -> None:
+        self.events.append("abort")
+
+
+@pytest.mark.asyncio
+async def test_upload_multipart_aborts_after_parts_stop(
+    storage_settings: StorageSettings,
+) -> None:
+    """A failed part cancels its siblings and waits for them before aborting."""
+    client = _FailingPartClient()
+    storage = StorageService(storage_settings)
+    storage._resource = SimpleNamespace(meta=SimpleNamespace(client=client))  # pyright: ignore[reportAttributeAccessIssue]
+    storage._bucket = SimpleNamespace(name="bucket")  # pyright: ignore[reportAttributeAccessIssue]
+
+    with pytest.raises(RuntimeError, match="part failed"):
+        await storage.upload_multipart(
+            _AsyncBytesReader(b"x" * 30), "key", part_size=10, concurrency=3
+        )
+
+    assert sorted(client.events[:-1]) == ["part 1 stopped", "part 3 stopped"]
+    assert client.events[-1] == "abort"
+
+
+@pytest.mark.asyncio
+async def test_download_range(storage: StorageService) -> None:
+    key = "test/range.txt"
+    await storage.upload_bytes(b"0123456789", key)
+
+    assert await storage.download_range(key, 2, 5) == b"2345"
+
+
+@pytest.mark.asyncio
+async def test_download_to_file(storage: StorageService, tmp_path) -> None:
+    key = "test/ranged-download.bin"
+    data = bytes(range(256)) * 4000
+    await storage.upload_bytes(data, key)
+    path = tmp_path / "download.bin"
+
+    size = await storage.download_to_file(key, path, part_size=64 * 1024)
+
+    assert size == len(data)
+    assert path.read_bytes() == data
+
+
+@pytest.mark.asyncio
+async def test_upload_with_client_side_checksum(
+    storage: StorageService, storage_settings: StorageSettings
+) -> None:
+    data = b"checksummed content"
+    settings = storage_settings.model_copy(update={"checksum_algorithm": "SHA256"})
+
+    async with StorageService(settings) as checked:
+        result = await checked.upload_bytes(data, "test/checksum.txt")
+
+    assert result.checksum == base64.b64encode(hashlib.sha256(data).digest()).decode()
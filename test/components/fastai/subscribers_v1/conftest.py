@@ -1,9 +1,13 @@
+from collections.abc import Iterator
+
 import pytest
 
 from fastai.extraction.core import ExtractionService
 
 
 @pytest.fixture
-def extraction_service() -> ExtractionService:
+def extraction_service() -> Iterator[ExtractionService]:
     """Create a real ExtractionService for integration tests."""
-    return ExtractionService()
+    service = ExtractionService()
+    yield service
+    service.shutdown()
@@ -63,13 +63,13 @@ async def unsupported_document(
 def _set_broker_context(
     broker: NatsBroker,
     test_db_engine,
-    storage_settings,
+    storage,
     knowledge_base,
     extraction_service,
 ) -> None:
     """Populate the broker's ContextRepo with test dependencies."""
     broker.context.set_global("db_engine", test_db_engine)
-    broker.context.set_global("storage_settings", storage_settings)
+    broker.context.set_global("storage", storage)
     broker.context.set_global("knowledge_base", knowledge_base)
     broker.context.set_global("extraction_service", extraction_service)
 
@@ -79,7 +79,6 @@ async def test_process_document_creates_embeddings(
     test_db_engine,
     uploaded_document: Document,
     knowledge_base,
-    storage_settings,
     extraction_service,
     storage: StorageService,
 ) -> None:
@@ -93,7 +92,7 @@ async def test_process_document_creates_embeddings(
     broker = NatsBroker()
     broker.include_router(router)
     _set_broker_context(
-        broker, test_db_engine, storage_settings, knowledge_base, extraction_service
+        broker, test_db_engine, storage, knowledge_base, extraction_service
     )
 
     event = DocumentUploaded(
@@ -122,12 +121,189 @@ async def test_process_document_creates_embeddings(
         assert len(embeddings) >= 1
 
 
+@pytest.mark.asyncio
+async def test_process_large_document_downloads_in_ranges(
+    test_db_engine,
+    test_db_session: AsyncSession,
+    uploaded_document: Document,
+    knowledge_base,
+    extraction_service,
+    storage: StorageService,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Documents larger than one part are fetched with ranged GETs."""
+    from fastai.subscribers_v1.documents import router
+
+    doc_id = uploaded_document.id
+    doc_storage_path = uploaded_document.storage_path
+    uploaded_document.file_size = storage.part_size + 1
+    test_db_session.add(uploaded_document)
+    await test_db_session.commit()
+
+    ranges: list[tuple[int, int]] = []
+    download_range = storage.download_range
+
+    async def recording_download_range(key: str, start: int, end: int) -> bytes:
+        ranges.append((start, end))
+        return await download_range(key, start, end)
+
+    monkeypatch.setattr(storage, "download_range", recording_download_range)
+
+    broker = NatsBroker()
+    broker.include_router(router)
+    _set_broker_context(
+        broker, test_db_engine, storage, knowledge_base, extraction_service
+    )
+
+    event = DocumentUploaded(
+        document_id=doc_id,
+        storage_path=doc_storage_path,
+        content_type="text/markdown",
+        filename="test.md",
+    )
+
+    async with TestNatsBroker(broker) as br:
+        await br.publish(event, subject=SUBJECT_DOCUMENT_UPLOADED)
+
+    assert len(ranges) == 1
+    async with AsyncSession(test_db_engine) as session:
+        doc = await Document.get(session, doc_id)
+        assert doc is not None
+        assert doc.embedding_status == "completed"
+
+
+@pytest.mark.asyncio
+async def test_process_duplicate_document_copies_embeddings(
+    test_db_engine,
+    test_db_session: AsyncSession,
+    uploaded_document: Document,
+    knowledge_base,
+    extraction_service,
+    storage: StorageService,
+) -> None:
+    """A re-upload of already embedded content reuses the stored vectors."""
+    from fastai.subscribers_v1.documents import router
+
+    original_id = uploaded_document.id
+    broker = NatsBroker()
+    broker.include_router(router)
+    _set_broker_context(
+        broker, test_db_engine, storage, knowledge_base, extraction_service
+    )
+
+    copy = await Document.create(
+        test_db_session,
+        DocumentCreate(
+            filename="copy.md",
+            content_type="text/markdown",
+            file_size=uploaded_document.file_size,
+            # Nothing is uploaded here: the worker must not download it
+            storage_path=f"documents/{uuid.uuid4()}/copy.md",
+            content_hash=uploaded_document.content_hash,
+            embedding_status="pending",
+        ),
+    )
+    copy_id = copy.id
+
+    async with TestNatsBroker(broker) as br:
+        for doc_id, path, filename in (
+            (original_id, uploaded_document.storage_path, "test.md"),
+            (copy_id, copy.storage_path, "copy.md"),
+        ):
+            await br.publish(
+                DocumentUploaded(
+                    document_id=doc_id,
+                    storage_path=path,
+                    content_type="text/markdown",
+                    filename=filename,
+                ),
+                subject=SUBJECT_DOCUMENT_UPLOADED,
+            )
+
+    async with AsyncSession(test_db_engine) as session:
+        doc = await Document.get(session, copy_id)
+        assert doc is not None
+        assert doc.embedding_status == "completed"
+
+        original = await Embedding.get_chunks_by_source(
+            session, "document", original_id
+        )
+        copied = await Embedding.get_chunks_by_source(session, "document", copy_id)
+        assert len(copied) == len(original) >= 1
+        assert [c.content_hash for c in copied] == [c.content_hash for c in original]
+        assert all(c.metadata_["filename"] == "copy.md" for c in copied)
+
+
+@pytest.mark.asyncio
+async def test_reprocess_document_extracts_despite_duplicate(
+    test_db_engine,
+    test_db_session: AsyncSession,
+    uploaded_document: Document,
+    knowledge_base,
+    extraction_service,
+    storage: StorageService,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """An explicit reprocess re-extracts instead of copying a duplicate."""
+    from fastai.subscribers_v1.documents import router
+
+    broker = NatsBroker()
+    broker.include_router(router)
+    _set_broker_context(
+        broker, test_db_engine, storage, knowledge_base, extraction_service
+    )
+    copy = await Document.create(
+        test_db_session,
+        DocumentCreate(
+            filename="copy.md",
+            content_type="text/markdown",
+            file_size=uploaded_document.file_size,
+            storage_path=uploaded_document.storage_path,
+            content_hash=uploaded_document.content_hash,
+            embedding_status="completed",
+        ),
+    )
+    copy_id = copy.id
+
+    async with TestNatsBroker(broker) as br:
+        await br.publish(
+            DocumentUploaded(
+                document_id=uploaded_document.id,
+                storage_path=uploaded_document.storage_path,
+                content_type="text/markdown",
+                filename="test.md",
+            ),
+            subject=SUBJECT_DOCUMENT_UPLOADED,
+        )
+
+        async def fail_copy_source(*args, **kwargs) -> int:
+            raise AssertionError("reprocess must not copy embeddings")
+
+        monkeypatch.setattr(Embedding, "copy_source", fail_copy_source)
+        await br.publish(
+            DocumentUploaded(
+                document_id=copy_id,
+                storage_path=copy.storage_path,
+                content_type="text/markdown",
+                filename="copy.md",
+                reprocess=True,
+            ),
+            subject=SUBJECT_DOCUMENT_UPLOADED,
+        )
+
+    async with AsyncSession(test_db_engine) as session:
+        doc = await Document.get(session, copy_id)
+        assert doc is not None
+        assert doc.embedding_status == "completed"
+        chunks = await Embedding.get_chunks_by_source(session, "document", copy_id)
+        assert chunks
+
+
 @pytest.mark.asyncio
 async def test_process_unsupported_content_type_skips(
     test_db_engine,
     unsupported_document: Document,
     knowledge_base,
-    storage_settings,
     extraction_service,
     storage: StorageService,
 ) -> None:
@@ -141,7 +317,7 @@ async def test_process_unsupported_content_type_skips(
     broker = NatsBroker()
     broker.include_router(router)
     _set_broker_context(
-        broker, test_db_engine, storage_settings, knowledge_base, extraction_service
+        broker, test_db_engine, storage, knowledge_base, extraction_service
     )
 
     event = DocumentUploaded(
@@ -165,7 +341,6 @@ async def test_process_unsupported_content_type_skips(
 async def test_process_missing_document_does_not_error(
     test_db_engine,
     knowledge_base,
-    storage_settings,
     extraction_service,
     storage: StorageService,
 ) -> None:
@@ -175,7 +350,7 @@ async def test_process_missing_document_does_not_error(
     broker = NatsBroker()
     broker.include_router(router)
     _set_broker_context(
-        broker, test_db_engine, storage_settings, knowledge_base, extraction_service
+        broker, test_db_engine, storage, knowledge_base, extraction_service
     )
 
     event = DocumentUploaded(
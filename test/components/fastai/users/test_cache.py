@@ -0,0 +1,81 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from fastai.users import cache as cache_module
+from fastai.users.cache import PrincipalCache
+from fastai.users.schemas import UserPrincipal
+
+
+def _principal(**overrides: object) -> UserPrincipal:
+    fields: dict = {"id": uuid.uuid4(), "is_active": True, "is_admin": False}
+    fields.update(overrides)
+    return UserPrincipal(**fields)
+
+
+def test_entries_expire_after_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 1000.0
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now)
+    cache = PrincipalCache(max_size=10)
+    principal = _principal()
+    cache.put(principal, ttl=30)
+
+    now += 29
+    assert cache.get(principal.id) == principal
+    now += 1
+    assert cache.get(principal.id) is None
+    assert len(cache) == 0
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+
+
+def test_evicts_least_recently_used() -> None:
+    cache = PrincipalCache(max_size=2)
+    first, second, third = _principal(), _principal(), _principal()
+    cache.put(first, ttl=30)
+    cache.put(second, ttl=30)
+    assert cache.get(first.id) is not None
+
+    cache.put(third, ttl=30)
+
+    assert cache.get(first.id) is not None
+    assert cache.get(second.id) is None
+
+
+def test_invalidate() -> None:
+    cache = PrincipalCache(max_size=10)
+    principal = _principal()
+    cache.put(principal, ttl=30)
+
+    cache.invalidate(principal.id)
+    cache.invalidate(uuid.uuid4())
+
+    assert cache.get(principal.id) is None
+
+
+def test_disabled_with_zero_ttl_or_size() -> None:
+    principal = _principal()
+    no_ttl = PrincipalCache(max_size=10)
+    no_ttl.put(principal, ttl=0)
+    no_size = PrincipalCache(max_size=0)
+    no_size.put(principal, ttl=30)
+
+    assert len(no_ttl) == 0
+    assert len(no_size) == 0
+
+
+def test_auth_latency_stats() -> None:
+    cache = PrincipalCache(max_size=10)
+    cache.stats.record_auth(0.002)
+    cache.stats.record_auth(0.004)
+
+    assert cache.stats.auth_count == 2
+    assert cache.stats.auth_mean_seconds == pytest.approx(0.003)
+    assert cache.stats.auth_max_seconds == pytest.approx(0.004)
+
+
+def test_soft_deleted_principal_cannot_authenticate() -> None:
+    assert _principal().can_authenticate
+    assert not _principal(is_active=False).can_authenticate
+    assert not _principal(deleted_at=datetime.now(tz=timezone.utc)).can_authenticate
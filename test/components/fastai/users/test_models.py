@@ -5,6 +5,7 @@ import pytest_asyncio
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from fastai.auth.core import PasswordService
+from fastai.users.cache import principal_cache
 from fastai.users.models import User
 from fastai.users.schemas import AccountStatus, UserCreate, UserUpdate
 
@@ -325,3 +326,39 @@ async def test_password_validation_too_long() -> None:
             email="test@example.com",
             password="x" * 129,
         )
+
+
+@pytest.mark.asyncio
+async def test_get_principal_includes_soft_deleted(
+    test_db_session: AsyncSession, sample_user: User
+) -> None:
+    user_id = sample_user.id
+    principal = await User.get_principal(test_db_session, user_id)
+    assert principal is not None
+    assert principal.can_authenticate
+
+    await sample_user.soft_delete(test_db_session)
+
+    principal = await User.get_principal(test_db_session, user_id)
+    assert principal is not None
+    assert principal.deleted_at is not None
+    assert not principal.can_authenticate
+    assert await User.get_principal(test_db_session, uuid.uuid4()) is None
+
+
+@pytest.mark.asyncio
+async def test_changes_invalidate_cached_principal(
+    test_db_session: AsyncSession, sample_user: User
+) -> None:
+    """update and soft_delete drop the user's cached principal."""
+    user_id = sample_user.id
+    principal = await User.get_principal(test_db_session, user_id)
+    assert principal is not None
+
+    principal_cache.put(principal, ttl=60)
+    await sample_user.update(test_db_session, UserUpdate(is_admin=True))
+    assert principal_cache.get(user_id) is None
+
+    principal_cache.put(principal, ttl=60)
+    await sample_user.soft_delete(test_db_session)
+    assert principal_cache.get(user_id) is None
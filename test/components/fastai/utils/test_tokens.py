@@ -0,0 +1,23 @@
+import pytest
+
+from fastai.utils.tokens import (
+    APPROXIMATE,
+    approximate_token_count,
+    get_token_counter,
+)
+
+
+def test_approximate_token_count() -> None:
+    assert approximate_token_count("") == 0
+    assert approximate_token_count("abcd") == 1
+    assert approximate_token_count("abcde") == 2
+    assert approximate_token_count("文档") == 2
+    assert approximate_token_count("café") == 2
+
+
+def test_get_token_counter() -> None:
+    assert get_token_counter(APPROXIMATE) is approximate_token_count
+    with pytest.raises(ValueError, match="Unknown token counter"):
+        get_token_counter("words")
+    with pytest.raises(ValueError, match="Unknown token counter"):
+        get_token_counter("tiktoken:")
@@ -149,6 +149,24 @@ class DeterministicEmbeddingModel(EmbeddingModel):
         )
 
 
+class CountingEmbeddingModel(DeterministicEmbeddingModel):
+    """Deterministic embedding model that records the size of each request."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.batch_sizes: list[int] = []
+
+    async def embed(
+        self,
+        inputs: str | Sequence[str],
+        *,
+        input_type: Literal["query", "document"],
+        settings: PAIEmbeddingSettings | None = None,
+    ) -> EmbeddingResult:
+        self.batch_sizes.append(1 if isinstance(inputs, str) else len(inputs))
+        return await super().embed(inputs, input_type=input_type, settings=settings)
+
+
 @pytest.fixture
 def embedder() -> Embedder:
     """Create a test Embedder with deterministic vectors."""